@@ -6,12 +6,40 @@ This module provides a biometric authentication interface for the PSI Sovereign
 Includes facial recognition placeholder and fingerprint scanner animation.
 """
 
+import math
+import uuid
+
 import streamlit as st
 from datetime import datetime
 
-# Authorized users
+from modules.credentials import BUSY, GRANTED, RATE_LIMITED, get_credential_verifier
+
+# Authorized users (access-code hashes in modules.config.ACCESS_CODE_HASHES)
 AUTHORIZED_USERS = ["whiteantwan58-tech", "eve"]
 
+def _client_id():
+    """
+    Identify the client for rate limiting
+    Uses the remote address when Streamlit exposes it, else a per-session id
+    """
+    address = getattr(getattr(st, "context", None), "ip_address", None)
+    if address:
+        return address
+    if "auth_client_id" not in st.session_state:
+        st.session_state.auth_client_id = uuid.uuid4().hex
+    return st.session_state.auth_client_id
+
+@st.fragment(run_every=0.25)
+def _await_verification():
+    """
+    Poll the pending verification without blocking the script thread
+    Reruns the whole page once the worker pool has an answer
+    """
+    st.info("🔍 Verifying access code...")
+    pending = st.session_state.get("auth_pending")
+    if pending is None or pending.done():
+        st.rerun()
+
 def show_lock_screen():
     """
     Display biometric lock screen with quantum-themed design
@@ -135,24 +163,31 @@ def show_lock_screen():
         with col2:
             bypass = st.form_submit_button("⚠️ Emergency Bypass", use_container_width=True)
     
-    if submit:
-        if username.lower() in AUTHORIZED_USERS:
-            # SECURITY WARNING: Production implementation must verify access_code against secure hash
-            # TODO: Implement proper authentication:
-            # 1. Store password hashes using bcrypt or argon2
-            # 2. Verify access_code against stored hash
-            # 3. Add rate limiting to prevent brute force
-            # 4. Log failed authentication attempts
-            # Example: bcrypt.checkpw(access_code.encode(), stored_hash)
+    if submit and "auth_pending" not in st.session_state:
+        # Hashing runs on the verifier's worker pool; this rerun only queues it
+        st.session_state.auth_pending = get_credential_verifier().submit(username, access_code, _client_id())
+    
+    pending = st.session_state.get("auth_pending")
+    if pending is not None:
+        if not pending.done():
+            _await_verification()
+            return False
+        
+        result = st.session_state.pop("auth_pending").result()
+        if result['status'] == GRANTED:
             st.session_state.authenticated = True
-            st.session_state.current_user = username
-            st.success(f"✅ Access Granted: {username}")
+            st.session_state.current_user = result['user']
+            st.success(f"✅ Access Granted: {result['user']}")
             st.balloons()
             return True
+        elif result['status'] == RATE_LIMITED:
+            st.error(f"⏳ Too many attempts - try again in {math.ceil(result['retry_after'])} s")
+        elif result['status'] == BUSY:
+            st.warning("⏳ Verification queue is full - try again in a moment")
         else:
-            st.error("❌ ACCESS DENIED - Unauthorized user")
+            st.error("❌ ACCESS DENIED - Invalid username or access code")
             st.markdown('<p class="access-denied">⚠️ SECURITY BREACH LOGGED</p>', unsafe_allow_html=True)
-            return False
+        return False
     
     if bypass:
         # Emergency bypass for development/testing
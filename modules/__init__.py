@@ -4,4 +4,10 @@ Modular components for the application
 """
 
 __version__ = "2.0"
-__all__ = ['config', 'utils']
+__all__ = ['config', 'utils', 'rollups', 'portfolio', 'portfolio_store',
+           'market_data', 'equity_curve', 'risk',
+           'portfolio_import', 'tax_lots', 'rebalance',
+           'scheduler', 'alerts', 'log_writer', 'log_index', 'ledger', 'drive_sync',
+           'solana_rpc', 'solana_stub', 'solana_ws',
+           'bonding_curve', 'startup', 'metrics', 'cache', 'currency', 'tables', 'market_stub', 'loadtest',
+           'session_memory', 'credentials']
@@ -0,0 +1,315 @@
+"""
+Price alert engine for PSI Sovereign System
+Per-asset sorted threshold indexes evaluated on each price tick
+"""
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from modules.config import ALERT_TYPES, PSI_REFRESH_INTERVAL
+from modules.market_data import fetch_simple_prices, price_history_frame, sync_price_history
+from modules.scheduler import get_scheduler
+from modules.utils import generate_alert_id
+
+RULE_KINDS = {
+    'price': 'Price crosses',
+    'percent_change': 'Percent change from now',
+    'indicator': 'Indicator crosses',
+}
+
+# Indicator metrics that can carry alerts, with display names
+INDICATOR_METRICS = {
+    'rsi': 'RSI (14)',
+}
+
+# Notifications kept per user
+MAX_NOTIFICATIONS = 100
+
+
+class _ThresholdIndex:
+    """
+    Sorted thresholds with their rule ids
+
+    Invariant: no stored 'above' threshold is <= the last observed value and
+    no 'below' threshold is >= it, so a tick only has to look at the prefix
+    (or suffix) of rules it has just satisfied.
+    """
+
+    def __init__(self):
+        self.keys: List[float] = []
+        self.ids: List[str] = []
+
+    def insert(self, threshold: float, rule_id: str):
+        idx = bisect_right(self.keys, threshold)
+        self.keys.insert(idx, threshold)
+        self.ids.insert(idx, rule_id)
+
+    def remove(self, threshold: float, rule_id: str) -> bool:
+        lo = bisect_left(self.keys, threshold)
+        hi = bisect_right(self.keys, threshold)
+        for idx in range(lo, hi):
+            if self.ids[idx] == rule_id:
+                del self.keys[idx]
+                del self.ids[idx]
+                return True
+        return False
+
+    def pop_at_most(self, value: float) -> List[str]:
+        """Remove and return ids with threshold <= value"""
+        hi = bisect_right(self.keys, value)
+        fired = self.ids[:hi]
+        del self.keys[:hi]
+        del self.ids[:hi]
+        return fired
+
+    def pop_at_least(self, value: float) -> List[str]:
+        """Remove and return ids with threshold >= value"""
+        lo = bisect_left(self.keys, value)
+        fired = self.ids[lo:]
+        del self.keys[lo:]
+        del self.ids[lo:]
+        return fired
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+class AlertEngine:
+    """
+    Server-side one-shot alerts
+
+    Every rule is reduced to a threshold on an (asset, metric) stream and
+    stored in an 'above' or 'below' sorted index. A tick pops only the rules
+    it satisfies, so evaluation is O(log n + k) for n rules and k triggers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rules: Dict[str, Dict] = {}
+        self._indexes: Dict[Tuple[str, str], Dict[str, _ThresholdIndex]] = {}
+        self._last_values: Dict[Tuple[str, str], float] = {}
+        self._notifications: Dict[str, deque] = {}
+
+    def _index(self, asset: str, metric: str) -> Dict[str, _ThresholdIndex]:
+        index = self._indexes.get((asset, metric))
+        if index is None:
+            index = {'above': _ThresholdIndex(), 'below': _ThresholdIndex()}
+            self._indexes[(asset, metric)] = index
+        return index
+
+    def add_rule(self, user: str, asset: str, kind: str, value: float, direction: str = 'above',
+                 metric: str = 'price', alert_type: str = 'warning', message: str = '') -> Dict:
+        """
+        Create an alert rule
+
+        Args:
+            user: Owner of the alert
+            asset: Asset identifier (e.g. 'bitcoin')
+            kind: One of RULE_KINDS
+            value: Threshold for 'price'/'indicator', signed percent for 'percent_change'
+            direction: 'above' or 'below' (ignored for 'percent_change', taken from the sign)
+            metric: 'price' or a key of INDICATOR_METRICS (for 'indicator' rules)
+            alert_type: Key of ALERT_TYPES used when displaying the notification
+            message: Optional note shown when the alert fires
+
+        Returns:
+            The stored rule
+
+        Raises:
+            ValueError: If the rule is invalid or needs a reference value that is not known yet
+        """
+        if kind not in RULE_KINDS:
+            raise ValueError(f"Unknown alert kind: {kind}")
+        if alert_type not in ALERT_TYPES:
+            raise ValueError(f"Unknown alert type: {alert_type}")
+        if kind == 'indicator' and metric not in INDICATOR_METRICS:
+            raise ValueError(f"Unknown indicator: {metric}")
+        if kind != 'indicator':
+            metric = 'price'
+
+        with self._lock:
+            last = self._last_values.get((asset, metric))
+            reference = None
+            if kind == 'percent_change':
+                if last is None:
+                    raise ValueError(f"No current {metric} for {asset} yet; try again shortly")
+                reference = last
+                threshold = last * (1 + value / 100)
+                direction = 'above' if value >= 0 else 'below'
+            else:
+                threshold = float(value)
+            if direction not in ('above', 'below'):
+                raise ValueError(f"Unknown direction: {direction}")
+
+            rule = {
+                'id': generate_alert_id(),
+                'user': user,
+                'asset': asset,
+                'metric': metric,
+                'kind': kind,
+                'direction': direction,
+                'value': float(value),
+                'threshold': threshold,
+                'reference': reference,
+                'alert_type': alert_type,
+                'message': message,
+                'created_at': time.time(),
+            }
+            while rule['id'] in self._rules:
+                rule['id'] = generate_alert_id()
+
+            self._rules[rule['id']] = rule
+            self._index(asset, metric)[direction].insert(threshold, rule['id'])
+
+            # Keep the index invariant: fire straight away if already satisfied
+            if last is not None:
+                self._evaluate(asset, metric, last)
+        return rule
+
+    def remove_rule(self, rule_id: str) -> bool:
+        """Delete a pending rule"""
+        with self._lock:
+            rule = self._rules.pop(rule_id, None)
+            if rule is None:
+                return False
+            self._index(rule['asset'], rule['metric'])[rule['direction']].remove(rule['threshold'], rule_id)
+            return True
+
+    def rules(self, user: Optional[str] = None) -> List[Dict]:
+        """List pending rules, optionally for one user"""
+        with self._lock:
+            return [dict(r) for r in self._rules.values() if user is None or r['user'] == user]
+
+    def watched(self) -> List[Tuple[str, str]]:
+        """List (asset, metric) streams with pending rules"""
+        with self._lock:
+            return [key for key, index in self._indexes.items() if len(index['above']) or len(index['below'])]
+
+    def last_value(self, asset: str, metric: str = 'price') -> Optional[float]:
+        with self._lock:
+            return self._last_values.get((asset, metric))
+
+    def _evaluate(self, asset: str, metric: str, value: float) -> List[Dict]:
+        index = self._indexes.get((asset, metric))
+        if index is None:
+            return []
+        fired_ids = index['above'].pop_at_most(value) + index['below'].pop_at_least(value)
+        fired = []
+        for rule_id in fired_ids:
+            rule = self._rules.pop(rule_id)
+            notification = dict(rule, triggered_at=time.time(), triggered_value=value)
+            self._notifications.setdefault(rule['user'], deque(maxlen=MAX_NOTIFICATIONS)).append(notification)
+            fired.append(notification)
+        return fired
+
+    def on_tick(self, asset: str, value: float, metric: str = 'price') -> List[Dict]:
+        """
+        Feed a new observation and fire every rule it satisfies
+
+        Args:
+            asset: Asset identifier
+            value: New price or indicator value
+            metric: 'price' or an indicator key
+
+        Returns:
+            List of fired notifications
+        """
+        with self._lock:
+            self._last_values[(asset, metric)] = value
+            return self._evaluate(asset, metric, value)
+
+    def notifications(self, user: str, clear: bool = True) -> List[Dict]:
+        """
+        Get fired alerts for a user
+
+        Args:
+            user: Owner of the alerts
+            clear: Remove the returned notifications
+
+        Returns:
+            List of notifications, oldest first
+        """
+        with self._lock:
+            queue = self._notifications.get(user)
+            if not queue:
+                return []
+            items = list(queue)
+            if clear:
+                queue.clear()
+            return items
+
+
+def latest_rsi(prices, period: int = 14) -> Optional[float]:
+    """
+    Latest RSI of a price series (same rolling-mean formula as AI Insights)
+
+    Args:
+        prices: pandas Series of closes
+        period: RSI window
+
+    Returns:
+        RSI value, or None if there is not enough data
+    """
+    if len(prices) <= period:
+        return None
+    delta = prices.diff()
+    gain = delta.where(delta > 0, 0).rolling(window=period).mean().iloc[-1]
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean().iloc[-1]
+    if loss == 0:
+        return 100.0
+    return float(100 - 100 / (1 + gain / loss))
+
+
+def make_alert_job(engine: 'AlertEngine') -> Callable[[], None]:
+    """
+    Build the scheduler job that feeds prices and indicators into the engine
+
+    Only assets with pending rules are fetched, in a single simple/price call.
+    """
+
+    def job():
+        watched = engine.watched()
+        price_assets = sorted({asset for asset, metric in watched if metric == 'price'})
+        if price_assets:
+            try:
+                quotes = fetch_simple_prices(price_assets)
+            except requests.RequestException as e:
+                print(f"Alert price fetch failed: {e}")
+                quotes = {}
+            for asset, quote in quotes.items():
+                if 'usd' in quote:
+                    engine.on_tick(asset, float(quote['usd']))
+
+        for asset, metric in watched:
+            if metric == 'rsi':
+                sync_price_history(asset, 30)
+                value = latest_rsi(price_history_frame(asset, 30, tier='hour')['price'])
+                if value is not None:
+                    engine.on_tick(asset, value, metric)
+
+    return job
+
+
+_engine: Optional[AlertEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_alert_engine() -> AlertEngine:
+    """
+    Get the process-wide alert engine and make sure its job is scheduled
+
+    Returns:
+        AlertEngine singleton
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = AlertEngine()
+                get_scheduler().add_job('alerts', make_alert_job(_engine), PSI_REFRESH_INTERVAL)
+    return _engine
@@ -0,0 +1,284 @@
+"""
+PSI bonding curve engine for PSI Sovereign System
+Derives progress, implied price and market cap from the pump.fun curve account
+"""
+
+import base64
+import hashlib
+import struct
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from modules.config import PSI_BONDING_CURVE_ADDRESS, PSI_TOKEN_ADDRESS
+from modules.scheduler import get_scheduler
+from modules.solana_rpc import SolanaRPCError, get_solana_client
+
+PUMP_PROGRAM_ID = '6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P'
+BONDING_CURVE_SEED = b'bonding-curve'
+
+TOKEN_DECIMALS = 6
+LAMPORTS_PER_SOL = 1_000_000_000
+
+# Real token reserves a fresh pump.fun curve starts with (raw units); the
+# curve is complete when they reach zero
+INITIAL_REAL_TOKEN_RESERVES = 793_100_000 * 10 ** TOKEN_DECIMALS
+
+# Anchor discriminator, five u64 reserve/supply fields, completion flag
+_CURVE_LAYOUT = struct.Struct('<8sQQQQQ?')
+
+# Snapshots kept for charts
+HISTORY_SIZE = 1_000
+
+# Seconds between seed attempts until the curve account has been read once
+SEED_RETRY_INTERVAL = 15.0
+SEED_JOB = 'psi-bonding-curve-seed'
+
+_B58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+_ED25519_P = 2 ** 255 - 19
+_ED25519_D = -121665 * pow(121666, _ED25519_P - 2, _ED25519_P) % _ED25519_P
+
+
+# ---------- Solana address helpers ----------
+
+def b58decode(value: str) -> bytes:
+    number = 0
+    for char in value:
+        number = number * 58 + _B58_ALPHABET.index(char)
+    body = number.to_bytes((number.bit_length() + 7) // 8, 'big')
+    return b'\x00' * (len(value) - len(value.lstrip('1'))) + body
+
+
+def b58encode(data: bytes) -> str:
+    number = int.from_bytes(data, 'big')
+    chars = []
+    while number:
+        number, rem = divmod(number, 58)
+        chars.append(_B58_ALPHABET[rem])
+    return '1' * (len(data) - len(data.lstrip(b'\x00'))) + ''.join(reversed(chars))
+
+
+def _is_on_curve(point: bytes) -> bool:
+    """Whether 32 bytes decompress to an ed25519 point"""
+    y = int.from_bytes(point, 'little') & ((1 << 255) - 1)
+    if y >= _ED25519_P:
+        return False
+    p = _ED25519_P
+    x2 = (y * y - 1) * pow(_ED25519_D * y * y + 1, p - 2, p) % p
+    if x2 == 0:
+        return not point[31] >> 7
+    return pow(x2, (p - 1) // 2, p) == 1
+
+
+def find_program_address(seeds: Sequence[bytes], program_id: str) -> Tuple[str, int]:
+    """
+    Derive a program address (PDA) the way the Solana runtime does
+
+    Returns:
+        (base58 address, bump seed)
+    """
+    program = b58decode(program_id)
+    for bump in range(255, -1, -1):
+        digest = hashlib.sha256(b''.join(seeds) + bytes([bump]) + program + b'ProgramDerivedAddress').digest()
+        if not _is_on_curve(digest):
+            return b58encode(digest), bump
+    raise ValueError("No viable bump seed for program address")
+
+
+def bonding_curve_address(mint: str = PSI_TOKEN_ADDRESS) -> str:
+    """Bonding curve account of a pump.fun mint"""
+    return find_program_address([BONDING_CURVE_SEED, b58decode(mint)], PUMP_PROGRAM_ID)[0]
+
+
+# ---------- curve state ----------
+
+def decode_curve_account(data: bytes) -> Dict:
+    """
+    Parse bonding curve account data
+
+    Raises:
+        ValueError: If the data is too short for the curve layout
+    """
+    if len(data) < _CURVE_LAYOUT.size:
+        raise ValueError(f"Bonding curve account too short ({len(data)} bytes)")
+    _, virtual_token, virtual_sol, real_token, real_sol, supply, complete = _CURVE_LAYOUT.unpack_from(data)
+    return {
+        'virtual_token_reserves': virtual_token,
+        'virtual_sol_reserves': virtual_sol,
+        'real_token_reserves': real_token,
+        'real_sol_reserves': real_sol,
+        'token_total_supply': supply,
+        'complete': complete,
+    }
+
+
+def _account_bytes(account: Optional[Dict]) -> Optional[bytes]:
+    """Raw data from an RPC/websocket account info (base64 encoding)"""
+    if not account:
+        return None
+    data = account.get('data')
+    if isinstance(data, list) and len(data) == 2 and data[1] == 'base64':
+        return base64.b64decode(data[0])
+    return None
+
+
+class BondingCurveEngine:
+    """
+    Live bonding-curve metrics for one mint
+
+    Each account-change notification carries the full reserve state, so an
+    update decodes one fixed-size struct and recomputes a few ratios (O(1),
+    no history replay). The latest snapshot and a bounded history are kept
+    in the process-wide engine that every session reads.
+
+    States carry the slot they were read at; one from a slot not newer
+    than the last applied is ignored, so a late seed read never overwrites
+    a newer notification and a repeated state adds no history point.
+    """
+
+    def __init__(self, mint: str = PSI_TOKEN_ADDRESS, curve_address: Optional[str] = None):
+        self.mint = mint
+        self.curve_address = curve_address or PSI_BONDING_CURVE_ADDRESS or bonding_curve_address(mint)
+        self._lock = threading.Lock()
+        self._state: Optional[Dict] = None
+        self._slot: Optional[int] = None
+        self._history: deque = deque(maxlen=HISTORY_SIZE)
+        self.updates = 0
+
+    def apply(self, reserves: Dict, slot: Optional[int] = None) -> Optional[Dict]:
+        """
+        Recompute metrics from a reserve state
+
+        Args:
+            reserves: Decoded curve account
+            slot: Slot the state was read at (None applies it unconditionally)
+
+        Returns:
+            Metrics with 'progress' (percent), 'price_sol', 'market_cap_sol',
+            'real_sol' (SOL raised), 'complete', 'slot' and 'updated_at', or
+            None if the state is not newer than the one already applied
+        """
+        virtual_token = reserves['virtual_token_reserves']
+        token_scale = 10 ** TOKEN_DECIMALS
+        price_sol = (reserves['virtual_sol_reserves'] / LAMPORTS_PER_SOL) / (virtual_token / token_scale) \
+            if virtual_token else 0.0
+        if reserves['complete']:
+            progress = 100.0
+        else:
+            sold = INITIAL_REAL_TOKEN_RESERVES - reserves['real_token_reserves']
+            progress = min(max(sold / INITIAL_REAL_TOKEN_RESERVES * 100, 0.0), 100.0)
+
+        state = {
+            'progress': progress,
+            'price_sol': price_sol,
+            'market_cap_sol': price_sol * reserves['token_total_supply'] / token_scale,
+            'real_sol': reserves['real_sol_reserves'] / LAMPORTS_PER_SOL,
+            'complete': reserves['complete'],
+            'slot': slot,
+            'updated_at': time.time(),
+        }
+        with self._lock:
+            if slot is not None and self._slot is not None and slot <= self._slot:
+                return None
+            self._slot = slot if slot is not None else self._slot
+            self._state = state
+            self._history.append((state['updated_at'], price_sol, progress))
+            self.updates += 1
+        return state
+
+    def on_account(self, key, account: Optional[Dict], slot: Optional[int] = None):
+        """Subscription listener for curve account changes"""
+        data = _account_bytes(account)
+        if data is None:
+            return
+        try:
+            self.apply(decode_curve_account(data), slot)
+        except ValueError as e:
+            print(f"Bonding curve update ignored: {e}")
+
+    def seed(self) -> Optional[str]:
+        """
+        Load the current state with one RPC call
+
+        Returns:
+            Error message if the fetch failed, None otherwise
+        """
+        client = get_solana_client()
+        try:
+            result = client.batch(client.multiple_accounts_calls([self.curve_address]))[0]
+        except (requests.RequestException, SolanaRPCError) as e:
+            return str(e)
+        data = _account_bytes(result['value'][0])
+        if data is None:
+            return f"Bonding curve account {self.curve_address} not found"
+        try:
+            self.apply(decode_curve_account(data), result['context']['slot'])
+        except ValueError as e:
+            return str(e)
+        return None
+
+    def snapshot(self, sol_usd: Optional[float] = None) -> Optional[Dict]:
+        """
+        Latest metrics, with USD values when a SOL price is given
+
+        Returns:
+            Metrics dict (plus 'price_usd' and 'market_cap_usd'), or None before the first update
+        """
+        with self._lock:
+            if self._state is None:
+                return None
+            state = dict(self._state)
+        if sol_usd:
+            state['price_usd'] = state['price_sol'] * sol_usd
+            state['market_cap_usd'] = state['market_cap_sol'] * sol_usd
+        return state
+
+    def history(self) -> List[Tuple[float, float, float]]:
+        """(timestamp, price_sol, progress) for recent updates"""
+        with self._lock:
+            return list(self._history)
+
+
+def make_seed_job(engine: BondingCurveEngine) -> Callable[[], None]:
+    """
+    Scheduler job that seeds the engine, retried every interval until the
+    curve has a state (from the seed or a notification), then unregistered
+    """
+    def job():
+        if engine.snapshot() is None:
+            error = engine.seed()
+            if error:
+                raise RuntimeError(f"Bonding curve seed failed: {error}")
+        get_scheduler().remove_job(SEED_JOB)
+    return job
+
+
+_engine: Optional[BondingCurveEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_bonding_curve_engine() -> BondingCurveEngine:
+    """
+    Get the process-wide PSI curve engine, fed by account-change
+    notifications and seeded by a background job (never on the render path)
+
+    Returns:
+        BondingCurveEngine singleton (snapshot() is None until the first state arrives)
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                # solana-py/solders take ~0.3s to import; keep them off the page import path
+                from modules.solana_ws import get_subscription_manager
+
+                engine = BondingCurveEngine()
+                get_subscription_manager().subscribe_account(
+                    engine.curve_address, encoding='base64', listener=engine.on_account
+                )
+                get_scheduler().add_job(SEED_JOB, make_seed_job(engine), SEED_RETRY_INTERVAL)
+                _engine = engine
+    return _engine
@@ -0,0 +1,287 @@
+"""
+Function result cache for PSI Sovereign System
+Process-wide memoization with per-function stats, a byte budget with LRU eviction and targeted invalidation
+"""
+
+import functools
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from modules.config import CACHE_MAX_BYTES
+from modules.metrics import get_metrics_registry
+
+CacheKey = Tuple[str, Tuple[Tuple[str, Hashable], ...]]
+
+
+def estimate_size(value, _seen: Optional[set] = None) -> int:
+    """
+    Approximate bytes held by a cached value
+
+    DataFrames and arrays report their buffers; figures are sized by their
+    plotly JSON; containers are walked so a dict of DataFrames is not
+    counted as a few hundred bytes.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+
+    memory_usage = getattr(value, 'memory_usage', None)
+    if callable(memory_usage) and hasattr(value, 'index'):
+        usage = memory_usage(deep=True)
+        return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+    nbytes = getattr(value, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return nbytes
+    to_plotly_json = getattr(value, 'to_plotly_json', None)
+    if callable(to_plotly_json):
+        return estimate_size(to_plotly_json(), _seen)
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _seen) for item in value)
+    return size
+
+
+class _Entry:
+    __slots__ = ('value', 'size', 'created_at', 'last_access', 'hits')
+
+    def __init__(self, value, size: int):
+        self.value = value
+        self.size = size
+        self.created_at = self.last_access = time.time()
+        self.hits = 0
+
+
+class CacheManager:
+    """
+    Memoization store shared by every session in the process
+
+    Entries are keyed by function name plus the bound call arguments, so
+    invalidate('fetch_historical_data', coin_id='bitcoin') drops only the
+    bitcoin windows. One OrderedDict in access order backs every function:
+    when the total size exceeds the budget the least recently used entries
+    go first, whichever function they belong to. A per-function budget can
+    additionally cap one noisy function.
+
+    Concurrent misses for the same key wait for the first caller instead of
+    each going upstream.
+    """
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[CacheKey, _Entry]' = OrderedDict()
+        self._functions: Dict[str, Dict] = {}
+        self._inflight: Dict[CacheKey, threading.Event] = {}
+        self.total_bytes = 0
+
+    # ---------- registration ----------
+
+    def register(self, name: str, ttl: Optional[float], max_bytes: Optional[int] = None,
+                 max_entries: Optional[int] = None) -> Dict:
+        with self._lock:
+            info = self._functions.get(name)
+            if info is None:
+                info = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0,
+                        'entries': 0, 'bytes': 0}
+                self._functions[name] = info
+            info.update(ttl=ttl, max_bytes=max_bytes, max_entries=max_entries)
+            return info
+
+    # ---------- lookups ----------
+
+    def get_or_compute(self, key: CacheKey, compute: Callable[[], object]):
+        name = key[0]
+        while True:
+            with self._lock:
+                info = self._functions[name]
+                entry = self._entries.get(key)
+                if entry is not None and info['ttl'] is not None and time.time() - entry.created_at > info['ttl']:
+                    self._drop(key)
+                    entry = None
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    entry.last_access = time.time()
+                    entry.hits += 1
+                    info['hits'] += 1
+                    return entry.value
+                waiter = self._inflight.get(key)
+                if waiter is None:
+                    self._inflight[key] = threading.Event()
+                    info['misses'] += 1
+                    break
+            waiter.wait()
+
+        try:
+            value = compute()
+            self._store(key, value)
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+        return value
+
+    def _store(self, key: CacheKey, value):
+        size = estimate_size(value)
+        with self._lock:
+            info = self._functions[key[0]]
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(value, size)
+            info['entries'] += 1
+            info['bytes'] += size
+            self.total_bytes += size
+            self._enforce(key[0])
+
+    def _drop(self, key: CacheKey):
+        entry = self._entries.pop(key)
+        info = self._functions[key[0]]
+        info['entries'] -= 1
+        info['bytes'] -= entry.size
+        self.total_bytes -= entry.size
+
+    def _enforce(self, name: str):
+        """Evict least recently used entries until every budget holds (lock held)"""
+        info = self._functions[name]
+        limits = (info['max_bytes'], info['max_entries'])
+        if any(limit is not None for limit in limits):
+            own = (k for k in list(self._entries) if k[0] == name)
+            for key in own:
+                if (info['max_bytes'] is None or info['bytes'] <= info['max_bytes']) and \
+                        (info['max_entries'] is None or info['entries'] <= info['max_entries']):
+                    break
+                self._drop(key)
+                info['evictions'] += 1
+
+        # The newest entry is never evicted, even if it alone exceeds the budget
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            self._drop(key)
+            self._functions[key[0]]['evictions'] += 1
+
+    # ---------- invalidation ----------
+
+    def invalidate(self, name: Optional[str] = None, **match) -> int:
+        """
+        Drop cached results
+
+        Args:
+            name: Function name (None for every function)
+            **match: Only drop entries whose call arguments have these values
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if (name is None or key[0] == name)
+                and all(dict(key[1]).get(arg) == value for arg, value in match.items())
+            ]
+            for key in keys:
+                self._drop(key)
+                self._functions[key[0]]['invalidations'] += 1
+        return len(keys)
+
+    # ---------- reporting ----------
+
+    def stats(self) -> List[Dict]:
+        """
+        Per-function cache statistics
+
+        Returns:
+            Dicts with 'function', 'entries', 'bytes', 'hits', 'misses',
+            'hit_ratio', 'oldest_age', 'evictions', 'invalidations', 'ttl'
+        """
+        now = time.time()
+        with self._lock:
+            oldest: Dict[str, float] = {}
+            for (name, _), entry in self._entries.items():
+                oldest[name] = max(oldest.get(name, 0.0), now - entry.created_at)
+            rows = []
+            for name, info in sorted(self._functions.items()):
+                lookups = info['hits'] + info['misses']
+                rows.append({
+                    'function': name,
+                    'entries': info['entries'],
+                    'bytes': info['bytes'],
+                    'hits': info['hits'],
+                    'misses': info['misses'],
+                    'hit_ratio': info['hits'] / lookups if lookups else None,
+                    'oldest_age': oldest.get(name),
+                    'evictions': info['evictions'],
+                    'invalidations': info['invalidations'],
+                    'ttl': info['ttl'],
+                })
+            return rows
+
+    def entries(self, name: Optional[str] = None) -> List[Dict]:
+        """Individual entries, most recently used first, with their call arguments"""
+        now = time.time()
+        with self._lock:
+            return [
+                {'function': key[0], 'args': dict(key[1]), 'bytes': entry.size,
+                 'age': now - entry.created_at, 'idle': now - entry.last_access, 'hits': entry.hits}
+                for key, entry in reversed(self._entries.items())
+                if name is None or key[0] == name
+            ]
+
+
+_manager = CacheManager()
+
+
+def get_cache_manager() -> CacheManager:
+    """Process-wide cache shared by every session"""
+    return _manager
+
+
+def cached(ttl: Optional[float] = None, name: Optional[str] = None, max_bytes: Optional[int] = None,
+           max_entries: Optional[int] = None) -> Callable:
+    """
+    Cache a function's results in the process-wide CacheManager
+
+    Drop-in for `@st.cache_data(ttl=...)` on fetchers. DataFrames are
+    returned as copies so callers can add columns freely; other values are
+    shared and must be treated as read-only.
+
+    Args:
+        ttl: Seconds before an entry expires (None keeps it until evicted)
+        name: Cache name, defaults to the function name; pages rerun their
+            code, so the name is what ties reruns to the same entries
+        max_bytes: Optional budget for this function alone
+        max_entries: Optional entry cap for this function alone
+    """
+    def decorator(func: Callable) -> Callable:
+        cache_name = name or func.__name__
+        signature = inspect.signature(func)
+        _manager.register(cache_name, ttl, max_bytes, max_entries)
+        lookup_seconds = get_metrics_registry().histogram('psi_cache_lookup_seconds', function=cache_name)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (cache_name, tuple(bound.arguments.items()))
+            value = _manager.get_or_compute(key, lambda: func(*args, **kwargs))
+            lookup_seconds.observe(time.perf_counter() - started)
+            if hasattr(value, 'copy') and hasattr(value, 'index'):
+                return value.copy()
+            return value
+
+        wrapper.invalidate = lambda **match: _manager.invalidate(cache_name, **match)
+        return wrapper
+
+    return decorator
+
+
+def invalidate(name: Optional[str] = None, **match) -> int:
+    """Drop cached results of one function (optionally only matching arguments)"""
+    return _manager.invalidate(name, **match)
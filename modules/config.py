@@ -28,27 +28,78 @@ DEMO_PASSWORDS = {
 
 SESSION_TIMEOUT_MINUTES = int(os.getenv('SESSION_TIMEOUT', '60'))
 
+# Lock screen access-code hashes (generate with `python -m modules.credentials hash`); users without one cannot unlock
+ACCESS_CODE_HASHES = {
+    'whiteantwan58-tech': os.getenv('WHITEANTWAN58_TECH_ACCESS_HASH', ''),
+    'eve': os.getenv('EVE_ACCESS_HASH', '')
+}
+
+# scrypt cost: 128 * N * r bytes of memory per verification (16 MB at the defaults, ~0.1s)
+SCRYPT_N = int(os.getenv('SCRYPT_N', str(2 ** 14)))
+SCRYPT_R = int(os.getenv('SCRYPT_R', '8'))
+SCRYPT_P = int(os.getenv('SCRYPT_P', '1'))
+
+# Lock-screen users allowed on the Admin page (comma-separated)
+ADMIN_USERS = [user.strip().lower() for user in os.getenv('ADMIN_USERS', 'whiteantwan58-tech').split(',') if user.strip()]
+
+AUTH_WORKERS = int(os.getenv('AUTH_WORKERS', '2'))  # concurrent verifications per process
+AUTH_MAX_PENDING = int(os.getenv('AUTH_MAX_PENDING', '8'))  # queued verifications before new attempts are refused
+AUTH_WINDOW_SECONDS = int(os.getenv('AUTH_WINDOW_SECONDS', '300'))  # sliding window for the limits below
+AUTH_MAX_FAILURES = int(os.getenv('AUTH_MAX_FAILURES', '5'))  # failed codes per user and client
+AUTH_CLIENT_MAX_ATTEMPTS = int(os.getenv('AUTH_CLIENT_MAX_ATTEMPTS', '20'))  # attempts per client, any user
+AUTH_USER_MAX_FAILURES = int(os.getenv('AUTH_USER_MAX_FAILURES', '20'))  # failed codes per user, any client
+AUTH_RESERVED_PENDING = int(os.getenv('AUTH_RESERVED_PENDING', '4'))  # queue slots kept for users and clients without recent failures
+
 # ==================== PSI TOKEN CONFIGURATION ====================
 PSI_TOKEN_ADDRESS = os.getenv('PSI_TOKEN_ADDRESS', "7Avu2LscLpCNNDR8szDowyck3MCBecpCf1wHyjU3pump")
 WALLET_ADDRESS = os.getenv('WALLET_ADDRESS', "b59HHkFpg3g9yBwwLcuDH6z1d6d6z3vdGWX7mkX3txH")
 SOLANA_RPC_URL = os.getenv('SOLANA_RPC_URL', "https://api.mainnet-beta.solana.com")
+SOLANA_WS_URL = os.getenv('SOLANA_WS_URL', SOLANA_RPC_URL.replace('https://', 'wss://', 1).replace('http://', 'ws://', 1))
 
-# PSI Initial Values
-PSI_CURRENT_PRICE = 0.003466
+# pump.fun bonding curve account; derived from the mint when empty
+PSI_BONDING_CURVE_ADDRESS = os.getenv('PSI_BONDING_CURVE_ADDRESS', '')
+
+# PSI Initial Values (price and curve progress come from the on-chain curve account)
 PSI_INTERNAL_VALUE = 155.50
-PSI_BONDING_CURVE_PROGRESS = 0.0
+
+# ==================== MARKET DATA ====================
+COINGECKO_BASE_URL = os.getenv('COINGECKO_BASE_URL', "https://api.coingecko.com/api/v3")  # point at a stand-in for offline runs
 
 # ==================== DATA REFRESH INTERVALS ====================
 PSI_REFRESH_INTERVAL = int(os.getenv('PSI_REFRESH_INTERVAL', '30'))  # seconds
 CEC_WAM_REFRESH_INTERVAL = int(os.getenv('CEC_WAM_REFRESH_INTERVAL', '300'))  # seconds (5 minutes)
+FX_REFRESH_INTERVAL = int(os.getenv('FX_REFRESH_INTERVAL', '3600'))  # seconds (FX table, 1 hour)
+
+# ==================== CURRENCIES ====================
+# Prices are fetched once in USD; every other currency is derived from one FX table
+BASE_CURRENCY = 'USD'
+DEFAULT_CURRENCY = os.getenv('DEFAULT_CURRENCY', 'USD')
+CURRENCY_SYMBOLS = {
+    'USD': '$',
+    'EUR': '€',
+    'GBP': '£',
+    'JPY': '¥',
+    'CAD': 'CA$',
+    'AUD': 'A$',
+    'CHF': 'CHF ',
+    'INR': '₹'
+}
+ZERO_DECIMAL_CURRENCIES = ('JPY',)
 
 # ==================== GOOGLE DRIVE CONFIGURATION ====================
 GOOGLE_DRIVE_FOLDER_ID = os.getenv('GOOGLE_DRIVE_FOLDER_ID', "1mVGeZnOt49RWK3xO6c3OAA9ouaw3zBUI")
+GOOGLE_DRIVE_API_KEY = os.getenv('GOOGLE_DRIVE_API_KEY', '')  # for a publicly shared folder
+GOOGLE_DRIVE_ACCESS_TOKEN = os.getenv('GOOGLE_DRIVE_ACCESS_TOKEN', '')  # OAuth bearer token
+# Local directory standing in for Drive (one subdirectory per folder id); used instead of the API when set
+GOOGLE_DRIVE_STANDIN_DIR = os.getenv('GOOGLE_DRIVE_STANDIN_DIR', '')
 
 # CSV File names
 CEC_WAM_MASTER_LEDGER_SHEET = "🔝CEC_WAM_MASTER_LEDGER_LIVE - Sheet1.csv"
 CEC_WAM_MASTER_LEDGER_LOG = "🔝CEC_WAM_MASTER_LEDGER_LIVE - Log.csv"
 
+# Local directory holding the synced ledger files (kept apart from the app's own files)
+CEC_WAM_DATA_DIR = os.getenv('CEC_WAM_DATA_DIR', os.path.join('data', 'drive'))
+
 # ==================== UI THEME COLORS ====================
 COLORS = {
     'primary': '#00D9FF',      # Cyan
@@ -149,6 +200,31 @@ ALERT_TYPES = {
 # ==================== FILE PATHS ====================
 ACTIVITY_LOG_FILE = 'activity_log.csv'
 EXAMPLE_CEC_WAM_FILE = 'example_cec_wam.csv'
+EXAMPLE_ACTIVITY_LOG_FILE = 'example_activity_log.csv'
+PORTFOLIO_DB_FILE = os.getenv('PORTFOLIO_DB_FILE', 'portfolio.db')
+
+# ==================== ACTIVITY LOG WRITER ====================
+LOG_FLUSH_INTERVAL = float(os.getenv('LOG_FLUSH_INTERVAL', '1.0'))  # seconds
+LOG_FSYNC_POLICY = os.getenv('LOG_FSYNC_POLICY', 'interval')  # always, interval or never
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))  # rotate above this size (0 disables)
+LOG_MAX_AGE_SECONDS = int(os.getenv('LOG_MAX_AGE_SECONDS', '86400')) or None  # rotate daily (0 disables)
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+LOG_ARCHIVE_INTERVAL = int(os.getenv('LOG_ARCHIVE_INTERVAL', '3600'))  # seconds between Parquet archiving runs
+
+# ==================== STARTUP ====================
+COLD_START_BUDGET_SECONDS = float(os.getenv('COLD_START_BUDGET_SECONDS', '3.0'))  # startup imports, fresh interpreter
+
+# ==================== RESULT CACHE ====================
+CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', str(256 * 1024 * 1024)))  # all cached fetch results, LRU beyond this
+
+# ==================== SESSION MEMORY ====================
+SESSION_MAX_BYTES = int(os.getenv('SESSION_MAX_BYTES', str(32 * 1024 * 1024)))  # derived objects per session, LRU beyond this
+SESSION_MAX_OBJECTS = int(os.getenv('SESSION_MAX_OBJECTS', '24'))  # derived objects per session
+SESSION_IDLE_SHED_MINUTES = int(os.getenv('SESSION_IDLE_SHED_MINUTES', str(max(SESSION_TIMEOUT_MINUTES // 4, 1))))  # drop derived objects of idle sessions
+
+# ==================== METRICS ====================
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')  # local only; scrape through a sidecar or tunnel
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9464'))  # 0 disables the Prometheus endpoint
 
 # ==================== FONTS ====================
 FONT_HEADER = 'Orbitron'
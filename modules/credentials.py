@@ -0,0 +1,340 @@
+"""
+Credential verification for PSI Sovereign System
+Salted scrypt hashes checked on a small worker pool behind sliding-window rate limits
+"""
+
+import argparse
+import base64
+import functools
+import getpass
+import hashlib
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Hashable, Optional, Sequence, Tuple
+
+from modules.config import (
+    ACCESS_CODE_HASHES,
+    AUTH_CLIENT_MAX_ATTEMPTS,
+    AUTH_MAX_FAILURES,
+    AUTH_MAX_PENDING,
+    AUTH_RESERVED_PENDING,
+    AUTH_USER_MAX_FAILURES,
+    AUTH_WINDOW_SECONDS,
+    AUTH_WORKERS,
+    SCRYPT_N,
+    SCRYPT_P,
+    SCRYPT_R,
+)
+from modules.metrics import count, timed
+
+HASH_SCHEME = 'scrypt'
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+# Verification outcomes
+GRANTED = 'granted'
+DENIED = 'denied'
+RATE_LIMITED = 'rate_limited'
+BUSY = 'busy'
+
+
+# ---------- hashing ----------
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode().rstrip('=')
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # maxmem leaves headroom over the 128 * n * r bytes scrypt needs
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 2 ** 20, dklen=KEY_BYTES)
+
+
+def hash_password(password: str, n: int = SCRYPT_N, r: int = SCRYPT_R, p: int = SCRYPT_P,
+                  salt: Optional[bytes] = None) -> str:
+    """
+    Hash a password with scrypt and a random salt
+
+    Returns:
+        'scrypt$n$r$p$salt$key' (base64 salt and key), safe to store in an environment variable
+    """
+    salt = os.urandom(SALT_BYTES) if salt is None else salt
+    key = _scrypt(password, salt, n, r, p)
+    return f"{HASH_SCHEME}${n}${r}${p}${_b64encode(salt)}${_b64encode(key)}"
+
+
+def parse_hash(stored: str) -> Tuple[int, int, int, bytes, bytes]:
+    """
+    Split a stored hash into its parameters
+
+    Returns:
+        (n, r, p, salt, key)
+
+    Raises:
+        ValueError: If stored is not a hash produced by hash_password
+    """
+    parts = stored.split('$')
+    if len(parts) != 6 or parts[0] != HASH_SCHEME:
+        raise ValueError("Not an scrypt password hash")
+    n, r, p = (int(value) for value in parts[1:4])
+    return n, r, p, _b64decode(parts[4]), _b64decode(parts[5])
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """Check a password against a stored hash in constant time (False for malformed hashes)"""
+    try:
+        n, r, p, salt, key = parse_hash(stored)
+    except ValueError:
+        return False
+    return hmac.compare_digest(_scrypt(password, salt, n, r, p), key)
+
+
+@functools.lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    """Hash unknown users are checked against so they cost as much as known ones (built on first use)"""
+    return hash_password('', salt=bytes(SALT_BYTES))
+
+
+# ---------- rate limiting ----------
+
+class SlidingWindowLimiter:
+    """
+    Counts events per key over the last `window` seconds
+
+    Each key keeps at most `limit` timestamps, so memory per key is
+    bounded however hard it is hammered; keys with no recent events are
+    pruned as new ones arrive.
+    """
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self._events: Dict[Hashable, deque] = {}
+        self._lock = threading.Lock()
+
+    def _recent(self, key: Hashable, now: float) -> Optional[deque]:
+        events = self._events.get(key)
+        if events is not None:
+            while events and events[0] <= now - self.window:
+                events.popleft()
+            if not events:
+                del self._events[key]
+                return None
+        return events
+
+    def retry_after(self, key: Hashable, now: Optional[float] = None) -> float:
+        """Seconds until key may act again (0 if it is under the limit)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            events = self._recent(key, now)
+            if events is None or len(events) < self.limit:
+                return 0.0
+            return events[0] + self.window - now
+
+    def recent(self, key: Hashable, now: Optional[float] = None) -> int:
+        """Events recorded for key within the window (at most `limit`)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            events = self._recent(key, now)
+            return 0 if events is None else len(events)
+
+    def hit(self, key: Hashable, now: Optional[float] = None):
+        """Record one event for key"""
+        now = time.time() if now is None else now
+        with self._lock:
+            if len(self._events) > 10_000:
+                for stale in list(self._events):
+                    self._recent(stale, now)
+            events = self._recent(key, now)
+            if events is None:
+                events = self._events[key] = deque(maxlen=self.limit)
+            events.append(now)
+
+    def reset(self, key: Hashable):
+        with self._lock:
+            self._events.pop(key, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._events)
+
+
+# ---------- verifier ----------
+
+def _completed(result: Dict) -> Future:
+    future: Future = Future()
+    future.set_result(result)
+    return future
+
+
+class CredentialVerifier:
+    """
+    Checks access codes off the script thread
+
+    submit() returns a Future immediately; the scrypt work runs on a small
+    thread pool (hashlib releases the GIL while hashing), so a page can
+    show progress and poll instead of blocking its rerun.
+
+    Cost stays bounded under brute force:
+    - at most `workers` hashes run at once and `max_pending` wait, beyond
+      that attempts are refused as BUSY without hashing;
+    - `reserved_pending` of those slots only take attempts from users and
+      clients with no failures in the window, so a flood of wrong codes
+      cannot push everyone else into BUSY;
+    - a client may try `client_max_attempts` codes per window across all
+      users, and `max_failures` wrong codes per user within the window;
+    - those limits are keyed by user and client together, so one attacker
+      cannot lock a legitimate user out from another client, and a success
+      clears that user's failures for the client;
+    - a user also takes at most `user_max_failures` wrong codes per window
+      from all clients together, which caps guessing when the client id
+      is only a per-session value that an attacker can renew at will.
+    """
+
+    def __init__(self, credentials: Optional[Dict[str, str]] = None, workers: int = AUTH_WORKERS,
+                 max_pending: int = AUTH_MAX_PENDING, reserved_pending: int = AUTH_RESERVED_PENDING,
+                 max_failures: int = AUTH_MAX_FAILURES, user_max_failures: int = AUTH_USER_MAX_FAILURES,
+                 client_max_attempts: int = AUTH_CLIENT_MAX_ATTEMPTS, window: float = AUTH_WINDOW_SECONDS):
+        self.credentials = {user.lower(): stored for user, stored in (credentials or ACCESS_CODE_HASHES).items()}
+        self.max_pending = max_pending
+        # Attempts with recent failures may only fill the unreserved slots (at least one)
+        self.suspect_max_pending = max(max_pending - reserved_pending, 1)
+        self.failures = SlidingWindowLimiter(max_failures, window)
+        self.user_failures = SlidingWindowLimiter(user_max_failures, window)
+        self.client_failures = SlidingWindowLimiter(client_max_attempts, window)
+        self.attempts = SlidingWindowLimiter(client_max_attempts, window)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="psi-auth")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def is_configured(self, username: str) -> bool:
+        """Whether username has an access-code hash set"""
+        return bool(self.credentials.get(username.lower()))
+
+    def submit(self, username: str, password: str, client: str) -> Future:
+        """
+        Queue a verification
+
+        Args:
+            username: Claimed user (case-insensitive)
+            password: Access code entered
+            client: Client identity (address or session id) for rate limiting
+
+        Returns:
+            Future resolving to {'status': GRANTED | DENIED | RATE_LIMITED | BUSY,
+            'user': username, 'retry_after': seconds}
+        """
+        user = username.strip().lower()
+        retry_after = max(
+            self.failures.retry_after((user, client)),
+            self.user_failures.retry_after(user),
+            self.attempts.retry_after(client),
+        )
+        if retry_after > 0:
+            count('psi_auth_attempt', outcome=RATE_LIMITED)
+            return _completed({'status': RATE_LIMITED, 'user': user, 'retry_after': retry_after})
+
+        suspect = self.user_failures.recent(user) > 0 or self.client_failures.recent(client) > 0
+        limit = self.suspect_max_pending if suspect else self.max_pending
+        with self._lock:
+            if self._pending >= limit:
+                count('psi_auth_attempt', outcome=BUSY)
+                return _completed({'status': BUSY, 'user': user, 'retry_after': 1.0})
+            self._pending += 1
+
+        self.attempts.hit(client)
+        try:
+            return self._executor.submit(self._verify, user, password, client)
+        except RuntimeError:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+    @timed('psi_auth_verify')
+    def _verify(self, user: str, password: str, client: str) -> Dict:
+        try:
+            stored = self.credentials.get(user)
+            valid = verify_password(password, stored or _dummy_hash()) and bool(stored)
+            if valid:
+                self.failures.reset((user, client))
+            else:
+                self.failures.hit((user, client))
+                self.user_failures.hit(user)
+                self.client_failures.hit(client)
+            count('psi_auth_attempt', outcome=GRANTED if valid else DENIED)
+            return {'status': GRANTED if valid else DENIED, 'user': user, 'retry_after': 0.0}
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self) -> Dict:
+        """Pending verifications and tracked limiter keys"""
+        with self._lock:
+            pending = self._pending
+        return {'pending': pending, 'failure_keys': len(self.failures), 'user_failure_keys': len(self.user_failures),
+                'client_keys': len(self.attempts)}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+_verifier: Optional[CredentialVerifier] = None
+_verifier_lock = threading.Lock()
+
+
+def get_credential_verifier() -> CredentialVerifier:
+    """
+    Get the process-wide credential verifier
+
+    Returns:
+        CredentialVerifier singleton
+    """
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = CredentialVerifier()
+    return _verifier
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m modules.credentials', description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('hash', help="hash an access code for ACCESS_CODE_HASHES")
+    bench = commands.add_parser('bench', help="time one verification at the configured cost")
+    bench.add_argument('--runs', type=int, default=5)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'hash':
+        code = getpass.getpass("Access code: ")
+        if not code or code != getpass.getpass("Repeat: "):
+            print("Access codes are empty or do not match")
+            return 1
+        print(hash_password(code))
+        return 0
+
+    stored = hash_password('benchmark')
+    durations = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        verify_password('benchmark', stored)
+        durations.append(time.perf_counter() - started)
+    durations.sort()
+    print(f"scrypt n={SCRYPT_N} r={SCRYPT_R} p={SCRYPT_P}: {durations[len(durations) // 2] * 1000:.1f} ms median, "
+          f"{128 * SCRYPT_N * SCRYPT_R / 2 ** 20:.0f} MB per verification, "
+          f"up to {AUTH_WORKERS} concurrent")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
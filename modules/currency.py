@@ -0,0 +1,168 @@
+"""
+Currency conversion for PSI Sovereign System
+One USD price fetch plus one cached FX table; every quote currency is derived locally
+"""
+
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import requests
+
+from modules.cache import cached
+from modules.config import (
+    BASE_CURRENCY,
+    COINGECKO_BASE_URL,
+    CURRENCY_SYMBOLS,
+    FX_REFRESH_INTERVAL,
+    ZERO_DECIMAL_CURRENCIES,
+)
+from modules.metrics import timed
+from modules.startup import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Units per 1 USD, used until the first FX fetch succeeds
+FALLBACK_FX_RATES = {
+    'USD': 1.0,
+    'EUR': 0.92,
+    'GBP': 0.79,
+    'JPY': 150.0,
+    'CAD': 1.36,
+    'AUD': 1.52,
+    'CHF': 0.88,
+    'INR': 83.0
+}
+
+# CoinGecko simple/price fields that carry an amount (the 24h change is a percentage)
+QUOTE_FIELDS = {
+    'price': '',
+    'market_cap': '_market_cap',
+    'volume_24h': '_24h_vol'
+}
+
+
+@cached(ttl=FX_REFRESH_INTERVAL)
+@timed('psi_fetch', function='fetch_fx_table')
+def fetch_fx_table() -> Tuple['pd.Series', Optional[str]]:
+    """
+    Fetch units of every fiat currency per 1 USD
+
+    CoinGecko's exchange_rates endpoint quotes everything against BTC in a
+    single response, so one request yields the whole table.
+
+    Returns:
+        (Series indexed by upper-case ISO code, error message or None)
+    """
+    try:
+        response = requests.get(f"{COINGECKO_BASE_URL}/exchange_rates", timeout=10)
+        response.raise_for_status()
+        rates = response.json()['rates']
+        per_btc = pd.Series({code.upper(): rate['value'] for code, rate in rates.items() if rate.get('type') == 'fiat'})
+        return per_btc / per_btc[BASE_CURRENCY], None
+    except (requests.RequestException, KeyError, ValueError) as e:
+        return pd.Series(FALLBACK_FX_RATES), str(e)
+
+
+def fx_rates(currencies: Optional[Iterable[str]] = None) -> 'pd.Series':
+    """
+    Units per 1 USD for the given (or all supported) currencies
+
+    Currencies missing from the live table fall back to FALLBACK_FX_RATES.
+    """
+    table, _ = fetch_fx_table()
+    codes = list(currencies) if currencies is not None else list(CURRENCY_SYMBOLS)
+    return table.reindex(codes).fillna(pd.Series(FALLBACK_FX_RATES))
+
+
+def fx_rate(currency: str, base: str = BASE_CURRENCY) -> float:
+    """Units of currency per one unit of base"""
+    if currency == base:
+        return 1.0
+    rates = fx_rates([currency, base])
+    return float(rates[currency] / rates[base])
+
+
+def convert(values, currency: str, base: str = BASE_CURRENCY):
+    """
+    Convert amounts from base to currency
+
+    Works on scalars, numpy arrays, Series and DataFrames alike (one multiply).
+    """
+    return values * fx_rate(currency, base)
+
+
+def to_base(values, currency: str, base: str = BASE_CURRENCY):
+    """Convert amounts entered in currency back to base"""
+    return values / fx_rate(currency, base)
+
+
+def convert_columns(df: 'pd.DataFrame', columns: Sequence[str], currency: str,
+                    base: str = BASE_CURRENCY) -> 'pd.DataFrame':
+    """
+    Copy of df with the given amount columns converted to currency
+
+    Columns not present in df are ignored.
+    """
+    if currency == base:
+        return df
+    df = df.copy()
+    present = [column for column in columns if column in df.columns]
+    df[present] = df[present] * fx_rate(currency, base)
+    return df
+
+
+def cross_rates(base_prices: 'pd.Series', currencies: Optional[Sequence[str]] = None) -> 'pd.DataFrame':
+    """
+    Every asset quoted in every currency from USD prices
+
+    Args:
+        base_prices: USD price per asset
+        currencies: Quote currencies (all supported if None)
+
+    Returns:
+        DataFrame indexed by asset with one column per currency (outer product)
+    """
+    rates = fx_rates(currencies)
+    return pd.DataFrame(
+        np.outer(base_prices.to_numpy(dtype=float), rates.to_numpy()),
+        index=base_prices.index,
+        columns=rates.index
+    )
+
+
+def localize_quotes(quotes: Dict[str, Dict[str, float]], currency: str) -> 'pd.DataFrame':
+    """
+    Turn CoinGecko USD simple/price quotes into a table in currency
+
+    Args:
+        quotes: Mapping of coin id to 'usd', 'usd_24h_change', 'usd_market_cap', 'usd_24h_vol'
+        currency: Quote currency
+
+    Returns:
+        DataFrame indexed by coin id with 'price', 'change_24h', 'market_cap'
+        and 'volume_24h' (amounts in currency, change in percent)
+    """
+    base = BASE_CURRENCY.lower()
+    table = pd.DataFrame.from_dict(quotes, orient='index')
+    localized = pd.DataFrame(index=table.index)
+    for name, suffix in QUOTE_FIELDS.items():
+        localized[name] = table.get(base + suffix, pd.Series(0.0, index=table.index)).astype(float)
+    localized = convert(localized, currency)
+    localized.insert(1, 'change_24h', table.get(f"{base}_24h_change", pd.Series(0.0, index=table.index)).astype(float))
+    return localized.fillna(0.0)
+
+
+def currency_symbol(currency: str) -> str:
+    return CURRENCY_SYMBOLS.get(currency, currency + ' ')
+
+
+def currency_decimals(currency: str) -> int:
+    """Decimal places for ordinary amounts (0 for currencies like JPY)"""
+    return 0 if currency in ZERO_DECIMAL_CURRENCIES else 2
+
+
+def money_format(currency: str, decimals: Optional[int] = None) -> str:
+    """printf-style format for st.column_config.NumberColumn"""
+    if decimals is None:
+        decimals = currency_decimals(currency)
+    return f"{currency_symbol(currency)}%.{decimals}f"
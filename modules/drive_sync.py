@@ -0,0 +1,378 @@
+"""
+Google Drive delta sync for PSI Sovereign System
+Mirrors changed ledger files from a Drive folder into the local data directory
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import requests
+
+from modules.config import (
+    CEC_WAM_DATA_DIR,
+    CEC_WAM_MASTER_LEDGER_LOG,
+    CEC_WAM_MASTER_LEDGER_SHEET,
+    GOOGLE_DRIVE_ACCESS_TOKEN,
+    GOOGLE_DRIVE_API_KEY,
+    GOOGLE_DRIVE_FOLDER_ID,
+    GOOGLE_DRIVE_STANDIN_DIR,
+)
+
+DRIVE_API_URL = "https://www.googleapis.com/drive/v3"
+
+# Google Sheets have no binary content; they are exported as CSV
+SPREADSHEET_MIME = 'application/vnd.google-apps.spreadsheet'
+
+DOWNLOAD_CHUNK = 256 * 1024
+
+MANIFEST_NAME = '.drive_sync.json'
+PARTIAL_DIR = '.drive_partial'
+
+
+class GoogleDriveBackend:
+    """
+    Drive v3 REST access with one pooled HTTP session
+
+    Files are described as dicts with 'id', 'name', 'version' (changes on
+    every modification), 'modifiedTime', 'size', 'md5Checksum' and
+    'exportable' (a Sheet that must be exported rather than downloaded).
+    """
+
+    def __init__(self, api_key: str = GOOGLE_DRIVE_API_KEY, access_token: str = GOOGLE_DRIVE_ACCESS_TOKEN):
+        self.api_key = api_key
+        self.session = requests.Session()
+        if access_token:
+            self.session.headers['Authorization'] = f"Bearer {access_token}"
+
+    def _params(self, **params) -> Dict:
+        if self.api_key:
+            params['key'] = self.api_key
+        return params
+
+    def list_files(self, folder_id: str) -> List[Dict]:
+        """
+        List the files in a folder
+
+        Raises:
+            requests.RequestException: If the request fails
+        """
+        files, page_token = [], None
+        while True:
+            response = self.session.get(
+                f"{DRIVE_API_URL}/files",
+                params=self._params(
+                    q=f"'{folder_id}' in parents and trashed = false",
+                    fields="nextPageToken, files(id, name, mimeType, modifiedTime, version, size, md5Checksum)",
+                    pageSize=1000,
+                    pageToken=page_token
+                ),
+                timeout=15
+            )
+            response.raise_for_status()
+            data = response.json()
+            for item in data.get('files', []):
+                exportable = item.get('mimeType') == SPREADSHEET_MIME
+                files.append({
+                    'id': item['id'],
+                    'name': f"{item['name']}.csv" if exportable and not item['name'].endswith('.csv') else item['name'],
+                    'version': item.get('version') or item.get('modifiedTime'),
+                    'modifiedTime': item.get('modifiedTime'),
+                    'size': int(item['size']) if 'size' in item else None,
+                    'md5Checksum': item.get('md5Checksum'),
+                    'exportable': exportable,
+                })
+            page_token = data.get('nextPageToken')
+            if not page_token:
+                return files
+
+    def download(self, file: Dict, start: int = 0) -> Iterator[bytes]:
+        """
+        Stream file content from a byte offset
+
+        Exports cannot be ranged; callers must pass start=0 for them.
+
+        Raises:
+            requests.RequestException: If the request fails
+        """
+        if file['exportable']:
+            url, params = f"{DRIVE_API_URL}/files/{file['id']}/export", self._params(mimeType='text/csv')
+        else:
+            url, params = f"{DRIVE_API_URL}/files/{file['id']}", self._params(alt='media')
+        headers = {'Range': f"bytes={start}-"} if start else {}
+        with self.session.get(url, params=params, headers=headers, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            if start and response.status_code != 206:
+                raise requests.RequestException(f"Range request for {file['name']} was not honoured")
+            yield from response.iter_content(DOWNLOAD_CHUNK)
+
+
+class LocalDriveStandIn:
+    """
+    Drive backend served from the local filesystem
+
+    Each folder id is a subdirectory of root. Versions come from mtime and
+    size, checksums are real MD5s, and ranged downloads are supported, so
+    sync behaviour can be exercised and benchmarked offline. fail_after
+    aborts a download after that many bytes to simulate a dropped
+    connection.
+    """
+
+    def __init__(self, root: str, fail_after: Optional[int] = None):
+        self.root = root
+        self.fail_after = fail_after
+        self.requests = 0
+        self.bytes_served = 0
+        self._md5_cache: Dict[str, tuple] = {}
+
+    def _md5(self, path: str, version: str) -> str:
+        cached = self._md5_cache.get(path)
+        if cached and cached[0] == version:
+            return cached[1]
+        digest = hashlib.md5()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(DOWNLOAD_CHUNK), b''):
+                digest.update(block)
+        self._md5_cache[path] = (version, digest.hexdigest())
+        return digest.hexdigest()
+
+    def list_files(self, folder_id: str) -> List[Dict]:
+        self.requests += 1
+        folder = os.path.join(self.root, folder_id)
+        files = []
+        for entry in os.scandir(folder):
+            if not entry.is_file() or entry.name.startswith('.'):
+                continue
+            stat = entry.stat()
+            version = f"{stat.st_mtime_ns}-{stat.st_size}"
+            files.append({
+                'id': os.path.join(folder_id, entry.name),
+                'name': entry.name,
+                'version': version,
+                'modifiedTime': datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(),
+                'size': stat.st_size,
+                'md5Checksum': self._md5(entry.path, version),
+                'exportable': False,
+            })
+        return files
+
+    def download(self, file: Dict, start: int = 0) -> Iterator[bytes]:
+        self.requests += 1
+        sent = 0
+        with open(os.path.join(self.root, file['id']), 'rb') as f:
+            f.seek(start)
+            for block in iter(lambda: f.read(DOWNLOAD_CHUNK), b''):
+                if self.fail_after is not None and sent + len(block) > self.fail_after:
+                    block = block[:self.fail_after - sent]
+                    self.bytes_served += len(block)
+                    yield block
+                    raise requests.ConnectionError(f"Simulated disconnect after {self.fail_after} bytes")
+                sent += len(block)
+                self.bytes_served += len(block)
+                yield block
+
+
+class DriveSync:
+    """
+    Delta sync of one Drive folder into a local directory
+
+    A manifest records the version of every file already mirrored, so a
+    sync lists the folder once and downloads only files whose version
+    changed. Downloads go to a partial file tagged with the remote version;
+    an interrupted download of the same version resumes with a ranged
+    request. Completed files are checked against size and MD5, fsynced and
+    moved into place with os.replace, so the ledger loader never sees a
+    half-written CSV.
+
+    Only the files named in `names` are mirrored (the ledger sheet and log
+    by default); anything else in the folder is counted as ignored, so a
+    shared folder cannot drop arbitrary files next to the app.
+    """
+
+    def __init__(self, backend, folder_id: str = GOOGLE_DRIVE_FOLDER_ID, dest_dir: str = CEC_WAM_DATA_DIR,
+                 names: Iterable[str] = (CEC_WAM_MASTER_LEDGER_SHEET, CEC_WAM_MASTER_LEDGER_LOG)):
+        self.backend = backend
+        self.folder_id = folder_id
+        self.dest_dir = dest_dir
+        self.names = frozenset(names)
+        self.partial_dir = os.path.join(dest_dir, PARTIAL_DIR)
+        self.manifest_path = os.path.join(dest_dir, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self.manifest: Dict[str, Dict] = self._load_manifest()
+        self.last_result: Optional[Dict] = None
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _local_path(self, file: Dict) -> str:
+        """
+        Destination of a remote file inside dest_dir
+
+        Raises:
+            ValueError: If the remote name is not a plain file name (it has
+                path separators, is '.'/'..' or shadows the sync metadata)
+        """
+        name = file['name']
+        if (os.path.basename(name.replace('\\', '/')) != name
+                or name in ('', '.', '..', MANIFEST_NAME, PARTIAL_DIR)):
+            raise ValueError(f"Refusing unsafe file name {name!r}")
+        return os.path.join(self.dest_dir, name)
+
+    def _is_current(self, file: Dict) -> bool:
+        entry = self.manifest.get(file['id'])
+        return (
+            entry is not None
+            and entry['version'] == file['version']
+            and entry['name'] == file['name']
+            and os.path.exists(self._local_path(file))
+        )
+
+    def _partial_paths(self, file: Dict) -> tuple:
+        key = hashlib.sha1(file['id'].encode()).hexdigest()
+        return os.path.join(self.partial_dir, f"{key}.part"), os.path.join(self.partial_dir, f"{key}.json")
+
+    def _fetch(self, file: Dict) -> Dict:
+        """Download one file into place; returns bytes transferred and whether it resumed"""
+        dest_path = self._local_path(file)
+        os.makedirs(self.partial_dir, exist_ok=True)
+        part_path, meta_path = self._partial_paths(file)
+
+        start = 0
+        try:
+            with open(meta_path) as f:
+                if json.load(f).get('version') == file['version'] and not file['exportable']:
+                    start = os.path.getsize(part_path)
+        except (OSError, ValueError):
+            pass
+        if file['size'] is not None and start > file['size']:
+            start = 0
+        if start == 0:
+            with open(meta_path, 'w') as f:
+                json.dump({'version': file['version'], 'name': file['name']}, f)
+
+        transferred = 0
+        # A partial file that already holds every byte (interrupted before the
+        # rename) only needs verifying; a ranged request past the end would fail
+        if not (start and start == file['size']):
+            with open(part_path, 'r+b' if start else 'wb') as out:
+                out.seek(start)
+                out.truncate()
+                for block in self.backend.download(file, start):
+                    out.write(block)
+                    transferred += len(block)
+                out.flush()
+                os.fsync(out.fileno())
+
+        if file['size'] is not None and os.path.getsize(part_path) != file['size']:
+            os.remove(part_path)
+            raise ValueError(f"Size mismatch for {file['name']}")
+        if file['md5Checksum']:
+            digest = hashlib.md5()
+            with open(part_path, 'rb') as f:
+                for block in iter(lambda: f.read(DOWNLOAD_CHUNK), b''):
+                    digest.update(block)
+            if digest.hexdigest() != file['md5Checksum']:
+                os.remove(part_path)
+                raise ValueError(f"Checksum mismatch for {file['name']}")
+
+        os.replace(part_path, dest_path)
+        os.remove(meta_path)
+        return {'bytes': transferred, 'resumed': start > 0}
+
+    def sync(self) -> Dict:
+        """
+        Bring the local directory up to date with the Drive folder
+
+        Returns:
+            Stats with 'listed', 'downloaded', 'skipped', 'ignored' (not a
+            configured name), 'resumed', 'bytes', 'errors' (file name to
+            message) and 'duration'
+        """
+        with self._lock:
+            started = time.perf_counter()
+            result = {'listed': 0, 'downloaded': 0, 'skipped': 0, 'ignored': 0, 'resumed': 0, 'bytes': 0,
+                      'errors': {}}
+            os.makedirs(self.dest_dir, exist_ok=True)
+            try:
+                files = self.backend.list_files(self.folder_id)
+            except (OSError, requests.RequestException) as e:
+                result['errors']['<listing>'] = str(e)
+                files = []
+
+            result['listed'] = len(files)
+            for file in files:
+                if file['name'] not in self.names:
+                    result['ignored'] += 1
+                    continue
+                try:
+                    if self._is_current(file):
+                        result['skipped'] += 1
+                        continue
+                    fetched = self._fetch(file)
+                except (OSError, ValueError, requests.RequestException) as e:
+                    result['errors'][file['name']] = str(e)
+                    continue
+                self.manifest[file['id']] = {
+                    'name': file['name'],
+                    'version': file['version'],
+                    'modifiedTime': file['modifiedTime'],
+                    'size': file['size'],
+                    'md5Checksum': file['md5Checksum'],
+                    'synced_at': time.time(),
+                }
+                self._save_manifest()
+                result['downloaded'] += 1
+                result['resumed'] += int(fetched['resumed'])
+                result['bytes'] += fetched['bytes']
+
+            result['duration'] = time.perf_counter() - started
+            self.last_result = result
+            return result
+
+
+def default_backend():
+    """
+    Backend from configuration: the local stand-in if GOOGLE_DRIVE_STANDIN_DIR
+    is set, the Drive API if credentials are set, otherwise None
+    """
+    if GOOGLE_DRIVE_STANDIN_DIR:
+        return LocalDriveStandIn(GOOGLE_DRIVE_STANDIN_DIR)
+    if GOOGLE_DRIVE_API_KEY or GOOGLE_DRIVE_ACCESS_TOKEN:
+        return GoogleDriveBackend()
+    return None
+
+
+_sync: Optional[DriveSync] = None
+_sync_lock = threading.Lock()
+
+
+def get_drive_sync() -> Optional[DriveSync]:
+    """
+    Get the process-wide Drive sync (run by the ledger refresh job)
+
+    Returns:
+        DriveSync singleton, or None when no Drive backend is configured
+    """
+    global _sync
+    if _sync is None:
+        with _sync_lock:
+            if _sync is None:
+                backend = default_backend()
+                if backend is None:
+                    return None
+                _sync = DriveSync(backend)
+    return _sync
@@ -0,0 +1,233 @@
+"""
+Portfolio equity curve for PSI Sovereign System
+Joins lot acquisitions and sales with stored price history into a value/drawdown series
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from modules.portfolio import PortfolioEngine
+from modules.startup import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+FREQUENCIES = {
+    'daily': 86_400,
+    'hourly': 3_600,
+}
+
+# coin -> (ascending unix seconds, prices)
+PriceHistory = Dict[str, Tuple['np.ndarray', 'np.ndarray']]
+
+# Positions below this are treated as closed (float dust) and need no price
+_EPSILON = 1e-12
+
+
+def _prices_on_grid(history: Optional[Tuple['np.ndarray', 'np.ndarray']], grid: 'np.ndarray',
+                    step: int) -> 'np.ndarray':
+    """Last known price at the close of each grid bucket (NaN before history starts)"""
+    if history is None or len(history[0]) == 0:
+        return np.full(len(grid), np.nan)
+    ts, prices = history
+    idx = np.searchsorted(ts, grid + step, side='left') - 1
+    return np.where(idx >= 0, prices[np.clip(idx, 0, len(prices) - 1)], np.nan)
+
+
+class EquityCurve:
+    """
+    Incrementally maintained portfolio value series
+
+    The first update builds cumulative position arrays for every held coin
+    in one vectorized pass. Later updates only extend the series from the
+    last closed bucket, so each new day (or hour) costs O(assets) as long as
+    no lot was removed and nothing was back-dated.
+
+    Sales lower the position from the bucket they happen in; 'invested' is
+    net of them (purchase cost minus sale proceeds), so value minus invested
+    is the total P/L including realized gains.
+
+    A bucket is only closed once every coin held in it has a price; buckets
+    from the first unpriced one on are recomputed on the next update, so
+    history that arrives late still fills them in.
+    """
+
+    def __init__(self, frequency: str = 'daily'):
+        self.step = FREQUENCIES[frequency]
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        # Lot ids, and negated sale ids, already applied
+        self._event_ids = np.zeros(0, dtype=np.int64)
+        self._coins: List[str] = []
+        self._positions = np.zeros(0)
+        self._invested = 0.0
+        self._peaks: List[float] = []
+        self._timestamps: List[int] = []
+        self._values: List[float] = []
+        self._invested_series: List[float] = []
+        self._drawdowns: List[float] = []
+
+    def _append(self, timestamps: 'np.ndarray', positions: 'np.ndarray', invested: 'np.ndarray',
+                histories: PriceHistory) -> 'np.ndarray':
+        """
+        Value position snapshots (coins x points) and append them to the series
+
+        Returns:
+            Boolean array marking the points where every held coin had a price
+        """
+        prices = np.vstack([_prices_on_grid(histories.get(c), timestamps, self.step) for c in self._coins])
+        held = np.abs(positions) > _EPSILON
+        priced = ~(held & np.isnan(prices)).any(axis=0)
+        values = np.where(priced, np.where(held, positions * prices, 0.0).sum(axis=0), np.nan)
+        previous_peak = self._peaks[-1] if self._peaks else 0.0
+        peaks = np.fmax.accumulate(np.concatenate(([previous_peak], values)))[1:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdowns = np.where(peaks > 0, values / peaks - 1, 0.0)
+
+        self._timestamps.extend(timestamps.tolist())
+        self._values.extend(values.tolist())
+        self._invested_series.extend(invested.tolist())
+        self._drawdowns.extend(drawdowns.tolist())
+        self._peaks.extend(peaks.tolist())
+        return priced
+
+    def _extend(self, codes: 'np.ndarray', amount: 'np.ndarray', price: 'np.ndarray', times: 'np.ndarray',
+                histories: PriceHistory, start: int, end: int) -> 'np.ndarray':
+        """Add buckets start..end (inclusive) applying the given events, all from start on"""
+        grid = np.arange(start, end + 1, self.step, dtype=np.int64)
+        n = len(grid)
+
+        deltas = np.zeros((len(self._coins), n))
+        cost = np.zeros(n)
+        if len(codes):
+            bucket = np.clip(((times - start) // self.step).astype(np.int64), 0, n - 1)
+            np.add.at(deltas, (codes, bucket), amount)
+            cost = np.bincount(bucket, weights=amount * price, minlength=n)
+
+        positions = self._positions[:, None] + np.cumsum(deltas, axis=1)
+        invested = self._invested + np.cumsum(cost)
+        priced = self._append(grid, positions, invested, histories)
+        self._positions = positions[:, -1]
+        self._invested = float(invested[-1])
+        return priced
+
+    def update(self, engine: PortfolioEngine, histories: PriceHistory, sells: Optional[Dict[str, 'np.ndarray']] = None,
+               now: Optional[float] = None) -> 'pd.DataFrame':
+        """
+        Bring the curve up to date and return it
+
+        Args:
+            engine: PortfolioEngine snapshot of the owner's lots (ids and
+                acquisition times are read from its arrays)
+            histories: Price history per coin as (unix seconds, prices) arrays
+            sells: Sales as PortfolioStore.sell_arrays() returns them
+            now: Current unix time (defaults to time.time())
+
+        Returns:
+            DataFrame with 'timestamp', 'value', 'invested' and 'drawdown'
+            columns ('value' is NaN for buckets still missing a price)
+        """
+        with self._lock:
+            return self._update(engine, histories, sells, time.time() if now is None else now)
+
+    def _update(self, engine: PortfolioEngine, histories: PriceHistory, sells: Optional[Dict[str, 'np.ndarray']],
+                now: float) -> 'pd.DataFrame':
+        current = int(now // self.step) * self.step
+
+        # Lots and sales as one set of signed events; sale ids are negated to keep them apart
+        ids, codes, amount, price, times = (
+            engine.lot_ids, engine.coin_codes, engine.amounts, engine.purchase_prices, engine.acquired_at
+        )
+        if sells is not None and len(sells['id']):
+            coin_codes = {coin: i for i, coin in enumerate(engine.coins)}
+            sell_codes = np.array([coin_codes.get(coin, -1) for coin in sells['coin']], dtype=np.int64)
+            known = sell_codes >= 0
+            ids = np.concatenate((ids, -sells['id'][known]))
+            codes = np.concatenate((codes, sell_codes[known]))
+            amount = np.concatenate((amount, -sells['amount'][known]))
+            price = np.concatenate((price, sells['price'][known]))
+            times = np.concatenate((times, sells['sold_at'][known]))
+
+        new = ~np.isin(ids, self._event_ids)
+        closed_end = self._timestamps[-1] + self.step if self._timestamps else None
+
+        incremental = (
+            closed_end is not None
+            and np.isin(self._event_ids, ids).all()
+            and engine.coins[:len(self._coins)] == self._coins
+            and (times[new] >= closed_end).all()
+        )
+
+        priced = np.ones(0, dtype=bool)
+        if len(engine) == 0:
+            self._reset()
+        elif incremental:
+            if len(engine.coins) > len(self._coins):
+                self._positions = np.concatenate((self._positions, np.zeros(len(engine.coins) - len(self._coins))))
+                self._coins = list(engine.coins)
+            if closed_end <= current:
+                priced = self._extend(codes[new], amount[new], price[new], times[new], histories, closed_end, current)
+        else:
+            self._reset()
+            self._coins = list(engine.coins)
+            self._positions = np.zeros(len(self._coins))
+            start = int(times.min() // self.step) * self.step
+            priced = self._extend(codes, amount, price, times, histories, start, current)
+        self._event_ids = np.sort(ids)
+
+        df = pd.DataFrame({
+            'timestamp': pd.to_datetime(self._timestamps, unit='s'),
+            'value': self._values,
+            'invested': self._invested_series,
+            'drawdown': self._drawdowns
+        })
+        # The latest bucket is still open, and buckets missing a price are not final;
+        # rewind to the first of them so the next update revalues them
+        if len(priced):
+            reopen = len(self._timestamps) - len(priced) + int(np.argmin(priced)) if not priced.all() else None
+            if self._timestamps[-1] == current:
+                reopen = len(self._timestamps) - 1 if reopen is None else reopen
+            if reopen is not None:
+                self._rewind(reopen, ids, codes, amount, price, times)
+        return df
+
+    def _rewind(self, index: int, ids: 'np.ndarray', codes: 'np.ndarray', amount: 'np.ndarray',
+                price: 'np.ndarray', times: 'np.ndarray'):
+        """Drop buckets from index on and un-apply the lots and sales they added"""
+        since = self._timestamps[index]
+        undo = (times >= since) & np.isin(ids, self._event_ids)
+        np.subtract.at(self._positions, codes[undo], amount[undo])
+        self._invested -= float(np.dot(amount[undo], price[undo]))
+        self._event_ids = np.setdiff1d(self._event_ids, ids[undo])
+        if index == 0:
+            self._reset()
+            return
+        for series in (self._timestamps, self._values, self._invested_series, self._drawdowns, self._peaks):
+            del series[index:]
+
+
+_curves: Dict[Tuple[str, str], EquityCurve] = {}
+_curves_lock = threading.Lock()
+
+
+def get_equity_curve(user: str, frequency: str = 'daily') -> EquityCurve:
+    """
+    Get the process-wide equity curve of a user at a frequency
+
+    Args:
+        user: Portfolio owner
+        frequency: 'daily' or 'hourly'
+
+    Returns:
+        EquityCurve kept across reruns and sessions
+    """
+    key = (user, frequency)
+    with _curves_lock:
+        curve = _curves.get(key)
+        if curve is None:
+            curve = EquityCurve(frequency)
+            _curves[key] = curve
+    return curve
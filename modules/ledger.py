@@ -0,0 +1,289 @@
+"""
+CEC WAM master ledger loader for PSI Sovereign System
+Change-detecting, incremental CSV ingestion with cached categorical dtypes
+"""
+
+import hashlib
+import io
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from modules.config import (
+    CEC_WAM_DATA_DIR,
+    CEC_WAM_MASTER_LEDGER_LOG,
+    CEC_WAM_MASTER_LEDGER_SHEET,
+    CEC_WAM_REFRESH_INTERVAL,
+    EXAMPLE_CEC_WAM_FILE,
+    STATUS_EMOJI,
+)
+from modules.drive_sync import get_drive_sync
+from modules.log_index import split_csv_records
+from modules.scheduler import get_scheduler
+from modules.startup import lazy_import
+from modules.utils import validate_csv_structure
+
+pd = lazy_import('pandas')
+
+LEDGER_COLUMNS = ['Status', 'Component', 'Description', 'Value', 'Timestamp']
+
+# Bytes before the last read position that must be unchanged for an
+# append-only file to be read incrementally
+FINGERPRINT_BYTES = 4096
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_CHUNK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _fingerprint(path: str, end: int) -> str:
+    """Hash of the bytes just before end (the tail already ingested)"""
+    start = max(0, end - FINGERPRINT_BYTES)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return hashlib.blake2b(f.read(end - start), digest_size=16).hexdigest()
+
+
+class _LedgerState:
+    """What is known about one ledger file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime_ns: Optional[int] = None
+        self.size: Optional[int] = None
+        self.content_hash: Optional[str] = None
+        self.fingerprint: Optional[str] = None
+        self.header: bytes = b''
+        self.consumed = 0
+        self.frame: Optional[pd.DataFrame] = None
+        self.stats: Dict = {'checks': 0, 'skipped': 0, 'full_reads': 0, 'appends': 0,
+                            'rows': 0, 'rejected': 0, 'last_change': None, 'last_mode': None}
+
+
+class LedgerLoader:
+    """
+    Reloads ledger CSVs only when they change
+
+    A check costs one stat() when mtime and size are unchanged. If they did
+    change, a content hash decides whether a rewritten file actually differs.
+    Append-only files (the ledger log) are read from the last consumed byte
+    once a fingerprint of the previously read tail still matches, so only
+    new rows are parsed. Status and Component use categorical dtypes that are
+    cached and only extended when new values appear.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states: Dict[str, _LedgerState] = {}
+        self._status_dtype = pd.CategoricalDtype(list(STATUS_EMOJI))
+        self._component_dtype = pd.CategoricalDtype([])
+
+    # ---------- dtypes and validation ----------
+
+    def _extend_dtype(self, dtype: 'pd.CategoricalDtype', values: 'pd.Series') -> 'pd.CategoricalDtype':
+        new = pd.Index(values.dropna().unique()).difference(dtype.categories)
+        if len(new) == 0:
+            return dtype
+        return pd.CategoricalDtype(dtype.categories.append(new))
+
+    def _clean(self, raw: 'pd.DataFrame') -> 'pd.DataFrame':
+        """Vectorized schema validation and typing; invalid rows are dropped"""
+        if not validate_csv_structure(raw, LEDGER_COLUMNS):
+            missing = [c for c in LEDGER_COLUMNS if c not in raw.columns]
+            raise ValueError(f"Ledger is missing columns: {', '.join(missing)}")
+
+        status = raw['Status'].str.strip().str.upper().replace('', None)
+        component = raw['Component'].str.strip().replace('', None)
+        value = pd.to_numeric(raw['Value'], errors='coerce').astype('float64')
+        timestamp = pd.to_datetime(raw['Timestamp'], errors='coerce', format='mixed')
+
+        valid = status.notna() & component.notna() & value.notna() & timestamp.notna()
+
+        self._status_dtype = self._extend_dtype(self._status_dtype, status[valid])
+        self._component_dtype = self._extend_dtype(self._component_dtype, component[valid])
+
+        frame = pd.DataFrame({
+            'Status': status[valid].astype(self._status_dtype),
+            'Component': component[valid].astype(self._component_dtype),
+            'Description': raw['Description'][valid].fillna(''),
+            'Value': value[valid],
+            'Timestamp': timestamp[valid],
+        })
+        frame.attrs['rejected'] = int((~valid).sum())
+        return frame
+
+    def _align(self, frame: 'pd.DataFrame') -> 'pd.DataFrame':
+        """Bring a previously loaded frame onto the current categories"""
+        if frame['Status'].dtype != self._status_dtype:
+            frame['Status'] = frame['Status'].cat.set_categories(self._status_dtype.categories)
+        if frame['Component'].dtype != self._component_dtype:
+            frame['Component'] = frame['Component'].cat.set_categories(self._component_dtype.categories)
+        return frame
+
+    # ---------- loading ----------
+
+    def _read_full(self, state: _LedgerState, size: int):
+        with open(state.path, 'rb') as f:
+            data = f.read(size)
+        # EOF ends the last record here (exports often have no final newline);
+        # only the append path holds back an unterminated tail
+        spans, _ = split_csv_records(data)
+        header_end = spans[0][1] if spans else len(data)
+        raw = pd.read_csv(io.BytesIO(data), dtype=str, keep_default_na=False)
+        frame = self._clean(raw)
+
+        state.header = data[:header_end]
+        state.consumed = len(data)
+        state.frame = frame.reset_index(drop=True)
+        state.stats['full_reads'] += 1
+        state.stats['rejected'] = frame.attrs['rejected']
+        state.stats['last_mode'] = 'full'
+
+    def _read_appended(self, state: _LedgerState, size: int) -> Optional[int]:
+        """Parse rows past the consumed offset; None if the header changed"""
+        with open(state.path, 'rb') as f:
+            if f.read(len(state.header)) != state.header:
+                return None
+            f.seek(state.consumed)
+            data = f.read(size - state.consumed)
+        spans, consumed = split_csv_records(data)
+        if consumed:
+            raw = pd.read_csv(io.BytesIO(state.header + data[:consumed]), dtype=str, keep_default_na=False)
+            added = self._clean(raw)
+            frame = self._align(state.frame)
+            state.frame = pd.concat([frame, added], ignore_index=True)
+            state.stats['rejected'] += added.attrs['rejected']
+        state.consumed += consumed
+        state.stats['appends'] += 1
+        state.stats['last_mode'] = 'append'
+        return consumed
+
+    def load(self, path: str, append_only: bool = False) -> Optional['pd.DataFrame']:
+        """
+        Get a ledger as a typed DataFrame, re-reading only what changed
+
+        Args:
+            path: CSV path
+            append_only: File only grows (a log); parse just the new rows
+
+        Returns:
+            DataFrame with LEDGER_COLUMNS (Status/Component categorical,
+            Value numeric, Timestamp datetime), or None if the file does not exist
+
+        Raises:
+            ValueError: If the file lacks required columns
+        """
+        with self._lock:
+            state = self._states.get(path)
+            if state is None:
+                state = _LedgerState(path)
+                self._states[path] = state
+            state.stats['checks'] += 1
+
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                state.frame = None
+                return None
+
+            if state.frame is not None and stat.st_mtime_ns == state.mtime_ns and stat.st_size == state.size:
+                state.stats['skipped'] += 1
+                return self._align(state.frame)
+
+            appended = None
+            if state.frame is not None and append_only and stat.st_size >= state.consumed and \
+                    _fingerprint(path, state.consumed) == state.fingerprint:
+                appended = self._read_appended(state, stat.st_size)
+
+            if appended is not None:
+                # The whole-file hash is stale once rows are read incrementally
+                state.content_hash = None
+                if appended:
+                    state.stats['last_change'] = time.time()
+            else:
+                content_hash = _file_hash(path)
+                if state.frame is not None and content_hash == state.content_hash:
+                    state.stats['skipped'] += 1
+                else:
+                    self._read_full(state, stat.st_size)
+                    state.stats['last_change'] = time.time()
+                state.content_hash = content_hash
+
+            state.mtime_ns = stat.st_mtime_ns
+            state.size = stat.st_size
+            state.fingerprint = _fingerprint(path, state.consumed)
+            state.stats['rows'] = len(state.frame)
+            return self._align(state.frame)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-file load statistics"""
+        with self._lock:
+            return {path: dict(state.stats) for path, state in self._states.items()}
+
+
+def ledger_paths() -> Dict[str, str]:
+    """Configured ledger files, keyed by role"""
+    return {
+        'sheet': os.path.join(CEC_WAM_DATA_DIR, CEC_WAM_MASTER_LEDGER_SHEET),
+        'log': os.path.join(CEC_WAM_DATA_DIR, CEC_WAM_MASTER_LEDGER_LOG),
+    }
+
+
+def load_cec_wam_ledger(loader: Optional['LedgerLoader'] = None) -> Dict[str, Optional['pd.DataFrame']]:
+    """
+    Load the master ledger sheet and log
+
+    Falls back to the example file for the sheet when it has not been synced.
+
+    Returns:
+        Mapping with 'sheet' and 'log' DataFrames (None if unavailable)
+    """
+    loader = loader or get_ledger_loader()
+    paths = ledger_paths()
+    sheet_path = paths['sheet'] if os.path.exists(paths['sheet']) else EXAMPLE_CEC_WAM_FILE
+    frames = {}
+    for role, path, append_only in (('sheet', sheet_path, False), ('log', paths['log'], True)):
+        try:
+            frames[role] = loader.load(path, append_only=append_only)
+        except (OSError, ValueError) as e:
+            print(f"Error loading CEC WAM {role}: {e}")
+            frames[role] = None
+    return frames
+
+
+def refresh_cec_wam_ledger(loader: Optional['LedgerLoader'] = None) -> Dict[str, Optional['pd.DataFrame']]:
+    """Pull changed files from Drive (when configured), then reload the ledger"""
+    sync = get_drive_sync()
+    if sync is not None:
+        result = sync.sync()
+        for name, error in result['errors'].items():
+            print(f"Drive sync failed for {name}: {error}")
+    return load_cec_wam_ledger(loader)
+
+
+_loader: Optional[LedgerLoader] = None
+_loader_lock = threading.Lock()
+
+
+def get_ledger_loader() -> LedgerLoader:
+    """
+    Get the process-wide ledger loader and schedule its refresh
+
+    Returns:
+        LedgerLoader singleton
+    """
+    global _loader
+    if _loader is None:
+        with _loader_lock:
+            if _loader is None:
+                _loader = LedgerLoader()
+                get_scheduler().add_job('cec-wam-ledger', lambda: refresh_cec_wam_ledger(_loader),
+                                        CEC_WAM_REFRESH_INTERVAL)
+    return _loader
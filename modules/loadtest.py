@@ -0,0 +1,345 @@
+"""
+Load testing for PSI Sovereign System
+Drives concurrent headless sessions through the pages against offline market-data and Solana stand-ins
+"""
+
+import argparse
+import logging
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from modules.market_stub import StubCoinGecko
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Page file -> label used in reports
+PAGES = {
+    'pages/1_📊_Market_Overview.py': 'market_overview',
+    'pages/2_📈_Advanced_Analytics.py': 'advanced_analytics',
+    'pages/3_🤖_AI_Insights.py': 'ai_insights',
+    'pages/4_💼_Portfolio_Tracker.py': 'portfolio',
+}
+
+RUN_TIMEOUT = 120.0
+
+
+# ---------- stand-in environment ----------
+
+def _rss_bytes() -> int:
+    """Resident set size of this process"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _free_port(host: str = '127.0.0.1') -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def prepare_environment(latency: float, workdir: str) -> Dict:
+    """
+    Start the stand-ins and point the app at them
+
+    Must run before anything imports modules.config, since the URLs and
+    database path are read from the environment at import time. The Solana
+    stub itself imports config, so its port is picked first.
+
+    Returns:
+        Dict with the 'coingecko' and 'solana' stubs
+    """
+    if 'modules.config' in sys.modules:
+        raise RuntimeError("modules.config was imported before the load-test environment was set")
+
+    coingecko = StubCoinGecko(latency=latency).start()
+    solana_url = f"http://127.0.0.1:{_free_port()}"
+    os.environ.update({
+        'COINGECKO_BASE_URL': coingecko.url,
+        'SOLANA_RPC_URL': solana_url,
+        'SOLANA_WS_URL': solana_url.replace('http://', 'ws://', 1),
+        'PORTFOLIO_DB_FILE': os.path.join(workdir, 'portfolio.db'),
+        'METRICS_PORT': '0',
+    })
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+    from modules.solana_stub import StubSolanaRPC
+    solana = StubSolanaRPC(port=int(solana_url.rsplit(':', 1)[1])).start()
+    return {'coingecko': coingecko, 'solana': solana}
+
+
+def share_streamlit_runtime():
+    """
+    Give every AppTest session one long-lived runtime, as a real server does
+
+    AppTest installs a fresh global Runtime and patches config.get_option
+    around each run, then clears both, which breaks other sessions running
+    concurrently. Its assignments are redirected to a subclass and config is
+    patched once for the whole load test instead.
+    """
+    import contextlib
+    from unittest.mock import MagicMock
+
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import app_test
+    from streamlit.testing.v1.util import build_mock_config_get_option
+
+    if Runtime._instance is not None:
+        return
+
+    class SessionRuntime(Runtime):
+        """Absorbs AppTest's per-run Runtime._instance assignments"""
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = app_test.MediaFileManager(app_test.MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = app_test.DataframeSourceManager()
+    runtime.cache_storage_manager = app_test.MemoryCacheStorageManager()
+    runtime.bidi_component_registry = app_test.BidiComponentManager()
+    runtime.bidi_component_registry.discover_and_register_components(start_file_watching=False)
+    Runtime._instance = runtime
+    app_test.Runtime = SessionRuntime
+
+    config.get_option = build_mock_config_get_option({'global.appTest': True})
+
+    # Deprecation and bare-mode notices are logged on every rerun and would bury the report
+    for name in ('streamlit.deprecation_util', 'streamlit.runtime.scriptrunner_utils.script_run_context'):
+        logging.getLogger(name).addFilter(lambda record: False)
+    app_test.patch_config_options = lambda overrides: contextlib.nullcontext()
+
+
+def reset_shared_state():
+    """Cold caches between load levels so each level pays its own upstream fetches"""
+    import streamlit as st
+
+    from modules.cache import invalidate
+    from modules.metrics import get_metrics_registry
+
+    invalidate()
+    st.cache_data.clear()
+    get_metrics_registry().reset()
+
+
+# ---------- session scripts ----------
+
+def _widget(widgets, label: str):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"No widget labelled '{label}'")
+
+
+def _market_overview(at, rng: random.Random):
+    if rng.random() < 0.3:
+        _widget(at.button, "🔄 Refresh Now").click()
+    else:
+        _widget(at.sidebar.selectbox, "💱 Currency").set_value(rng.choice(['USD', 'EUR', 'GBP']))
+
+
+def _advanced_analytics(at, rng: random.Random):
+    if rng.random() < 0.5:
+        _widget(at.selectbox, "Select Cryptocurrency").set_value(rng.choice(["Bitcoin", "Ethereum", "Solana"]))
+    else:
+        _widget(at.selectbox, "Time Period").set_value(rng.choice(["7 Days", "30 Days", "90 Days", "1 Year"]))
+
+
+def _ai_insights(at, rng: random.Random):
+    coin = _widget(at.selectbox, "Select Cryptocurrency for Analysis")
+    if rng.random() < 0.2:
+        _widget(at.button, f"🔄 Refresh {coin.value} Data").click()
+    else:
+        coin.set_value(rng.choice(["Bitcoin", "Ethereum", "Solana"]))
+
+
+def _portfolio(at, rng: random.Random):
+    if rng.random() < 0.5 or not any(b.label == "🔄 Refresh Prices" for b in at.button):
+        _widget(at.number_input, "Amount").set_value(round(rng.uniform(0.01, 2.0), 4))
+        _widget(at.button, "➕ Add to Portfolio").click()
+    else:
+        _widget(at.button, "🔄 Refresh Prices").click()
+
+
+ACTIONS: Dict[str, Callable] = {
+    'market_overview': _market_overview,
+    'advanced_analytics': _advanced_analytics,
+    'ai_insights': _ai_insights,
+    'portfolio': _portfolio,
+}
+
+
+def _run_session(session_id: int, pages: Sequence[str], interactions: int, think_time: float,
+                 samples: List, errors: List, sessions: List, lock: threading.Lock):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(session_id)
+    for page in pages:
+        label = PAGES[page]
+        at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=RUN_TIMEOUT)
+        at.session_state['current_user'] = f"loadtest-{session_id}"
+        with lock:
+            sessions.append(at)
+        for step in range(interactions + 1):
+            try:
+                if step:
+                    ACTIONS[label](at, rng)
+                started = time.perf_counter()
+                at.run()
+                elapsed = time.perf_counter() - started
+            except Exception as e:
+                with lock:
+                    errors.append(f"{label}: {type(e).__name__}: {e}")
+                break
+            with lock:
+                samples.append((label, elapsed))
+                if at.exception:
+                    errors.append(f"{label}: {at.exception[0].message}")
+            if think_time:
+                time.sleep(rng.uniform(0, think_time))
+
+
+def _percentiles(values: Sequence[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None}
+    if len(values) == 1:
+        return {'p50': values[0], 'p95': values[0], 'p99': values[0]}
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return {'p50': cuts[49], 'p95': cuts[94], 'p99': cuts[98]}
+
+
+def run_level(n_sessions: int, stubs: Dict, pages: Sequence[str] = tuple(PAGES), interactions: int = 3,
+              think_time: float = 0.0) -> Dict:
+    """
+    Run n_sessions concurrent sessions, each visiting every page and
+    interacting with it
+
+    Returns:
+        Report dict: 'sessions', 'reruns', 'errors', latency 'p50'/'p95'/'p99'
+        (seconds), 'pages' (per-page percentiles), 'upstream' (requests per
+        endpoint), 'cpu_seconds', 'cpu_utilization', 'rss_mb' and
+        'mb_per_session'
+    """
+    reset_shared_state()
+    stubs['coingecko'].reset_counts()
+    solana_before = stubs['solana'].http_requests
+
+    samples, errors, sessions = [], [], []
+    lock = threading.Lock()
+    rss_before = _rss_bytes()
+    cpu_before = time.process_time()
+    wall_before = time.perf_counter()
+
+    threads = [
+        threading.Thread(
+            target=_run_session,
+            args=(i, pages, interactions, think_time, samples, errors, sessions, lock),
+            name=f"loadtest-session-{i}",
+            daemon=True
+        )
+        for i in range(n_sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    wall = time.perf_counter() - wall_before
+    cpu = time.process_time() - cpu_before
+    rss_after = _rss_bytes()
+
+    latencies = sorted(elapsed for _, elapsed in samples)
+    per_page = {
+        label: _percentiles(sorted(elapsed for page, elapsed in samples if page == label))
+        for label in (PAGES[page] for page in pages)
+    }
+    upstream = stubs['coingecko'].request_counts()
+    upstream['solana_rpc'] = stubs['solana'].http_requests - solana_before
+    report = {
+        'sessions': n_sessions,
+        'reruns': len(samples),
+        'errors': errors,
+        **_percentiles(latencies),
+        'pages': per_page,
+        'upstream': upstream,
+        'wall_seconds': wall,
+        'cpu_seconds': cpu,
+        'cpu_utilization': cpu / wall if wall else 0.0,
+        'rss_mb': rss_after / 2**20,
+        'mb_per_session': (rss_after - rss_before) / 2**20 / n_sessions,
+    }
+    sessions.clear()
+    return report
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value * 1000:8.0f}" if value is not None else f"{'-':>8}"
+
+
+def print_report(reports: List[Dict], p95_budget: float):
+    print(f"{'sessions':>8} {'reruns':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'upstream':>9} {'cpu %':>6} {'rss MB':>8} {'MB/sess':>8} {'errors':>7}")
+    for report in reports:
+        print(f"{report['sessions']:>8} {report['reruns']:>7} {_ms(report['p50'])} {_ms(report['p95'])} "
+              f"{_ms(report['p99'])} {sum(report['upstream'].values()):>9} "
+              f"{report['cpu_utilization'] * 100:>6.0f} {report['rss_mb']:>8.0f} "
+              f"{report['mb_per_session']:>8.1f} {len(report['errors']):>7}")
+
+    last = reports[-1]
+    print(f"\nPer page at {last['sessions']} sessions (p50 / p95 / p99 ms):")
+    for label, cuts in last['pages'].items():
+        print(f"  {label:<20} {_ms(cuts['p50'])} {_ms(cuts['p95'])} {_ms(cuts['p99'])}")
+    print(f"Upstream requests at {last['sessions']} sessions: "
+          + ', '.join(f"{endpoint}={count}" for endpoint, count in sorted(last['upstream'].items())))
+
+    for report in reports:
+        for error in report['errors'][:5]:
+            print(f"  [{report['sessions']} sessions] {error}")
+
+    within = [r['sessions'] for r in reports if r['p95'] is not None and r['p95'] <= p95_budget and not r['errors']]
+    if within:
+        print(f"\nLargest level within the {p95_budget:.2f}s p95 budget: {max(within)} sessions")
+    else:
+        print(f"\nNo level stayed within the {p95_budget:.2f}s p95 budget")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m modules.loadtest', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', default='1,5,10', help="comma-separated concurrency levels")
+    parser.add_argument('--interactions', type=int, default=3, help="widget changes/clicks per page visit")
+    parser.add_argument('--think-time', type=float, default=0.0, help="max random pause between reruns (s)")
+    parser.add_argument('--latency', type=float, default=0.05, help="simulated upstream latency per request (s)")
+    parser.add_argument('--pages', default=','.join(PAGES.values()), help="comma-separated page labels")
+    parser.add_argument('--p95-budget', type=float, default=2.0, help="rerun p95 (s) a level must stay under")
+    args = parser.parse_args(argv)
+
+    labels = {label: page for page, label in PAGES.items()}
+    pages = [labels[label] for label in args.pages.split(',')]
+
+    with tempfile.TemporaryDirectory(prefix='psi-loadtest-') as workdir:
+        stubs = prepare_environment(args.latency, workdir)
+        share_streamlit_runtime()
+        try:
+            reports = []
+            for n_sessions in (int(level) for level in args.sessions.split(',')):
+                print(f"Running {n_sessions} concurrent sessions...", flush=True)
+                reports.append(run_level(n_sessions, stubs, pages, args.interactions, args.think_time))
+            print()
+            print_report(reports, args.p95_budget)
+        finally:
+            stubs['coingecko'].stop()
+            stubs['solana'].stop()
+    return 0 if all(not report['errors'] for report in reports) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
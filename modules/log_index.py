@@ -0,0 +1,544 @@
+"""
+Activity log query layer for PSI Sovereign System
+Sidecar time/offset index over CSV logs with tail-following and columnar archives
+"""
+
+import csv
+import glob
+import importlib.util
+import io
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from modules.config import ACTIVITY_LOG_FILE, LOG_ARCHIVE_INTERVAL
+from modules.scheduler import get_scheduler
+from modules.startup import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# One index record per CSV row
+INDEX_DTYPE = [('ts', '<f8'), ('offset', '<i8'), ('length', '<i4'), ('status', '<i4')]
+INDEX_RECORD_SIZE = 24  # bytes: f8 + i8 + i4 + i4
+
+# Bytes read per scan step while indexing
+SCAN_CHUNK = 4 * 1024 * 1024
+
+_INITIAL_CAPACITY = 1024
+
+TimeBound = Union[None, float, datetime]
+
+
+def _to_seconds(value: TimeBound) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+def split_csv_records(data: bytes) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    Find complete CSV records in a byte buffer
+
+    A newline inside a quoted field does not end a record. Only records
+    terminated by a newline are returned, so a row the writer has not
+    finished yet is left for the next scan.
+
+    Returns:
+        List of (start, end) byte ranges and the number of bytes consumed
+    """
+    records = []
+    start = pos = 0
+    in_quotes = False
+    while True:
+        end = data.find(b'\n', pos)
+        if end < 0:
+            break
+        if data.count(b'"', pos, end) % 2:
+            in_quotes = not in_quotes
+        pos = end + 1
+        if not in_quotes:
+            records.append((start, pos))
+            start = pos
+    return records, start
+
+
+class LogIndex:
+    """
+    Time index over one CSV log file
+
+    Each row is stored once as (timestamp, byte offset, byte length, status
+    code) in growable NumPy arrays, optionally persisted to '<path>.idx'
+    with metadata in '<path>.idx.json'. refresh() only scans bytes past the
+    last indexed offset; queries slice the arrays and read just the matching
+    rows with positioned reads.
+    """
+
+    def __init__(self, path: str, persist: bool = True):
+        self.path = path
+        self.persist = persist
+        self.header: List[str] = []
+        self.statuses: List[str] = []
+        self._status_codes: Dict[str, int] = {}
+        self._ts_col: Optional[int] = None
+        self._status_col: Optional[int] = None
+        self._inode: Optional[int] = None
+        self._indexed_to = 0
+        self._sorted = True
+        self._size = 0
+        self._records = np.empty(_INITIAL_CAPACITY, dtype=INDEX_DTYPE)
+        self._last_ts_text: Optional[str] = None
+        self._last_ts = np.nan
+        if persist:
+            self._load_sidecar()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def records(self) -> 'np.ndarray':
+        return self._records[:self._size]
+
+    # ---------- sidecar persistence ----------
+
+    def _sidecar_paths(self) -> Tuple[str, str]:
+        return f"{self.path}.idx", f"{self.path}.idx.json"
+
+    def _load_sidecar(self):
+        idx_path, meta_path = self._sidecar_paths()
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            stat = os.stat(self.path)
+            if meta['inode'] != stat.st_ino or meta['indexed_to'] > stat.st_size:
+                return
+            records = np.fromfile(idx_path, dtype=INDEX_DTYPE, count=meta['rows'])
+            if len(records) != meta['rows']:
+                return
+        except (OSError, ValueError, KeyError):
+            return
+
+        self._inode = meta['inode']
+        self._indexed_to = meta['indexed_to']
+        self._sorted = meta['sorted']
+        self._set_header(meta['header'])
+        for status in meta['statuses']:
+            self._status_code(status)
+        self._append(records)
+        if self._size:
+            self._last_ts = float(self._records[self._size - 1]['ts'])
+
+    def _save_sidecar(self, new_records: 'np.ndarray'):
+        idx_path, meta_path = self._sidecar_paths()
+        try:
+            # Records first, then metadata: a crash in between leaves extra
+            # records that the next load ignores
+            mode = 'ab' if self._size > len(new_records) else 'wb'
+            with open(idx_path, mode) as f:
+                f.truncate((self._size - len(new_records)) * INDEX_RECORD_SIZE)
+                f.write(new_records.tobytes())
+            meta = {
+                'inode': self._inode,
+                'indexed_to': self._indexed_to,
+                'rows': self._size,
+                'sorted': self._sorted,
+                'header': self.header,
+                'statuses': self.statuses,
+            }
+            tmp_path = f"{meta_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, meta_path)
+        except OSError as e:
+            print(f"Error saving log index: {e}")
+
+    # ---------- indexing ----------
+
+    def _set_header(self, header: List[str]):
+        self.header = header
+        lowered = [h.strip().lower() for h in header]
+        self._ts_col = lowered.index('timestamp') if 'timestamp' in lowered else None
+        self._status_col = lowered.index('status') if 'status' in lowered else None
+
+    def _status_code(self, status: str) -> int:
+        code = self._status_codes.get(status)
+        if code is None:
+            code = len(self.statuses)
+            self._status_codes[status] = code
+            self.statuses.append(status)
+        return code
+
+    def _parse_ts(self, text: str) -> float:
+        # Unparseable timestamps inherit the previous row's time so the
+        # index stays ordered for range queries
+        if text == self._last_ts_text:
+            return self._last_ts
+        try:
+            value = float(text)
+        except ValueError:
+            try:
+                value = datetime.fromisoformat(text.strip()).timestamp()
+            except ValueError:
+                value = self._last_ts
+        self._last_ts_text = text
+        self._last_ts = value
+        return value
+
+    def _append(self, records: 'np.ndarray'):
+        needed = self._size + len(records)
+        capacity = len(self._records)
+        if needed > capacity:
+            while capacity < needed:
+                capacity *= 2
+            grown = np.empty(capacity, dtype=INDEX_DTYPE)
+            grown[:self._size] = self._records[:self._size]
+            self._records = grown
+        self._records[self._size:needed] = records
+        self._size = needed
+
+    def _reset(self, inode: Optional[int]):
+        self.header = []
+        self.statuses = []
+        self._status_codes = {}
+        self._ts_col = self._status_col = None
+        self._inode = inode
+        self._indexed_to = 0
+        self._sorted = True
+        self._size = 0
+        self._last_ts_text = None
+        self._last_ts = np.nan
+
+    def refresh(self) -> int:
+        """
+        Index rows appended since the last call
+
+        Starts over if the file was replaced (rotation) or truncated.
+
+        Returns:
+            Number of newly indexed rows
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return 0
+        if stat.st_ino != self._inode or stat.st_size < self._indexed_to:
+            self._reset(stat.st_ino)
+        if stat.st_size == self._indexed_to:
+            return 0
+
+        added = []
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            pos = self._indexed_to
+            while pos < stat.st_size:
+                data = os.pread(fd, min(SCAN_CHUNK, stat.st_size - pos), pos)
+                spans, consumed = split_csv_records(data)
+                if not spans:
+                    if len(data) < SCAN_CHUNK:
+                        break
+                    # One record larger than a chunk: read until it completes
+                    data = os.pread(fd, stat.st_size - pos, pos)
+                    spans, consumed = split_csv_records(data)
+                    if not spans:
+                        break
+                added.append(self._index_spans(data, spans, pos))
+                pos += consumed
+            self._indexed_to = pos
+        finally:
+            os.close(fd)
+
+        new_records = np.concatenate(added) if added else np.empty(0, dtype=INDEX_DTYPE)
+        if len(new_records):
+            if self._size and self._sorted:
+                self._sorted = bool(new_records['ts'][0] >= self._records[self._size - 1]['ts'])
+            self._sorted = self._sorted and bool((np.diff(new_records['ts']) >= 0).all())
+            self._append(new_records)
+        if self.persist:
+            self._save_sidecar(new_records)
+        return len(new_records)
+
+    def _index_spans(self, data: bytes, spans: List[Tuple[int, int]], base: int) -> 'np.ndarray':
+        texts = [data[s:e].decode('utf-8', errors='replace') for s, e in spans]
+        if not self.header:
+            self._set_header(next(csv.reader([texts[0]])))
+            spans, texts = spans[1:], texts[1:]
+
+        records = []
+        for (start, end), row in zip(spans, csv.reader(texts)):
+            if not row:
+                continue
+            ts = self._parse_ts(row[self._ts_col]) if self._ts_col is not None and self._ts_col < len(row) else np.nan
+            status = row[self._status_col] if self._status_col is not None and self._status_col < len(row) else ''
+            records.append((ts, base + start, end - start, self._status_code(status)))
+        return np.array(records, dtype=INDEX_DTYPE)
+
+    # ---------- queries ----------
+
+    def select(self, start: TimeBound = None, end: TimeBound = None,
+               statuses: Optional[Sequence[str]] = None) -> 'np.ndarray':
+        """
+        Positions of indexed rows matching a time range and status filter
+
+        Args:
+            start: Earliest timestamp (datetime or unix seconds), inclusive
+            end: Latest timestamp (datetime or unix seconds), inclusive
+            statuses: Status values to keep (case-insensitive); all if None
+
+        Returns:
+            Array of row positions in file order
+        """
+        records = self.records
+        lo, hi = 0, len(records)
+        start, end = _to_seconds(start), _to_seconds(end)
+        mask = None
+        if self._sorted:
+            if start is not None:
+                lo = int(np.searchsorted(records['ts'], start, side='left'))
+            if end is not None:
+                hi = int(np.searchsorted(records['ts'], end, side='right'))
+        else:
+            mask = np.ones(len(records), dtype=bool)
+            if start is not None:
+                mask &= records['ts'] >= start
+            if end is not None:
+                mask &= records['ts'] <= end
+
+        positions = np.arange(lo, hi) if mask is None else np.flatnonzero(mask)
+        if statuses is not None:
+            wanted = {s.lower() for s in statuses}
+            codes = [code for status, code in self._status_codes.items() if status.lower() in wanted]
+            positions = positions[np.isin(records['status'][positions], codes)]
+        return positions
+
+    def timestamps(self, positions: 'np.ndarray') -> 'np.ndarray':
+        return self.records['ts'][positions]
+
+    def read(self, positions: 'np.ndarray') -> 'pd.DataFrame':
+        """
+        Read rows by index position
+
+        Adjacent rows are fetched with a single positioned read.
+
+        Returns:
+            DataFrame with the log's header columns (values as strings)
+        """
+        if not len(positions):
+            return pd.DataFrame(columns=self.header)
+        records = self.records[positions]
+        offsets = records['offset']
+        ends = offsets + records['length']
+        breaks = np.flatnonzero(offsets[1:] != ends[:-1]) + 1
+        run_starts = np.concatenate(([0], breaks))
+        run_ends = np.concatenate((breaks, [len(records)])) - 1
+
+        chunks = []
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            for first, last in zip(run_starts, run_ends):
+                chunks.append(os.pread(fd, int(ends[last] - offsets[first]), int(offsets[first])))
+        finally:
+            os.close(fd)
+
+        text = b''.join(chunks).decode('utf-8', errors='replace')
+        rows = list(csv.reader(io.StringIO(text, newline='')))
+        width = len(self.header)
+        rows = [(row + [''] * width)[:width] for row in rows]
+        return pd.DataFrame(rows, columns=self.header)
+
+
+def pyarrow_available() -> bool:
+    """Whether columnar (Parquet) archives can be written"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+class ActivityLogReader:
+    """
+    Queries over a rotated activity log
+
+    Covers the live file, rotated CSV segments ('<path>.1', '<path>.2', ...)
+    and Parquet archives in '<path>.archive/'. Segment indexes are keyed by
+    inode, so a rotation reuses the index built while the file was live.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.archive_dir = f"{path}.archive"
+        self._lock = threading.RLock()
+        self._segments: Dict[int, LogIndex] = {}
+
+    def _rotated_paths(self) -> List[str]:
+        """Rotated CSV segments, oldest first"""
+        paths = [p for p in glob.glob(f"{glob.escape(self.path)}.*") if p.rsplit('.', 1)[1].isdigit()]
+        return sorted(paths, key=lambda p: int(p.rsplit('.', 1)[1]), reverse=True)
+
+    def refresh(self) -> List[LogIndex]:
+        """
+        Bring every segment's index up to date
+
+        Returns:
+            Indexes of the rotated segments (oldest first) followed by the live file
+        """
+        with self._lock:
+            current = []
+            for path in self._rotated_paths() + [self.path]:
+                try:
+                    inode = os.stat(path).st_ino
+                except FileNotFoundError:
+                    continue
+                is_live = path == self.path
+                index = self._segments.get(inode) or LogIndex(path, persist=is_live)
+                index.path = path
+                index.persist = is_live
+                index.refresh()
+                current.append((inode, index))
+            self._segments = dict(current)
+            return [index for _, index in current]
+
+    def _archives(self, start: Optional[float], end: Optional[float]) -> List[str]:
+        paths = []
+        for path in sorted(glob.glob(os.path.join(glob.escape(self.archive_dir), '*.parquet'))):
+            try:
+                first, last = (float(x) for x in os.path.basename(path)[:-len('.parquet')].split('-'))
+            except ValueError:
+                continue
+            if (start is None or last >= start) and (end is None or first <= end):
+                paths.append(path)
+        return sorted(paths, key=lambda p: float(os.path.basename(p).split('-')[0]))
+
+    def query(self, start: TimeBound = None, end: TimeBound = None,
+              statuses: Optional[Sequence[str]] = None, limit: Optional[int] = None) -> 'pd.DataFrame':
+        """
+        Log rows matching a time range and status filter
+
+        Args:
+            start: Earliest timestamp (datetime or unix seconds), inclusive
+            end: Latest timestamp (datetime or unix seconds), inclusive
+            statuses: Status values to keep (case-insensitive); all if None
+            limit: Keep only the most recent rows
+
+        Returns:
+            DataFrame of matching rows, oldest first
+        """
+        start, end = _to_seconds(start), _to_seconds(end)
+        with self._lock:
+            indexes = self.refresh()
+            selections = [(index, index.select(start, end, statuses)) for index in indexes]
+
+        # Read newest segments first so a limit touches as little as possible
+        frames = []
+        remaining = limit
+        for index, positions in reversed(selections):
+            if remaining is not None:
+                positions = positions[max(len(positions) - remaining, 0):]
+                remaining -= len(positions)
+            if len(positions):
+                frames.append(index.read(positions))
+            if remaining is not None and remaining <= 0:
+                break
+
+        if remaining is None or remaining > 0:
+            for path in reversed(self._archives(start, end)):
+                frame = self._read_archive(path, start, end, statuses)
+                if remaining is not None:
+                    frame = frame.tail(remaining)
+                    remaining -= len(frame)
+                frames.append(frame)
+                if remaining is not None and remaining <= 0:
+                    break
+
+        header = indexes[-1].header if indexes else []
+        if not frames:
+            return pd.DataFrame(columns=header)
+        return pd.concat(frames[::-1], ignore_index=True)
+
+    def _read_archive(self, path: str, start: Optional[float], end: Optional[float],
+                      statuses: Optional[Sequence[str]]) -> 'pd.DataFrame':
+        filters = []
+        if start is not None:
+            filters.append(('_ts', '>=', start))
+        if end is not None:
+            filters.append(('_ts', '<=', end))
+        frame = pd.read_parquet(path, filters=filters or None)
+        if statuses is not None:
+            status_col = next((c for c in frame.columns if c.strip().lower() == 'status'), None)
+            if status_col is not None:
+                wanted = {s.lower() for s in statuses}
+                frame = frame[frame[status_col].str.lower().isin(wanted)]
+        return frame.drop(columns='_ts')
+
+    def statuses(self) -> List[str]:
+        """Distinct status values seen in the CSV segments"""
+        with self._lock:
+            seen = {}
+            for index in self.refresh():
+                for status in index.statuses:
+                    seen.setdefault(status, None)
+            return [s for s in seen if s]
+
+    def row_count(self) -> int:
+        """Rows indexed across CSV segments (archives excluded)"""
+        with self._lock:
+            return sum(len(index) for index in self.refresh())
+
+    def archive(self) -> List[str]:
+        """
+        Convert rotated CSV segments to Parquet and remove them
+
+        No-op when pyarrow is not installed.
+
+        Returns:
+            Paths of the archives written
+        """
+        if not pyarrow_available():
+            return []
+        written = []
+        with self._lock:
+            for index in self.refresh()[:-1]:
+                if not len(index):
+                    continue
+                positions = np.arange(len(index))
+                frame = index.read(positions)
+                frame['_ts'] = index.timestamps(positions)
+                span = frame['_ts'].dropna()
+                first, last = (span.min(), span.max()) if len(span) else (0.0, 0.0)
+
+                os.makedirs(self.archive_dir, exist_ok=True)
+                target = os.path.join(self.archive_dir, f"{first:.0f}-{last:.0f}.parquet")
+                tmp_path = f"{target}.tmp"
+                try:
+                    frame.to_parquet(tmp_path, index=False)
+                    os.replace(tmp_path, target)
+                    # The writer may have rotated again; only delete the file we read
+                    if os.stat(index.path).st_ino == index._inode:
+                        os.remove(index.path)
+                except OSError as e:
+                    print(f"Error archiving log segment {index.path}: {e}")
+                    continue
+                self._segments.pop(index._inode, None)
+                written.append(target)
+        return written
+
+
+_readers: Dict[str, ActivityLogReader] = {}
+_readers_lock = threading.Lock()
+
+
+def get_activity_log_reader(path: str = ACTIVITY_LOG_FILE) -> ActivityLogReader:
+    """
+    Get the process-wide reader for a log file and schedule its archiving
+
+    Returns:
+        ActivityLogReader shared by every session reading path
+    """
+    key = os.path.abspath(path)
+    with _readers_lock:
+        reader = _readers.get(key)
+        if reader is None:
+            reader = ActivityLogReader(path)
+            _readers[key] = reader
+            get_scheduler().add_job(f"log-archive:{key}", reader.archive, LOG_ARCHIVE_INTERVAL, run_immediately=False)
+    return reader
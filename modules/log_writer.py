@@ -0,0 +1,244 @@
+"""
+Buffered activity log writer for PSI Sovereign System
+Queues log entries and appends them to CSV from a background thread
+"""
+
+import atexit
+import csv
+import io
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from modules.config import (
+    LOG_BACKUP_COUNT,
+    LOG_FLUSH_INTERVAL,
+    LOG_FSYNC_POLICY,
+    LOG_MAX_AGE_SECONDS,
+    LOG_MAX_BYTES,
+)
+
+FSYNC_POLICIES = ('always', 'interval', 'never')
+
+# Entries written per batch at most
+MAX_BATCH = 1_000
+
+# Pending entries kept in memory before new ones are dropped
+MAX_QUEUE = 100_000
+
+
+class BufferedLogWriter:
+    """
+    Non-blocking CSV log appender
+
+    write() only enqueues. A daemon thread collects entries for up to
+    flush_interval seconds (or MAX_BATCH entries), renders the batch to one
+    string and appends it with a single os.write on an O_APPEND descriptor,
+    so rows from concurrent sessions (and processes) never interleave
+    mid-line. Files are rotated by size or age.
+
+    With the 'interval' fsync policy, data written since the last fsync is
+    synced once the writer goes idle for fsync_interval, and on close().
+    """
+
+    def __init__(self, filename: str, fieldnames: Optional[Sequence[str]] = None,
+                 flush_interval: float = LOG_FLUSH_INTERVAL, fsync: str = LOG_FSYNC_POLICY,
+                 fsync_interval: float = 5.0, max_bytes: int = LOG_MAX_BYTES,
+                 max_age: Optional[float] = LOG_MAX_AGE_SECONDS, backup_count: int = LOG_BACKUP_COUNT):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.filename = filename
+        self.fieldnames: Optional[List[str]] = list(fieldnames) if fieldnames else None
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backup_count = backup_count
+
+        self.dropped = 0
+        self.written = 0
+        self._queue: 'queue.Queue[Optional[Dict]]' = queue.Queue(maxsize=MAX_QUEUE)
+        self._last_fsync = time.monotonic()
+        # Bytes were written since the last fsync
+        self._dirty = False
+        self._segment_started: Optional[float] = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"log-writer:{filename}", daemon=True)
+        self._thread.start()
+
+    def write(self, entry: Dict) -> bool:
+        """
+        Queue a log entry without blocking
+
+        Returns:
+            False if the queue was full and the entry was dropped
+        """
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self, timeout: Optional[float] = None):
+        """Block until everything queued so far is written"""
+        done = threading.Event()
+        self._queue.put({'__flush__': done})
+        done.wait(timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Write pending entries and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self.fsync != 'never':
+            self._sync_quietly()
+
+    def _rotate_if_needed(self, incoming: int):
+        now = time.time()
+        try:
+            size = os.stat(self.filename).st_size
+        except FileNotFoundError:
+            self._segment_started = now
+            return
+        # Creation time is not portable; age counts from when this process first saw the file
+        if self._segment_started is None:
+            self._segment_started = now
+        too_big = self.max_bytes and size > 0 and size + incoming > self.max_bytes
+        too_old = self.max_age and now - self._segment_started > self.max_age
+        if not (too_big or too_old):
+            return
+        self._segment_started = now
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.filename}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.filename}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.filename, f"{self.filename}.1")
+        else:
+            os.remove(self.filename)
+
+    def _sync(self):
+        """fsync whatever was written since the last fsync"""
+        if not self._dirty:
+            return
+        try:
+            fd = os.open(self.filename, os.O_WRONLY | os.O_APPEND)
+        except FileNotFoundError:
+            self._dirty = False
+            return
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        self._dirty = False
+        self._last_fsync = time.monotonic()
+
+    def _write_batch(self, entries: List[Dict]):
+        if self.fieldnames is None:
+            self.fieldnames = list(entries[0].keys())
+
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.fieldnames, extrasaction='ignore', lineterminator='\n')
+        writer.writerows(entries)
+        body = buffer.getvalue().encode('utf-8')
+
+        self._rotate_if_needed(len(body))
+        fd = os.open(self.filename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size == 0:
+                header = io.StringIO()
+                csv.writer(header, lineterminator='\n').writerow(self.fieldnames)
+                body = header.getvalue().encode('utf-8') + body
+            os.write(fd, body)
+            self._dirty = True
+            now = time.monotonic()
+            if self.fsync == 'always' or (self.fsync == 'interval' and now - self._last_fsync >= self.fsync_interval):
+                os.fsync(fd)
+                self._dirty = False
+                self._last_fsync = now
+        finally:
+            os.close(fd)
+        self.written += len(entries)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            # Wake up after an idle fsync_interval if the last batch still needs syncing
+            idle_sync = self.fsync == 'interval' and self._dirty
+            try:
+                item = self._queue.get(timeout=self.fsync_interval if idle_sync else None)
+            except queue.Empty:
+                self._sync_quietly()
+                continue
+
+            # Collect until the interval since the first entry passes or the batch is full;
+            # flush requests and shutdown write what is collected right away
+            batch, waiters = [], []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    stopping = True
+                    break
+                if '__flush__' in item:
+                    waiters.append(item['__flush__'])
+                    break
+                batch.append(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= MAX_BATCH or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except OSError as e:
+                    print(f"Error saving log: {e}")
+            if stopping and self.fsync != 'never':
+                self._sync_quietly()
+            for waiter in waiters:
+                waiter.set()
+
+    def _sync_quietly(self):
+        try:
+            self._sync()
+        except OSError as e:
+            print(f"Error syncing log: {e}")
+
+
+_writers: Dict[str, BufferedLogWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_log_writer(filename: str) -> BufferedLogWriter:
+    """
+    Get the process-wide writer for a log file
+
+    Returns:
+        BufferedLogWriter shared by every session writing to filename
+    """
+    path = os.path.abspath(filename)
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None:
+            writer = BufferedLogWriter(filename)
+            _writers[path] = writer
+    return writer
+
+
+@atexit.register
+def _close_writers():
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.close()
@@ -0,0 +1,149 @@
+"""
+Market data access for PSI Sovereign System
+Fetches CoinGecko market_chart history into the shared rollup store
+"""
+
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from modules.config import COINGECKO_BASE_URL
+from modules.metrics import timed
+from modules.rollups import get_rollup_store
+from modules.startup import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Seconds before the newest stored point is considered stale
+HISTORY_MAX_AGE = 600
+
+
+@timed('psi_fetch', function='fetch_market_chart')
+def fetch_market_chart(coin_id: str, days: Optional[int]) -> List[Tuple[float, float, float]]:
+    """
+    Fetch raw market_chart points from CoinGecko
+
+    Args:
+        coin_id: CoinGecko coin id (e.g. 'bitcoin')
+        days: Window in days (None for all-time)
+
+    Returns:
+        List of (unix seconds, price, volume) tuples
+
+    Raises:
+        requests.RequestException: If the request fails
+    """
+    params = {"vs_currency": "usd", "days": "max" if days is None else days}
+    if days is not None and days > 90:
+        params["interval"] = "daily"
+    response = requests.get(
+        f"{COINGECKO_BASE_URL}/coins/{coin_id}/market_chart",
+        params=params,
+        timeout=15
+    )
+    response.raise_for_status()
+    data = response.json()
+
+    prices = data.get('prices', [])
+    volumes = data.get('total_volumes', [])
+    return [
+        (ts / 1000, price, volumes[i][1] if i < len(volumes) else 0.0)
+        for i, (ts, price) in enumerate(prices)
+    ]
+
+
+@timed('psi_fetch', function='fetch_simple_prices')
+def fetch_simple_prices(coin_ids: Sequence[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Fetch current USD quotes for several coins in one request
+
+    Args:
+        coin_ids: CoinGecko coin ids
+
+    Returns:
+        Mapping of coin id to CoinGecko simple/price fields
+        ('usd', 'usd_24h_change', 'usd_market_cap', 'usd_24h_vol')
+
+    Raises:
+        requests.RequestException: If the request fails
+    """
+    response = requests.get(
+        f"{COINGECKO_BASE_URL}/simple/price",
+        params={
+            "ids": ",".join(coin_ids),
+            "vs_currencies": "usd",
+            "include_24hr_change": "true",
+            "include_market_cap": "true",
+            "include_24hr_vol": "true"
+        },
+        timeout=10
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def sync_price_history(coin_id: str, days: Optional[int], max_age: float = HISTORY_MAX_AGE) -> Optional[str]:
+    """
+    Make sure the rollup store covers a window, fetching only what is missing
+
+    Args:
+        coin_id: CoinGecko coin id
+        days: Window in days (None for all-time)
+        max_age: Seconds before stored history is refreshed
+
+    Returns:
+        Error message if the upstream fetch failed, None otherwise
+    """
+    store = get_rollup_store()
+    missing = store.days_to_fetch(coin_id, days, max_age=max_age)
+    if missing == 0:
+        return None
+    try:
+        store.ingest(coin_id, fetch_market_chart(coin_id, missing), complete=missing is None)
+    except requests.RequestException as e:
+        return str(e)
+    return None
+
+
+def price_history_frame(coin_id: str, days: Optional[int], tier: Optional[str] = None) -> 'pd.DataFrame':
+    """
+    Read a stored price window as a DataFrame
+
+    Args:
+        coin_id: CoinGecko coin id
+        days: Window in days (None for all-time)
+        tier: Force a rollup tier ('minute', 'hour', 'day'); picked automatically if None
+
+    Returns:
+        DataFrame with 'timestamp', 'price' and 'volume' columns (empty if nothing is stored)
+    """
+    start = None if days is None else time.time() - days * 86400
+    rollup = get_rollup_store().query(coin_id, start=start, tier=tier)
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(rollup['timestamp'], unit='s'),
+        'price': rollup['close'],
+        'volume': rollup['volume']
+    })
+
+
+def price_history_arrays(coin_id: str, days: Optional[int],
+                         tier: Optional[str] = None) -> Tuple['np.ndarray', 'np.ndarray']:
+    """
+    Read a stored price window as epoch-second and close-price arrays
+
+    Unlike price_history_frame, timestamps stay plain unix seconds, so
+    callers doing bucket arithmetic never depend on a datetime resolution.
+
+    Args:
+        coin_id: CoinGecko coin id
+        days: Window in days (None for all-time)
+        tier: Force a rollup tier ('minute', 'hour', 'day'); picked automatically if None
+
+    Returns:
+        Tuple of (int64 unix seconds, float64 prices), both empty if nothing is stored
+    """
+    start = None if days is None else time.time() - days * 86400
+    rollup = get_rollup_store().query(coin_id, start=start, tier=tier)
+    return np.asarray(rollup['timestamp'], dtype=np.int64), np.asarray(rollup['close'], dtype=np.float64)
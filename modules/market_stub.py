@@ -0,0 +1,169 @@
+"""
+Local CoinGecko stand-in for PSI Sovereign System
+In-process HTTP server answering the market-data calls the app makes, for offline load tests
+"""
+
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+# Units per 1 USD served by /exchange_rates
+STUB_FX_RATES = {
+    'usd': 1.0,
+    'eur': 0.92,
+    'gbp': 0.79,
+    'jpy': 150.0,
+    'cad': 1.36,
+    'aud': 1.52,
+    'chf': 0.88,
+    'inr': 83.0
+}
+
+# Days of history behind days=max
+MAX_HISTORY_DAYS = 2_000
+
+
+class StubCoinGecko:
+    """
+    Minimal CoinGecko stand-in
+
+    'prices' (coin id to USD price) can be edited between calls. History is
+    a random walk seeded by the coin id, so repeated requests return the same
+    series and a run is reproducible. 'latency' adds a fixed delay per
+    request to mimic the real API; every request is counted per endpoint so
+    load tests can report upstream traffic.
+
+    Set COINGECKO_BASE_URL to url before the app modules are imported.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0):
+        self.prices: Dict[str, float] = {'bitcoin': 94500.0, 'ethereum': 3200.0, 'solana': 145.0}
+        self.latency = latency
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+                status, reply = stub.handle(parts.path, params)
+                data = json.dumps(reply).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'StubCoinGecko':
+        self._thread = threading.Thread(target=self._server.serve_forever, name="coingecko-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'StubCoinGecko':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def request_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.requests)
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests.clear()
+
+    # ---------- routing ----------
+
+    def handle(self, path: str, params: Dict[str, str]):
+        segments = [segment for segment in path.split('/') if segment]
+        if len(segments) == 3 and segments[0] == 'coins' and segments[2] == 'market_chart':
+            endpoint = 'market_chart'
+        elif segments in (['simple', 'price'], ['exchange_rates']):
+            endpoint = '/'.join(segments)
+        else:
+            return 404, {'error': 'Not found'}
+
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        if endpoint == 'simple/price':
+            return 200, self._simple_price(params)
+        if endpoint == 'exchange_rates':
+            return 200, self._exchange_rates()
+        if segments[1] not in self.prices:
+            return 404, {'error': 'coin not found'}
+        return 200, self._market_chart(segments[1], params)
+
+    def _simple_price(self, params: Dict[str, str]) -> Dict:
+        reply = {}
+        for coin in params.get('ids', '').split(','):
+            price = self.prices.get(coin)
+            if price is None:
+                continue
+            rng = random.Random(zlib.crc32(coin.encode()))
+            quote = {'usd': price}
+            if params.get('include_24hr_change') == 'true':
+                quote['usd_24h_change'] = round(rng.uniform(-5, 5), 2)
+            if params.get('include_market_cap') == 'true':
+                quote['usd_market_cap'] = price * rng.uniform(1e7, 2e7)
+            if params.get('include_24hr_vol') == 'true':
+                quote['usd_24h_vol'] = price * rng.uniform(1e5, 5e5)
+            reply[coin] = quote
+        return reply
+
+    def _exchange_rates(self) -> Dict:
+        btc_usd = self.prices['bitcoin']
+        rates = {'btc': {'name': 'Bitcoin', 'unit': 'BTC', 'value': 1.0, 'type': 'crypto'}}
+        for code, per_usd in STUB_FX_RATES.items():
+            rates[code] = {'name': code.upper(), 'unit': code.upper(), 'value': btc_usd * per_usd, 'type': 'fiat'}
+        return {'rates': rates}
+
+    def _market_chart(self, coin: str, params: Dict[str, str]) -> Dict:
+        days = MAX_HISTORY_DAYS if params.get('days', '1') == 'max' else max(float(params.get('days', '1')), 1 / 24)
+        if params.get('interval') == 'daily' or days > 90:
+            step = 86400
+        elif days > 1:
+            step = 3600
+        else:
+            step = 300
+        points = max(int(days * 86400 // step), 2)
+
+        # Walk backwards from the live price so the series ends at the current quote
+        rng = random.Random(zlib.crc32(f"{coin}:{step}".encode()))
+        now = time.time()
+        price = self.prices[coin]
+        prices, volumes = [], []
+        for i in range(points):
+            ts = (now - i * step) * 1000
+            prices.append([ts, price])
+            volumes.append([ts, price * rng.uniform(1e5, 5e5)])
+            price = max(price * (1 + rng.gauss(0, 0.01 if step < 86400 else 0.03)), 1e-9)
+        prices.reverse()
+        volumes.reverse()
+        return {'prices': prices, 'total_volumes': volumes, 'market_caps': []}
@@ -0,0 +1,294 @@
+"""
+Instrumentation for PSI Sovereign System
+Process-wide latency histograms and counters with a Prometheus text endpoint
+"""
+
+import bisect
+import functools
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from modules.config import METRICS_HOST, METRICS_PORT
+
+# Upper bounds in seconds; covers cache hits (sub-ms) through slow upstream calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    body = ','.join(f'{key}="{value}"' for key, value in pairs)
+    return '{' + body + '}'
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and three adds under a lock"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * (len(self.buckets) + 1)
+            self.count = 0
+            self.sum = 0.0
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {'buckets': self.buckets, 'counts': list(self.counts), 'count': self.count, 'sum': self.sum}
+
+
+def quantile(snapshot: Dict, q: float) -> Optional[float]:
+    """
+    Estimate a quantile from a histogram snapshot (linear within a bucket)
+
+    Returns:
+        Seconds, or None if nothing was observed
+    """
+    total = snapshot['count']
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    lower = 0.0
+    for upper, count in zip(snapshot['buckets'], snapshot['counts']):
+        if count and seen + count >= rank:
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+        lower = upper
+    # Past the largest bucket: the largest bound is the best we know
+    return snapshot['buckets'][-1]
+
+
+class MetricsRegistry:
+    """
+    Named counters and histograms keyed by (name, labels)
+
+    Metrics are created on first use, so instrumented code needs no
+    registration step and page reruns reuse the same series.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        key = (name, _labels(labels))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        return histogram
+
+    def observe(self, name: str, value: float, **labels):
+        self.histogram(name, **labels).observe(value)
+
+    def counters(self) -> List[Dict]:
+        """Counter series as dicts with 'name', 'labels' and 'value'"""
+        with self._lock:
+            items = list(self._counters.items())
+        return [{'name': name, 'labels': dict(labels), 'value': value} for (name, labels), value in sorted(items)]
+
+    def histograms(self) -> List[Dict]:
+        """Histogram series with count, sum and p50/p95/p99 estimates (seconds)"""
+        with self._lock:
+            items = sorted(self._histograms.items(), key=lambda item: item[0])
+        rows = []
+        for (name, labels), histogram in items:
+            snapshot = histogram.snapshot()
+            rows.append({
+                'name': name,
+                'labels': dict(labels),
+                'count': snapshot['count'],
+                'sum': snapshot['sum'],
+                'mean': snapshot['sum'] / snapshot['count'] if snapshot['count'] else None,
+                'p50': quantile(snapshot, 0.50),
+                'p95': quantile(snapshot, 0.95),
+                'p99': quantile(snapshot, 0.99),
+            })
+        return rows
+
+    def render_prometheus(self) -> str:
+        """All series in the Prometheus text exposition format (0.0.4)"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                typed.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for (name, labels), histogram in histograms:
+            if name not in typed:
+                typed.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+            snapshot = histogram.snapshot()
+            cumulative = 0
+            for upper, count in zip(snapshot['buckets'], snapshot['counts']):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels, ('le', repr(upper)))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {snapshot['count']}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {snapshot['sum']}")
+            lines.append(f"{name}_count{_format_labels(labels)} {snapshot['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """Zero every series (histograms are kept; decorators hold references to them)"""
+        with self._lock:
+            self._counters.clear()
+            histograms = list(self._histograms.values())
+        for histogram in histograms:
+            histogram.reset()
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Process-wide registry shared by every session"""
+    return _registry
+
+
+class timed:
+    """
+    Time a block or function into the '<name>_seconds' histogram
+
+    Usable as a decorator (`@timed('psi_fetch', source='coingecko')`) or a
+    context manager (`with timed('psi_figure', chart='rsi'):`). Exceptions
+    are counted in '<name>_errors_total' and re-raised.
+    """
+
+    __slots__ = ('histogram', 'name', 'labels', '_started')
+
+    def __init__(self, name: str, **labels):
+        self.name = name
+        self.labels = labels
+        self.histogram = _registry.histogram(f"{name}_seconds", **labels)
+
+    def __enter__(self) -> 'timed':
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self._started)
+        if exc_type is not None:
+            _registry.inc(f"{self.name}_errors_total", **self.labels)
+        return False
+
+    def __call__(self, func: Callable) -> Callable:
+        histogram = self.histogram
+        name, labels = self.name, self.labels
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                _registry.inc(f"{name}_errors_total", **labels)
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - started)
+
+        return wrapper
+
+
+def count(name: str, value: float = 1.0, **labels):
+    """Increment the counter '<name>_total'"""
+    _registry.inc(f"{name}_total", value, **labels)
+
+
+# ---------- Prometheus endpoint ----------
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_error: Optional[str] = None
+_server_lock = threading.Lock()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = _registry.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(host: str = METRICS_HOST, port: int = METRICS_PORT) -> Optional[str]:
+    """
+    Serve /metrics on a daemon thread (once per process; port 0 disables it)
+
+    Returns:
+        The endpoint URL, or None if disabled or the port is taken
+    """
+    global _server, _server_error
+    if not port or _server_error:
+        return None
+    if _server is None:
+        with _server_lock:
+            if _server is None and not _server_error:
+                try:
+                    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+                except OSError as e:
+                    _server_error = str(e)
+                    print(f"Metrics endpoint not started on {host}:{port}: {e}")
+                    return None
+                threading.Thread(target=server.serve_forever, name="psi-metrics", daemon=True).start()
+                _server = server
+    if _server is None:
+        return None
+    bound_host, bound_port = _server.server_address[:2]
+    return f"http://{bound_host}:{bound_port}/metrics"
+
+
+_registry.describe('psi_fetch_seconds', "Upstream fetch latency (cache misses only)")
+_registry.describe('psi_cache_lookup_seconds', "Cached function call latency, hits and misses")
+_registry.describe('psi_indicator_seconds', "Technical indicator computation time")
+_registry.describe('psi_insights_seconds', "generate_insights run time")
+_registry.describe('psi_figure_seconds', "Plotly figure build time")
+_registry.describe('psi_log_write_seconds', "save_log_to_csv enqueue time")
@@ -0,0 +1,265 @@
+"""
+Portfolio valuation engine for PSI Sovereign System
+Stores holdings as columnar arrays and values them with vectorized operations
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from modules.startup import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+_INITIAL_CAPACITY = 64
+
+# Per-lot array attributes, kept in step by every mutation
+_COLUMNS = ('_id', '_coin', '_amount', '_price', '_acquired')
+
+
+class PortfolioEngine:
+    """
+    Columnar store of portfolio lots
+
+    Each lot is one row across parallel NumPy arrays (coin code, amount,
+    purchase price, acquisition time). Valuation, P/L and per-asset aggregates are computed for
+    all lots at once, so cost grows with array length rather than with Python
+    loop iterations.
+    """
+
+    def __init__(self, coins: Sequence[str] = ()):
+        self.coins: List[str] = []
+        self._coin_codes: Dict[str, int] = {}
+        for coin in coins:
+            self._code(coin)
+
+        self._size = 0
+        self._id = np.empty(_INITIAL_CAPACITY, dtype=np.int64)
+        self._coin = np.empty(_INITIAL_CAPACITY, dtype=np.int32)
+        self._amount = np.empty(_INITIAL_CAPACITY, dtype=np.float64)
+        self._price = np.empty(_INITIAL_CAPACITY, dtype=np.float64)
+        self._acquired = np.empty(_INITIAL_CAPACITY, dtype=np.float64)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict], coins: Sequence[str] = ()) -> 'PortfolioEngine':
+        """
+        Build an engine from portfolio dictionaries
+
+        Args:
+            records: Dicts with 'coin', 'amount' and 'purchase_price' keys
+                (and optionally a persistent lot 'id' and 'acquired_at')
+            coins: Optional asset universe to register up front
+
+        Returns:
+            Populated PortfolioEngine
+        """
+        engine = cls(coins)
+        records = list(records)
+        if records:
+            engine.add_lots(
+                [r['coin'] for r in records],
+                [r['amount'] for r in records],
+                [r['purchase_price'] for r in records],
+                [r.get('id', -1) for r in records],
+                [r.get('acquired_at', np.nan) for r in records]
+            )
+        return engine
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _code(self, coin: str) -> int:
+        code = self._coin_codes.get(coin)
+        if code is None:
+            code = len(self.coins)
+            self._coin_codes[coin] = code
+            self.coins.append(coin)
+        return code
+
+    def _reserve(self, extra: int):
+        needed = self._size + extra
+        capacity = len(self._amount)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in _COLUMNS:
+            old = getattr(self, name)
+            grown = np.empty(capacity, dtype=old.dtype)
+            grown[:self._size] = old[:self._size]
+            setattr(self, name, grown)
+
+    def add_lot(self, coin: str, amount: float, purchase_price: float, lot_id: int = -1,
+                acquired_at: float = math.nan) -> int:
+        """
+        Append a single lot (amortized O(1))
+
+        Returns:
+            Row index of the new lot
+        """
+        self._reserve(1)
+        idx = self._size
+        self._id[idx] = lot_id
+        self._coin[idx] = self._code(coin)
+        self._amount[idx] = amount
+        self._price[idx] = purchase_price
+        self._acquired[idx] = acquired_at
+        self._size += 1
+        return idx
+
+    def add_lots(self, coins: Sequence[str], amounts: Sequence[float], purchase_prices: Sequence[float],
+                 lot_ids: Optional[Sequence[int]] = None, acquired_at: Optional[Sequence[float]] = None):
+        """Append many lots in one array copy"""
+        count = len(amounts)
+        self._reserve(count)
+        end = self._size + count
+        self._id[self._size:end] = -1 if lot_ids is None else lot_ids
+        self._coin[self._size:end] = [self._code(c) for c in coins]
+        self._amount[self._size:end] = amounts
+        self._price[self._size:end] = purchase_prices
+        self._acquired[self._size:end] = np.nan if acquired_at is None else acquired_at
+        self._size = end
+
+    def snapshot(self) -> 'PortfolioEngine':
+        """Copy of the current lots, safe to read while this engine keeps growing"""
+        copy = PortfolioEngine()
+        copy.coins = list(self.coins)
+        copy._coin_codes = dict(self._coin_codes)
+        copy._size = self._size
+        for name in _COLUMNS:
+            setattr(copy, name, getattr(self, name)[:self._size].copy())
+        return copy
+
+    def remove_lot(self, index: int):
+        """Remove the lot at a row index, keeping row order"""
+        if not 0 <= index < self._size:
+            raise IndexError(f"lot index {index} out of range")
+        for arr in (getattr(self, name) for name in _COLUMNS):
+            arr[index:self._size - 1] = arr[index + 1:self._size]
+        self._size -= 1
+
+    def clear(self):
+        """Remove every lot"""
+        self._size = 0
+
+    @property
+    def lot_ids(self) -> 'np.ndarray':
+        return self._id[:self._size]
+
+    @property
+    def coin_codes(self) -> 'np.ndarray':
+        return self._coin[:self._size]
+
+    @property
+    def amounts(self) -> 'np.ndarray':
+        return self._amount[:self._size]
+
+    @property
+    def purchase_prices(self) -> 'np.ndarray':
+        return self._price[:self._size]
+
+    @property
+    def acquired_at(self) -> 'np.ndarray':
+        return self._acquired[:self._size]
+
+    def price_vector(self, prices: Dict[str, float]) -> 'np.ndarray':
+        """
+        Map a coin -> price dict onto the engine's coin codes
+
+        Coins without a quote are priced at NaN so they never look like a 100% loss.
+        """
+        return np.array([prices.get(coin, np.nan) for coin in self.coins], dtype=np.float64)
+
+    def valuate(self, prices: Dict[str, float], display_names: Optional[Dict[str, str]] = None) -> 'pd.DataFrame':
+        """
+        Value every lot against current prices
+
+        Args:
+            prices: Current price per coin
+            display_names: Optional coin -> label mapping for the 'Coin' column
+
+        Returns:
+            DataFrame with one row per lot and numeric columns
+        """
+        codes = self.coin_codes
+        amount = self.amounts
+        purchase_price = self.purchase_prices
+        current_price = self.price_vector(prices)[codes]
+
+        investment = amount * purchase_price
+        current_value = amount * current_price
+        profit_loss = current_value - investment
+        with np.errstate(divide='ignore', invalid='ignore'):
+            profit_loss_pct = np.where(investment > 0, profit_loss / investment * 100, 0.0)
+
+        labels = np.array([(display_names or {}).get(c, c) for c in self.coins], dtype=object)
+
+        return pd.DataFrame({
+            'index': np.arange(self._size),
+            'Coin': labels[codes],
+            'Amount': amount,
+            'Purchase Price': purchase_price,
+            'Current Price': current_price,
+            'Investment': investment,
+            'Current Value': current_value,
+            'Profit/Loss': profit_loss,
+            'P/L %': profit_loss_pct
+        })
+
+    def by_asset(self, prices: Dict[str, float], display_names: Optional[Dict[str, str]] = None) -> 'pd.DataFrame':
+        """
+        Aggregate holdings per coin with a single bincount pass
+
+        Args:
+            prices: Current price per coin
+            display_names: Optional coin -> label mapping for the 'Coin' column
+
+        Returns:
+            DataFrame with amount, investment, value, P/L, P/L % and allocation
+            per held coin
+        """
+        n_coins = len(self.coins)
+        codes = self.coin_codes
+        amount = self.amounts
+
+        held_amount = np.bincount(codes, weights=amount, minlength=n_coins)
+        investment = np.bincount(codes, weights=amount * self.purchase_prices, minlength=n_coins)
+        lots = np.bincount(codes, minlength=n_coins)
+        value = held_amount * self.price_vector(prices)
+        profit_loss = value - investment
+
+        total_value = np.nansum(value)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            profit_loss_pct = np.where(investment > 0, profit_loss / investment * 100, 0.0)
+            allocation = value / total_value * 100 if total_value > 0 else np.zeros(n_coins)
+
+        held = lots > 0
+        names = display_names or {}
+        return pd.DataFrame({
+            'coin': np.array(self.coins, dtype=object)[held],
+            'Coin': np.array([names.get(c, c) for c in self.coins], dtype=object)[held],
+            'Lots': lots[held],
+            'Amount': held_amount[held],
+            'Investment': investment[held],
+            'Current Value': value[held],
+            'Profit/Loss': profit_loss[held],
+            'P/L %': profit_loss_pct[held],
+            'Allocation %': allocation[held]
+        })
+
+    def totals(self, prices: Dict[str, float]) -> Dict[str, float]:
+        """
+        Compute portfolio-wide investment, value and P/L
+
+        Returns:
+            Dictionary with 'investment', 'value', 'profit_loss' and 'profit_loss_pct'
+        """
+        investment = float(np.dot(self.amounts, self.purchase_prices))
+        value = float(np.nansum(self.amounts * self.price_vector(prices)[self.coin_codes]))
+        profit_loss = value - investment
+        return {
+            'investment': investment,
+            'value': value,
+            'profit_loss': profit_loss,
+            'profit_loss_pct': (profit_loss / investment) * 100 if investment > 0 else 0.0
+        }
@@ -0,0 +1,195 @@
+"""
+Bulk transaction import for PSI Sovereign System
+Streams exchange/wallet CSV exports into the portfolio store in chunks
+"""
+
+import time
+from typing import Dict, IO, Optional, Tuple, Union
+
+from modules.portfolio_store import PortfolioStore
+from modules.startup import lazy_import
+from modules.utils import validate_csv_structure
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Rows parsed and inserted per batch; bounds memory regardless of file size
+IMPORT_CHUNK_SIZE = 50_000
+
+REQUIRED_COLUMNS = ['coin', 'amount', 'purchase_price']
+
+# Header spellings seen in common exchange and wallet exports
+COLUMN_ALIASES = {
+    'asset': 'coin',
+    'currency': 'coin',
+    'symbol': 'coin',
+    'coin': 'coin',
+    'amount': 'amount',
+    'quantity': 'amount',
+    'qty': 'amount',
+    'size': 'amount',
+    'price': 'purchase_price',
+    'purchase_price': 'purchase_price',
+    'price_usd': 'purchase_price',
+    'unit_price': 'purchase_price',
+    'date': 'acquired_at',
+    'time': 'acquired_at',
+    'timestamp': 'acquired_at',
+    'acquired_at': 'acquired_at',
+    'side': 'side',
+    'type': 'side',
+}
+
+# Ticker symbols mapped onto the CoinGecko ids used across the app
+SYMBOL_TO_COIN = {
+    'btc': 'bitcoin',
+    'bitcoin': 'bitcoin',
+    'eth': 'ethereum',
+    'ethereum': 'ethereum',
+    'sol': 'solana',
+    'solana': 'solana',
+}
+
+
+def normalize_columns(columns) -> Dict[str, str]:
+    """
+    Map raw CSV headers onto the import schema
+
+    Args:
+        columns: Raw header names
+
+    Returns:
+        Dictionary of raw header -> schema column for recognised headers
+    """
+    mapping = {}
+    for col in columns:
+        key = str(col).strip().lower().replace(' ', '_')
+        target = COLUMN_ALIASES.get(key)
+        if target and target not in mapping.values():
+            mapping[col] = target
+    return mapping
+
+
+# Transaction sides; rows with any other side (transfers, fees, ...) are skipped
+BUY_SIDES = ['buy', 'deposit', 'receive']
+SELL_SIDES = ['sell', 'sale']
+
+# Row numbers of unparseable dates kept for the import report
+MAX_REPORTED_ROWS = 20
+
+
+def clean_chunk(chunk: 'pd.DataFrame', default_time: float) -> Tuple['pd.DataFrame', 'pd.Index']:
+    """
+    Validate and normalize one chunk with vectorized operations
+
+    Rows with unknown coins, non-positive amounts, negative prices,
+    unrecognised sides or dates that cannot be parsed are dropped. Rows
+    with an empty date use default_time.
+
+    Returns:
+        Tuple of (DataFrame with 'coin', 'amount', 'price', 'timestamp' and
+        boolean 'sell' columns, index labels of rows whose date failed to parse)
+    """
+    coin = chunk['coin'].astype(str).str.strip().str.lower().map(SYMBOL_TO_COIN)
+    amount = pd.to_numeric(chunk['amount'], errors='coerce')
+    price = pd.to_numeric(chunk['purchase_price'], errors='coerce')
+
+    bad_date = pd.Series(False, index=chunk.index)
+    if 'acquired_at' in chunk:
+        raw = chunk['acquired_at'].str.strip()
+        parsed = pd.to_datetime(raw, errors='coerce', utc=True, format='mixed')
+        blank = raw.isna() | (raw == '')
+        bad_date = parsed.isna() & ~blank
+        # Epoch seconds regardless of the datetime resolution pandas picked
+        seconds = (parsed - pd.Timestamp(0, tz='UTC')) // pd.Timedelta('1s')
+        timestamp = seconds.where(~blank, default_time)
+    else:
+        timestamp = pd.Series(default_time, index=chunk.index)
+
+    if 'side' in chunk:
+        side = chunk['side'].astype(str).str.strip().str.lower()
+        sell = side.isin(SELL_SIDES)
+        known_side = sell | side.isin(BUY_SIDES)
+    else:
+        sell = pd.Series(False, index=chunk.index)
+        known_side = pd.Series(True, index=chunk.index)
+
+    valid = coin.notna() & (amount > 0) & (price >= 0) & known_side & ~bad_date
+
+    cleaned = pd.DataFrame({
+        'coin': coin[valid],
+        'amount': amount[valid].astype(np.float64),
+        'price': price[valid].astype(np.float64),
+        'timestamp': timestamp[valid].astype(np.float64),
+        'sell': sell[valid]
+    })
+    return cleaned, chunk.index[bad_date.to_numpy()]
+
+
+def import_transactions_csv(source: Union[str, IO], user: str, store: PortfolioStore,
+                            chunksize: int = IMPORT_CHUNK_SIZE,
+                            default_time: Optional[float] = None) -> Dict:
+    """
+    Stream a transactions CSV into the portfolio store
+
+    The file is read chunk by chunk; each chunk is validated and its buys
+    are inserted in one transaction, so memory stays bounded and there is
+    one rerun for the whole import rather than one per row. Sells are kept
+    (four columns each) and recorded after the last chunk, so in a
+    newest-first export a sale is checked against buys from every chunk,
+    not only the ones read before it.
+
+    Args:
+        source: Path or file-like object
+        user: Portfolio owner
+        store: PortfolioStore to insert into
+        chunksize: Rows per chunk
+        default_time: Time for rows with an empty date (defaults to now)
+
+    Returns:
+        Dictionary with 'rows', 'imported' (buys), 'sells', 'oversold'
+        (sales exceeding the amount held), 'skipped', 'bad_dates' and
+        'chunks' counts, plus 'bad_date_rows' (file line
+        numbers of the first unparseable dates)
+
+    Raises:
+        ValueError: If the CSV lacks the required columns
+    """
+    default_time = time.time() if default_time is None else default_time
+    stats = {'rows': 0, 'imported': 0, 'sells': 0, 'oversold': 0, 'skipped': 0, 'bad_dates': 0, 'chunks': 0, 'bad_date_rows': []}
+
+    reader = pd.read_csv(source, chunksize=chunksize, dtype=str, skipinitialspace=True)
+    mapping = None
+    columns = ['coin', 'amount', 'price', 'timestamp']
+    sells = []
+    for chunk in reader:
+        if mapping is None:
+            mapping = normalize_columns(chunk.columns)
+            if not validate_csv_structure(chunk.rename(columns=mapping), REQUIRED_COLUMNS):
+                raise ValueError(
+                    f"CSV must contain columns for {', '.join(REQUIRED_COLUMNS)} "
+                    f"(found: {', '.join(map(str, chunk.columns))})"
+                )
+        chunk = chunk.rename(columns=mapping)[list(dict.fromkeys(mapping.values()))]
+        cleaned, bad_dates = clean_chunk(chunk, default_time)
+
+        buys = cleaned[~cleaned['sell']]
+        if len(buys):
+            store.add_lots(user, buys[columns].itertuples(index=False, name=None))
+        sells.append(cleaned.loc[cleaned['sell'], columns])
+
+        stats['rows'] += len(chunk)
+        stats['imported'] += len(buys)
+        stats['skipped'] += len(chunk) - len(cleaned)
+        stats['bad_dates'] += len(bad_dates)
+        # Data rows start on line 2, after the header
+        room = MAX_REPORTED_ROWS - len(stats['bad_date_rows'])
+        stats['bad_date_rows'].extend(int(label) + 2 for label in bad_dates[:max(room, 0)])
+        stats['chunks'] += 1
+
+    sells = pd.concat(sells, ignore_index=True) if sells else pd.DataFrame(columns=columns)
+    # Sales larger than what was held at the time are rejected by the store
+    recorded = store.add_sells(user, sells.itertuples(index=False, name=None)) if len(sells) else 0
+    stats['sells'] = recorded
+    stats['oversold'] = len(sells) - recorded
+    return stats
@@ -0,0 +1,504 @@
+"""
+Persistent portfolio store for PSI Sovereign System
+SQLite (WAL mode) lot storage with per-coin cached valuations
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from modules.config import PORTFOLIO_DB_FILE
+from modules.portfolio import PortfolioEngine
+from modules.startup import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user TEXT NOT NULL,
+    coin TEXT NOT NULL,
+    amount REAL NOT NULL,
+    purchase_price REAL NOT NULL,
+    acquired_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lots_user_coin ON lots(user, coin);
+CREATE INDEX IF NOT EXISTS idx_lots_coin ON lots(coin);
+CREATE TABLE IF NOT EXISTS sells (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user TEXT NOT NULL,
+    coin TEXT NOT NULL,
+    amount REAL NOT NULL,
+    price REAL NOT NULL,
+    sold_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sells_user_coin ON sells(user, coin);
+"""
+
+# Sales may exceed the open amount by this much (float dust)
+_EPSILON = 1e-9
+
+
+class PortfolioStore:
+    """
+    Durable lot storage keyed by user and coin
+
+    Adds and removes are single-row writes. Valuations are cached per
+    (user, coin): lot aggregates are only recomputed when that coin's lots
+    or sales change, and a new price for one coin only re-multiplies that
+    coin's cached amount.
+
+    Sales are checked against the amount open at their time and at every
+    later point, so recorded sales never exceed what was bought; holdings
+    are valued net of them, with sold amounts removed at average cost.
+    """
+
+    def __init__(self, path: str = PORTFOLIO_DB_FILE):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # (user, coin) -> (amount held net of sales, its cost at average cost, lot count)
+        self._aggregates: Dict[Tuple[str, str], Tuple[float, float, int]] = {}
+        # (user, coin) -> (price, amount, value)
+        self._valuations: Dict[Tuple[str, str], Tuple[float, float, float]] = {}
+        # user -> (PortfolioEngine holding that user's lots, highest lot id it was built from)
+        self._engines: Dict[str, Tuple[PortfolioEngine, int]] = {}
+        # user -> count of writes, so a rebuild or aggregate racing a write is not cached
+        self._generations: Dict[str, int] = {}
+        # user -> count of removals/clears, so append-only readers know when to rebuild
+        self._revisions: Dict[str, int] = {}
+
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _invalidate(self, user: str, coin: Optional[str] = None, destructive: bool = False):
+        with self._lock:
+            if destructive:
+                self._revisions[user] = self._revisions.get(user, 0) + 1
+            self._generations[user] = self._generations.get(user, 0) + 1
+            self._engines.pop(user, None)
+            keys = [k for k in self._aggregates if k[0] == user] if coin is None else [(user, coin)]
+            for key in keys:
+                self._aggregates.pop(key, None)
+                self._valuations.pop(key, None)
+
+    def _drop_valuation(self, user: str, coin: str):
+        with self._lock:
+            self._generations[user] = self._generations.get(user, 0) + 1
+            self._aggregates.pop((user, coin), None)
+            self._valuations.pop((user, coin), None)
+
+    def _check_sales(self, conn: sqlite3.Connection, user: str, coin: str,
+                     sales: List[Tuple[float, float]]) -> Tuple['np.ndarray', 'np.ndarray']:
+        """
+        Check sales of one coin against its open amount, earliest first
+
+        A sale at time t is covered if the running balance of buys minus
+        sales stays non-negative from t on once it (and every earlier
+        accepted sale) is deducted.
+
+        Args:
+            conn: Connection, ideally inside a write transaction
+            sales: (time, amount) pairs
+
+        Returns:
+            Tuple of (accepted mask, amount available to each sale), in the order given
+        """
+        rows = conn.execute(
+            "SELECT acquired_at, amount FROM lots WHERE user = ? AND coin = ? "
+            "UNION ALL SELECT sold_at, -amount FROM sells WHERE user = ? AND coin = ?",
+            (user, coin, user, coin)
+        ).fetchall()
+        events = np.array(rows, dtype=np.float64).reshape(-1, 2)
+        # Buys sort before sales at the same time, as the lot matcher applies them
+        order = np.lexsort((events[:, 1] < 0, events[:, 0]))
+        times = events[order, 0]
+        balance = np.cumsum(events[order, 1])
+        floor_from = np.minimum.accumulate(balance[::-1])[::-1]
+
+        accepted = np.zeros(len(sales), dtype=bool)
+        available = np.zeros(len(sales))
+        taken = 0.0
+        for i in sorted(range(len(sales)), key=lambda i: sales[i][0]):
+            sold_at, amount = sales[i]
+            idx = int(np.searchsorted(times, sold_at, side='right'))
+            at_sale = balance[idx - 1] if idx else 0.0
+            later = floor_from[idx] if idx < len(balance) else np.inf
+            available[i] = max(min(at_sale, later) - taken, 0.0)
+            if amount <= available[i] + _EPSILON:
+                accepted[i] = True
+                taken += amount
+        return accepted, available
+
+    def add_lot(self, user: str, coin: str, amount: float, purchase_price: float,
+                acquired_at: Optional[float] = None) -> int:
+        """
+        Insert a single lot
+
+        Args:
+            user: Portfolio owner
+            coin: Coin identifier (e.g. 'bitcoin')
+            amount: Quantity bought
+            purchase_price: Unit price paid
+            acquired_at: Unix time of purchase (defaults to now)
+
+        Returns:
+            Persistent lot id
+        """
+        acquired_at = time.time() if acquired_at is None else acquired_at
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO lots (user, coin, amount, purchase_price, acquired_at) VALUES (?, ?, ?, ?, ?)",
+                (user, coin, amount, purchase_price, acquired_at)
+            )
+        lot_id = cursor.lastrowid
+        with self._lock:
+            cached = self._engines.get(user)
+            # An engine built after the INSERT committed already holds the lot
+            if cached is not None and lot_id > cached[1]:
+                cached[0].add_lot(coin, amount, purchase_price, lot_id, acquired_at)
+            # A rebuild that read the lots before the INSERT must not be cached
+            self._generations[user] = self._generations.get(user, 0) + 1
+            self._aggregates.pop((user, coin), None)
+            self._valuations.pop((user, coin), None)
+        return lot_id
+
+    def add_lots(self, user: str, rows: Iterable[Tuple[str, float, float, float]]) -> int:
+        """
+        Insert many lots in a single transaction
+
+        Args:
+            user: Portfolio owner
+            rows: Iterable of (coin, amount, purchase_price, acquired_at)
+
+        Returns:
+            Number of lots inserted
+        """
+        with self._connection() as conn:
+            cursor = conn.executemany(
+                "INSERT INTO lots (user, coin, amount, purchase_price, acquired_at) VALUES (?, ?, ?, ?, ?)",
+                ((user, coin, amount, price, acquired_at) for coin, amount, price, acquired_at in rows)
+            )
+        self._invalidate(user)
+        return cursor.rowcount
+
+    def remove_lot(self, user: str, lot_id: int) -> Optional[Dict]:
+        """
+        Delete a lot by id
+
+        Returns:
+            The removed lot as a dictionary, or None if it did not exist
+
+        Raises:
+            ValueError: If recorded sales need the lot to stay covered
+        """
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM lots WHERE id = ? AND user = ?", (lot_id, user)
+            ).fetchone()
+            if row is None:
+                return None
+            # Removing a lot lowers the balance from its purchase on, exactly like a sale would
+            covered, _ = self._check_sales(conn, user, row['coin'], [(row['acquired_at'], row['amount'])])
+            if not covered[0]:
+                raise ValueError(f"Lot {lot_id} is needed to cover recorded sales of {row['coin']}")
+            conn.execute("DELETE FROM lots WHERE id = ?", (lot_id,))
+        self._invalidate(user, row['coin'], destructive=True)
+        return dict(row)
+
+    def clear(self, user: str):
+        """Delete every lot of a user"""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM lots WHERE user = ?", (user,))
+            conn.execute("DELETE FROM sells WHERE user = ?", (user,))
+        self._invalidate(user, destructive=True)
+
+    def revision(self, user: str) -> int:
+        """
+        Get a counter that changes whenever lots or sales are removed
+
+        Readers that only consume new rows (after_id) rebuild when it changes.
+        """
+        with self._lock:
+            return self._revisions.get(user, 0)
+
+    def add_sell(self, user: str, coin: str, amount: float, price: float,
+                 sold_at: Optional[float] = None) -> int:
+        """
+        Record a sale
+
+        Args:
+            user: Portfolio owner
+            coin: Coin identifier
+            amount: Quantity sold
+            price: Unit sale price
+            sold_at: Unix time of sale (defaults to now)
+
+        Returns:
+            Persistent sale id
+
+        Raises:
+            ValueError: If the amount is more than was open at sold_at (or
+                would leave a later sale uncovered)
+        """
+        sold_at = time.time() if sold_at is None else sold_at
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            covered, available = self._check_sales(conn, user, coin, [(sold_at, amount)])
+            if not covered[0]:
+                raise ValueError(f"Cannot sell {amount:g} {coin}: only {available[0]:g} available at that time")
+            cursor = conn.execute(
+                "INSERT INTO sells (user, coin, amount, price, sold_at) VALUES (?, ?, ?, ?, ?)",
+                (user, coin, amount, price, sold_at)
+            )
+        self._drop_valuation(user, coin)
+        return cursor.lastrowid
+
+    def add_sells(self, user: str, rows: Iterable[Tuple[str, float, float, float]]) -> int:
+        """
+        Record many sales in a single transaction
+
+        Sales are checked per coin in time order like add_sell; those that
+        are not covered by open lots are left out.
+
+        Args:
+            user: Portfolio owner
+            rows: Iterable of (coin, amount, price, sold_at)
+
+        Returns:
+            Number of sales inserted
+        """
+        by_coin: Dict[str, List[Tuple[str, float, float, float]]] = {}
+        for row in rows:
+            by_coin.setdefault(row[0], []).append(row)
+
+        inserted = 0
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for coin, sales in by_coin.items():
+                covered, _ = self._check_sales(conn, user, coin, [(sold_at, amount) for _, amount, _, sold_at in sales])
+                cursor = conn.executemany(
+                    "INSERT INTO sells (user, coin, amount, price, sold_at) VALUES (?, ?, ?, ?, ?)",
+                    ((user, c, amount, price, sold_at)
+                     for (c, amount, price, sold_at), ok in zip(sales, covered) if ok)
+                )
+                inserted += max(cursor.rowcount, 0)
+        for coin in by_coin:
+            self._drop_valuation(user, coin)
+        return inserted
+
+    def sells(self, user: str, after_id: int = 0) -> List[Dict]:
+        """
+        Read sales of a user in insertion order
+
+        Args:
+            user: Portfolio owner
+            after_id: Only return sales with a larger id
+
+        Returns:
+            List of sale dictionaries
+        """
+        rows = self._connection().execute(
+            "SELECT * FROM sells WHERE user = ? AND id > ? ORDER BY id", (user, after_id)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def sell_arrays(self, user: str) -> Dict[str, 'np.ndarray']:
+        """
+        Read sales of a user as parallel arrays
+
+        Returns:
+            Dictionary of 'id', 'coin' (object), 'amount', 'price' and 'sold_at' arrays
+        """
+        rows = self._connection().execute(
+            "SELECT id, coin, amount, price, sold_at FROM sells WHERE user = ? ORDER BY id", (user,)
+        ).fetchall()
+        columns = list(zip(*rows)) if rows else [(), (), (), (), ()]
+        return {
+            'id': np.array(columns[0], dtype=np.int64),
+            'coin': np.array(columns[1], dtype=object),
+            'amount': np.array(columns[2], dtype=np.float64),
+            'price': np.array(columns[3], dtype=np.float64),
+            'sold_at': np.array(columns[4], dtype=np.float64)
+        }
+
+    def lots(self, user: str, coin: Optional[str] = None, after_id: int = 0) -> List[Dict]:
+        """
+        Read lots of a user, oldest first
+
+        Args:
+            user: Portfolio owner
+            coin: Optional coin filter
+            after_id: Only return lots with a larger id
+
+        Returns:
+            List of lot dictionaries
+        """
+        query = "SELECT * FROM lots WHERE user = ? AND id > ?"
+        params: tuple = (user, after_id)
+        if coin is not None:
+            query += " AND coin = ?"
+            params += (coin,)
+        rows = self._connection().execute(query + " ORDER BY id", params).fetchall()
+        return [dict(row) for row in rows]
+
+    def engine(self, user: str, coins: Tuple[str, ...] = ()) -> PortfolioEngine:
+        """
+        Get the columnar engine for a user's lots
+
+        The shared engine is built from SQLite once and then kept in step
+        with add_lot; removals and clears drop it so it is rebuilt on next
+        use. Callers get a snapshot taken under the store lock, so they can
+        read it while other sessions add lots.
+        """
+        with self._lock:
+            cached = self._engines.get(user)
+            if cached is not None:
+                return cached[0].snapshot()
+            generation = self._generations.get(user, 0)
+
+        records = self.lots(user)
+        engine = PortfolioEngine.from_records(records, coins)
+        built_from = records[-1]['id'] if records else 0
+        with self._lock:
+            # Only cache the rebuild if no write invalidated it meanwhile
+            if self._generations.get(user, 0) == generation and user not in self._engines:
+                self._engines[user] = (engine, built_from)
+                return engine.snapshot()
+        return engine
+
+    def _aggregate(self, user: str, coin: str) -> Tuple[float, float, int]:
+        key = (user, coin)
+        with self._lock:
+            cached = self._aggregates.get(key)
+            generation = self._generations.get(user, 0)
+        if cached is not None:
+            return cached
+        row = self._connection().execute(
+            "SELECT COALESCE(SUM(amount), 0), COALESCE(SUM(amount * purchase_price), 0), COUNT(*) "
+            "FROM lots WHERE user = ? AND coin = ?",
+            (user, coin)
+        ).fetchone()
+        sold = self._connection().execute(
+            "SELECT COALESCE(SUM(amount), 0) FROM sells WHERE user = ? AND coin = ?", (user, coin)
+        ).fetchone()[0]
+        bought, cost = float(row[0]), float(row[1])
+        held = max(bought - float(sold), 0.0)
+        # Sold amounts leave at average cost
+        aggregate = (held, cost * held / bought if bought > 0 else 0.0, int(row[2]))
+        with self._lock:
+            # Only cache it if no write landed while the sums were read
+            if self._generations.get(user, 0) == generation:
+                self._aggregates[key] = aggregate
+        return aggregate
+
+    def coins(self, user: str) -> List[str]:
+        """List coins a user currently holds"""
+        rows = self._connection().execute(
+            "SELECT DISTINCT coin FROM lots WHERE user = ?", (user,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def valuation(self, user: str, prices: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+        """
+        Value a user's holdings per coin, reusing every unchanged entry
+
+        Args:
+            user: Portfolio owner
+            prices: Current price per coin
+
+        Returns:
+            Mapping of coin to 'amount', 'investment', 'lots', 'price' and
+            'value', net of sales; fully sold coins are left out
+        """
+        result = {}
+        for coin in self.coins(user):
+            amount, investment, lots = self._aggregate(user, coin)
+            if amount <= _EPSILON:
+                continue
+            price = prices.get(coin)
+            key = (user, coin)
+            with self._lock:
+                cached = self._valuations.get(key)
+            if cached is not None and cached[:2] == (price, amount):
+                value = cached[2]
+            else:
+                value = amount * price if price is not None else float('nan')
+                with self._lock:
+                    self._valuations[key] = (price, amount, value)
+            result[coin] = {
+                'amount': amount,
+                'investment': investment,
+                'lots': lots,
+                'price': price,
+                'value': value
+            }
+        return result
+
+
+def holdings_frame(holdings: Dict[str, Dict[str, float]],
+                   display_names: Optional[Dict[str, str]] = None) -> 'pd.DataFrame':
+    """
+    Turn a PortfolioStore.valuation() result into a per-asset DataFrame
+
+    Args:
+        holdings: Per-coin valuation dictionary
+        display_names: Optional coin -> label mapping for the 'Coin' column
+
+    Returns:
+        DataFrame with the same columns as PortfolioEngine.by_asset()
+    """
+    names = display_names or {}
+    df = pd.DataFrame([
+        {
+            'coin': coin,
+            'Coin': names.get(coin, coin),
+            'Lots': h['lots'],
+            'Amount': h['amount'],
+            'Investment': h['investment'],
+            'Current Value': h['value'],
+            'Profit/Loss': h['value'] - h['investment']
+        }
+        for coin, h in holdings.items()
+    ], columns=['coin', 'Coin', 'Lots', 'Amount', 'Investment', 'Current Value', 'Profit/Loss'])
+    investment = df['Investment'].where(df['Investment'] > 0)
+    df['P/L %'] = (df['Profit/Loss'] / investment * 100).fillna(0.0)
+    total_value = df['Current Value'].sum()
+    df['Allocation %'] = df['Current Value'] / total_value * 100 if total_value > 0 else 0.0
+    return df
+
+
+_store: Optional[PortfolioStore] = None
+_store_lock = threading.Lock()
+
+
+def get_portfolio_store() -> PortfolioStore:
+    """
+    Get the process-wide portfolio store
+
+    Returns:
+        PortfolioStore singleton backed by PORTFOLIO_DB_FILE
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PortfolioStore()
+    return _store
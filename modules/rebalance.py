@@ -0,0 +1,139 @@
+"""
+Portfolio rebalancing optimizer for PSI Sovereign System
+Proposes target weights from return covariance and the trades to reach them
+"""
+
+from typing import Dict, Sequence
+
+from modules.startup import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+REBALANCE_METHODS = {
+    'equal_weight': 'Equal Weight',
+    'inverse_volatility': 'Inverse Volatility',
+    'minimum_variance': 'Minimum Variance',
+}
+
+# Ridge added to the covariance diagonal (relative to its mean variance)
+# so the minimum-variance solve stays stable with short or collinear history
+SHRINKAGE = 1e-4
+
+
+def _minimum_variance(cov: 'np.ndarray') -> 'np.ndarray':
+    """Long-only minimum-variance weights via an active-set solve"""
+    n = len(cov)
+    ridge = SHRINKAGE * max(float(np.trace(cov)) / max(n, 1), 1e-12)
+    cov = cov + np.eye(n) * ridge
+    active = np.ones(n, dtype=bool)
+    weights = np.zeros(n)
+    for _ in range(n):
+        sub = cov[np.ix_(active, active)]
+        raw = np.linalg.solve(sub, np.ones(active.sum()))
+        weights[:] = 0.0
+        weights[active] = raw / raw.sum()
+        if (weights >= 0).all():
+            break
+        # Drop assets the unconstrained solution wants to short and re-solve
+        active &= weights > 0
+    return weights
+
+
+def target_weights(method: str, cov: 'np.ndarray') -> 'np.ndarray':
+    """
+    Compute target weights for a rebalancing method
+
+    Args:
+        method: One of REBALANCE_METHODS
+        cov: Return covariance matrix of the assets
+
+    Returns:
+        Weight vector summing to 1
+    """
+    cov = np.atleast_2d(np.asarray(cov, dtype=np.float64))
+    n = len(cov)
+    if n == 0:
+        return np.zeros(0)
+
+    if method == 'equal_weight':
+        return np.full(n, 1.0 / n)
+
+    volatility = np.sqrt(np.clip(np.diag(cov), 0, None))
+    if not volatility.any():
+        return np.full(n, 1.0 / n)
+
+    if method == 'inverse_volatility':
+        inverse = np.where(volatility > 0, 1.0 / np.where(volatility > 0, volatility, 1.0), 0.0)
+        if not inverse.any():
+            return np.full(n, 1.0 / n)
+        return inverse / inverse.sum()
+
+    if method == 'minimum_variance':
+        return _minimum_variance(cov)
+
+    raise ValueError(f"Unknown rebalancing method: {method}")
+
+
+def rebalance_trades(assets: Sequence[str], values: Sequence[float], prices: Sequence[float],
+                     weights: Sequence[float], min_trade: float = 1.0) -> 'pd.DataFrame':
+    """
+    Trades needed to move current holdings to target weights
+
+    Args:
+        assets: Asset identifiers
+        values: Current value per asset
+        prices: Current unit price per asset
+        weights: Target weight per asset
+        min_trade: Trades smaller than this value are reported as holds
+
+    Returns:
+        DataFrame with current and target weights and values, trade value,
+        trade amount and action per asset
+    """
+    values = np.asarray(values, dtype=np.float64)
+    prices = np.asarray(prices, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+
+    total = values.sum()
+    target_values = weights * total
+    trade_values = target_values - values
+    with np.errstate(divide='ignore', invalid='ignore'):
+        current_weights = values / total if total > 0 else np.zeros_like(values)
+        trade_amounts = np.where(prices > 0, trade_values / prices, 0.0)
+
+    actions = np.where(np.abs(trade_values) < min_trade, 'Hold', np.where(trade_values > 0, 'Buy', 'Sell'))
+    return pd.DataFrame({
+        'asset': list(assets),
+        'Current Weight %': current_weights * 100,
+        'Target Weight %': weights * 100,
+        'Current Value': values,
+        'Target Value': target_values,
+        'Trade Value': trade_values,
+        'Trade Amount': trade_amounts,
+        'Action': actions
+    })
+
+
+def propose_rebalance(method: str, values: Dict[str, float], prices: Dict[str, float],
+                      cov: 'np.ndarray') -> 'pd.DataFrame':
+    """
+    Target weights and trades for held assets
+
+    Args:
+        method: One of REBALANCE_METHODS
+        values: Current value per asset (order matches cov)
+        prices: Current unit price per asset
+        cov: Return covariance matrix of the assets in values
+
+    Returns:
+        DataFrame as returned by rebalance_trades()
+    """
+    assets = list(values)
+    weights = target_weights(method, cov)
+    return rebalance_trades(
+        assets,
+        [values[a] for a in assets],
+        [prices.get(a, 0.0) for a in assets],
+        weights
+    )
@@ -0,0 +1,266 @@
+"""
+Monte Carlo portfolio risk engine for PSI Sovereign System
+Simulates portfolio returns from historical covariance and reports VaR/CVaR
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from modules.startup import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+DEFAULT_HORIZONS = (1, 7, 30)
+DEFAULT_CONFIDENCE_LEVELS = (0.95, 0.99)
+DEFAULT_PATHS = 100_000
+
+# Paths simulated per NumPy batch; bounds peak memory per worker
+BATCH_SIZE = 100_000
+
+# Below this many paths the process pool costs more than it saves
+PARALLEL_THRESHOLD = 200_000
+
+# Percentiles reported for the outcome distribution
+DISTRIBUTION_PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+_CACHE_SIZE = 32
+
+
+def estimate_return_model(price_frame: 'pd.DataFrame') -> Tuple['np.ndarray', 'np.ndarray']:
+    """
+    Estimate daily log-return mean and covariance
+
+    Args:
+        price_frame: Daily prices, one column per asset, aligned on a date index
+
+    Returns:
+        Tuple of (mean vector, covariance matrix)
+    """
+    returns = np.log(price_frame).diff().dropna(how='any')
+    if len(returns) < 2:
+        n = price_frame.shape[1]
+        return np.zeros(n), np.zeros((n, n))
+    return returns.mean().to_numpy(), np.atleast_2d(returns.cov().to_numpy())
+
+
+def _cholesky(cov: 'np.ndarray') -> 'np.ndarray':
+    """Cholesky factor, nudging the diagonal if the matrix is only semi-definite"""
+    jitter = 0.0
+    scale = max(float(np.trace(cov)) / max(len(cov), 1), 1e-12)
+    for _ in range(6):
+        try:
+            return np.linalg.cholesky(cov + np.eye(len(cov)) * jitter)
+        except np.linalg.LinAlgError:
+            jitter = scale * 1e-8 if jitter == 0.0 else jitter * 10
+    # Fall back to an eigen-decomposition with negative eigenvalues clipped
+    eigenvalues, eigenvectors = np.linalg.eigh(cov)
+    return eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+
+
+def _simulate_batch(args) -> 'np.ndarray':
+    """
+    Simulate one batch of portfolio P/L outcomes (runs in worker processes)
+
+    Returns:
+        Array of shape (len(horizons), n_paths)
+    """
+    seed, n_paths, values, mu, chol, horizons = args
+    rng = np.random.default_rng(seed)
+    out = np.empty((len(horizons), n_paths))
+    for i, horizon in enumerate(horizons):
+        z = rng.standard_normal((n_paths, len(values)))
+        log_returns = horizon * mu + np.sqrt(horizon) * (z @ chol.T)
+        out[i] = np.expm1(log_returns) @ values
+    return out
+
+
+class RiskEngine:
+    """
+    Vectorized Monte Carlo simulator for portfolio value at risk
+
+    Paths are generated in NumPy batches. Large runs are split across a
+    process pool, one batch per task.
+
+    Simulated P/L is linear in the amount invested, so runs are cached per
+    unit of portfolio value, keyed on the portfolio weights (to 0.1%) and
+    the daily returns of completed days. Live price refreshes only rescale
+    a cached report; a new simulation runs when the weights move or a new
+    day of history closes.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, batch_size: int = BATCH_SIZE):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._cache: 'OrderedDict[tuple, Dict]' = OrderedDict()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def simulate(self, values: Sequence[float], mu: 'np.ndarray', cov: 'np.ndarray',
+                 horizons: Sequence[int] = DEFAULT_HORIZONS, n_paths: int = DEFAULT_PATHS,
+                 seed: int = 0) -> 'np.ndarray':
+        """
+        Simulate portfolio P/L at each horizon
+
+        Args:
+            values: Current value held in each asset
+            mu: Daily log-return means
+            cov: Daily log-return covariance
+            horizons: Horizons in days
+            n_paths: Number of simulated paths per horizon
+            seed: Base seed; batches get independent child streams
+
+        Returns:
+            Array of shape (len(horizons), n_paths) with P/L in currency units
+        """
+        values = np.asarray(values, dtype=np.float64)
+        chol = _cholesky(np.asarray(cov, dtype=np.float64))
+        horizons = tuple(int(h) for h in horizons)
+
+        sizes = [self.batch_size] * (n_paths // self.batch_size)
+        if n_paths % self.batch_size:
+            sizes.append(n_paths % self.batch_size)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        tasks = [(s, size, values, np.asarray(mu, dtype=np.float64), chol, horizons) for s, size in zip(seeds, sizes)]
+
+        if n_paths >= PARALLEL_THRESHOLD and self.max_workers > 1:
+            try:
+                return np.concatenate(list(self._executor().map(_simulate_batch, tasks)), axis=1)
+            except (OSError, RuntimeError) as e:
+                # Pool unavailable (e.g. restricted sandbox); run inline instead
+                print(f"Risk engine falling back to single process: {e}")
+                self.shutdown()
+        return np.concatenate([_simulate_batch(task) for task in tasks], axis=1)
+
+    def analyze(self, values: Dict[str, float], price_frame: 'pd.DataFrame',
+                horizons: Sequence[int] = DEFAULT_HORIZONS, n_paths: int = DEFAULT_PATHS,
+                confidence_levels: Sequence[float] = DEFAULT_CONFIDENCE_LEVELS) -> Dict:
+        """
+        Run (or reuse) a risk report for a set of holdings
+
+        Args:
+            values: Current value held per asset
+            price_frame: Daily price history, one column per asset in values
+            horizons: Horizons in days
+            n_paths: Paths per horizon
+            confidence_levels: VaR/CVaR confidence levels
+
+        Returns:
+            Dictionary with 'summary' (VaR/CVaR per horizon and level),
+            'distribution' (P/L percentiles per horizon) and 'samples'
+            (a thinned P/L sample per horizon for plotting)
+        """
+        assets = list(values)
+        total = float(sum(values.values()))
+        weights = np.round(np.array([values[a] for a in assets], dtype=np.float64) / total, 3) \
+            if total > 0 else np.zeros(len(assets))
+        closed = completed_days(price_frame[assets])
+        key = (
+            tuple(assets), tuple(weights.tolist()),
+            hashlib.blake2b(np.ascontiguousarray(closed.to_numpy()).tobytes(), digest_size=16).hexdigest(),
+            tuple(horizons), n_paths, tuple(confidence_levels)
+        )
+        with self._lock:
+            unit = self._cache.get(key)
+            if unit is not None:
+                self._cache.move_to_end(key)
+
+        if unit is None:
+            mu, cov = estimate_return_model(closed)
+            pnl = self.simulate(weights, mu, cov, horizons, n_paths)
+            unit = summarize(pnl, horizons, confidence_levels, float(weights.sum()))
+            with self._lock:
+                self._cache[key] = unit
+                while len(self._cache) > _CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return _scale_report(unit, total)
+
+
+def completed_days(price_frame: 'pd.DataFrame', now: Optional[float] = None) -> 'pd.DataFrame':
+    """Drop today's still-open daily bucket, whose close moves with every live price"""
+    now = time.time() if now is None else now
+    today = pd.Timestamp(int(now // 86_400 * 86_400), unit='s')
+    return price_frame[price_frame.index < today]
+
+
+def _scale_report(unit: Dict, total: float) -> Dict:
+    """Turn a report simulated per unit of portfolio value into currency amounts"""
+    summary = unit['summary'].copy()
+    summary[['VaR', 'CVaR']] *= total
+    return {
+        'summary': summary,
+        'distribution': unit['distribution'] * total,
+        'samples': {horizon: samples * total for horizon, samples in unit['samples'].items()}
+    }
+
+
+def summarize(pnl: 'np.ndarray', horizons: Sequence[int], confidence_levels: Sequence[float],
+              portfolio_value: float, sample_size: int = 20_000) -> Dict:
+    """
+    Reduce simulated P/L to VaR/CVaR tables
+
+    VaR is reported as a positive loss: the amount not exceeded with the
+    given confidence. CVaR is the mean loss beyond VaR.
+    """
+    rows: List[Dict] = []
+    for i, horizon in enumerate(horizons):
+        outcomes = pnl[i]
+        for level in confidence_levels:
+            cutoff = np.quantile(outcomes, 1 - level)
+            tail = outcomes[outcomes <= cutoff]
+            var = -cutoff
+            cvar = -tail.mean() if len(tail) else var
+            rows.append({
+                'Horizon (days)': horizon,
+                'Confidence': level * 100,
+                'VaR': var,
+                'CVaR': cvar,
+                'VaR %': var / portfolio_value * 100 if portfolio_value > 0 else 0.0,
+                'CVaR %': cvar / portfolio_value * 100 if portfolio_value > 0 else 0.0
+            })
+
+    distribution = pd.DataFrame(
+        np.percentile(pnl, DISTRIBUTION_PERCENTILES, axis=1).T,
+        index=pd.Index(list(horizons), name='Horizon (days)'),
+        columns=[f"P{p}" for p in DISTRIBUTION_PERCENTILES]
+    )
+    step = max(1, pnl.shape[1] // sample_size)
+    samples = {h: pnl[i, ::step] for i, h in enumerate(horizons)}
+    return {'summary': pd.DataFrame(rows), 'distribution': distribution, 'samples': samples}
+
+
+_engine: Optional[RiskEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_risk_engine() -> RiskEngine:
+    """
+    Get the process-wide risk engine (one worker pool per server process)
+
+    Returns:
+        RiskEngine singleton
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RiskEngine()
+    return _engine
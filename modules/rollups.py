@@ -0,0 +1,335 @@
+"""
+Tiered price rollups for PSI Sovereign System
+Keeps minute, hourly and daily OHLC aggregates per asset, built incrementally
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Tiers ordered from finest to coarsest: (name, bucket width in seconds)
+TIERS = (
+    ('minute', 60),
+    ('hour', 3_600),
+    ('day', 86_400),
+)
+
+# How long each tier keeps buckets (seconds). None keeps everything.
+TIER_RETENTION = {
+    'minute': 2 * 86_400,
+    'hour': 120 * 86_400,
+    'day': None,
+}
+
+# Minimum number of points a query should return before a coarser tier is used
+DEFAULT_MIN_POINTS = 30
+
+# Bucket field positions
+_OPEN, _HIGH, _LOW, _CLOSE, _VOLUME, _OPEN_TS, _CLOSE_TS = range(7)
+
+
+class _TierSeries:
+    """Sorted OHLC buckets of a single asset at a single resolution."""
+
+    def __init__(self, width: int):
+        self.width = width
+        self.starts: List[int] = []
+        self.buckets: Dict[int, list] = {}
+
+    def add(self, ts: float, price: float, volume: float) -> bool:
+        """
+        Merge one raw point into its bucket
+
+        Re-adding a point that was already seen leaves the bucket unchanged,
+        so overlapping fetches can be ingested safely.
+
+        Returns:
+            True if the point opened a bucket out of order (starts need resorting)
+        """
+        start = int(ts // self.width) * self.width
+        bucket = self.buckets.get(start)
+        if bucket is None:
+            self.buckets[start] = [price, price, price, price, volume, ts, ts]
+            out_of_order = bool(self.starts) and start < self.starts[-1]
+            self.starts.append(start)
+            return out_of_order
+
+        if price > bucket[_HIGH]:
+            bucket[_HIGH] = price
+        if price < bucket[_LOW]:
+            bucket[_LOW] = price
+        if ts < bucket[_OPEN_TS]:
+            bucket[_OPEN] = price
+            bucket[_OPEN_TS] = ts
+        if ts >= bucket[_CLOSE_TS]:
+            bucket[_CLOSE] = price
+            bucket[_CLOSE_TS] = ts
+            # Upstream volumes are rolling 24h snapshots, so keep the latest one
+            bucket[_VOLUME] = volume
+        return False
+
+    def resort(self):
+        self.starts = sorted(self.buckets)
+
+    def prune(self, cutoff: float):
+        """Drop buckets that start before cutoff"""
+        idx = bisect_left(self.starts, cutoff)
+        if idx:
+            for start in self.starts[:idx]:
+                del self.buckets[start]
+            del self.starts[:idx]
+
+    def window(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        lo = 0 if start is None else bisect_left(self.starts, int(start // self.width) * self.width)
+        hi = len(self.starts) if end is None else bisect_right(self.starts, end)
+        return lo, hi
+
+
+class RollupStore:
+    """
+    Per-asset minute/hour/day aggregates
+
+    Raw points are folded into every tier as they arrive. Queries are answered
+    from the coarsest tier that still holds enough points for the window, so a
+    one-year or all-time view costs about as much as a one-week view.
+
+    Coverage is tracked per tier: a batch of points covers a tier only if
+    its spacing is finer than the next coarser tier's buckets, so daily
+    points from a one-year fetch fill the day tier but leave the hour and
+    minute tiers uncovered, and a one-week window still fetches hourly data.
+    """
+
+    def __init__(self, tiers: Iterable[Tuple[str, int]] = TIERS,
+                 retention: Optional[Dict[str, Optional[int]]] = None):
+        self.tiers = tuple(tiers)
+        self.retention = dict(TIER_RETENTION if retention is None else retention)
+        self._series: Dict[str, Dict[str, _TierSeries]] = {}
+        self._first_ts: Dict[str, float] = {}
+        self._last_ts: Dict[str, float] = {}
+        # asset -> tier -> (first, last) unix seconds held at that tier's resolution
+        self._tier_coverage: Dict[str, Dict[str, Tuple[float, float]]] = {}
+        self._complete = set()
+        self._lock = threading.Lock()
+
+    def _asset_series(self, asset: str) -> Dict[str, _TierSeries]:
+        series = self._series.get(asset)
+        if series is None:
+            series = {name: _TierSeries(width) for name, width in self.tiers}
+            self._series[asset] = series
+        return series
+
+    def _resolved_tiers(self, resolution: float) -> List[str]:
+        """Tiers that points spaced `resolution` seconds apart fill (finer than the next coarser tier)"""
+        widths = [width for _, width in self.tiers[1:]] + [math.inf]
+        return [name for (name, _), coarser in zip(self.tiers, widths) if resolution < coarser]
+
+    def _cover(self, asset: str, name: str, first: float, last: float):
+        """Extend a tier's coverage with a batch span; a disjoint older span is replaced by a newer one"""
+        tiers = self._tier_coverage.setdefault(asset, {})
+        span = tiers.get(name)
+        width = dict(self.tiers)[name]
+        if span is not None and first <= span[1] + width and last >= span[0] - width:
+            first, last = min(first, span[0]), max(last, span[1])
+        elif span is not None and last < span[1]:
+            return
+        keep = self.retention.get(name)
+        tiers[name] = (first if keep is None else max(first, last - keep), last)
+
+    def ingest(self, asset: str, points: Iterable[Tuple[float, float, float]], complete: bool = False,
+               resolution: Optional[float] = None) -> int:
+        """
+        Fold raw points into every tier of an asset
+
+        Args:
+            asset: Asset identifier (e.g. 'bitcoin')
+            points: Iterable of (unix seconds, price, volume)
+            complete: True if the points reach back to the start of the asset's history
+            resolution: Seconds between upstream points (median spacing of the batch if None)
+
+        Returns:
+            Number of points ingested
+        """
+        count = 0
+        with self._lock:
+            series = self._asset_series(asset)
+            resort = set()
+            first = self._first_ts.get(asset, math.inf)
+            last = self._last_ts.get(asset, -math.inf)
+            batch: List[float] = []
+
+            for ts, price, volume in points:
+                ts = float(ts)
+                for name, tier in series.items():
+                    if tier.add(ts, float(price), float(volume)):
+                        resort.add(name)
+                first = min(first, ts)
+                last = max(last, ts)
+                batch.append(ts)
+                count += 1
+
+            if not count:
+                return 0
+
+            for name in resort:
+                series[name].resort()
+            for name, tier in series.items():
+                keep = self.retention.get(name)
+                if keep is not None:
+                    tier.prune(last - keep)
+
+            self._first_ts[asset] = first
+            self._last_ts[asset] = last
+            if resolution is None:
+                batch.sort()
+                gaps = sorted(b - a for a, b in zip(batch, batch[1:]))
+                resolution = gaps[len(gaps) // 2] if gaps else math.inf
+            for name in self._resolved_tiers(resolution):
+                self._cover(asset, name, min(batch), max(batch))
+            if complete:
+                self._complete.add(asset)
+        return count
+
+    def coverage(self, asset: str) -> Optional[Tuple[float, float]]:
+        """
+        Get the (first, last) raw timestamps seen for an asset
+
+        Returns:
+            Tuple of unix seconds, or None if the asset has no data
+        """
+        with self._lock:
+            if asset not in self._last_ts:
+                return None
+            return self._first_ts[asset], self._last_ts[asset]
+
+    def tier_coverage(self, asset: str, tier: str) -> Optional[Tuple[float, float]]:
+        """
+        Get the (first, last) timestamps an asset holds at a tier's resolution
+
+        Returns:
+            Tuple of unix seconds, or None if no batch has filled the tier
+        """
+        with self._lock:
+            return self._tier_coverage.get(asset, {}).get(tier)
+
+    def tier_for_window(self, seconds: Optional[float], min_points: int = DEFAULT_MIN_POINTS) -> str:
+        """
+        Tier a query over a window of this length reads once fully covered
+
+        Returns:
+            The coarsest tier with at least min_points buckets in the window
+            (the coarsest tier for all-time, the finest if none has enough)
+        """
+        if seconds is None:
+            return self.tiers[-1][0]
+        for name, width in reversed(self.tiers):
+            if seconds / width >= min_points:
+                return name
+        return self.tiers[0][0]
+
+    def days_to_fetch(self, asset: str, days: Optional[int], max_age: float = 600,
+                      now: Optional[float] = None, min_points: int = DEFAULT_MIN_POINTS) -> Optional[int]:
+        """
+        Work out how much upstream history is still missing for a window
+
+        Coverage is checked on the tier the window is read from, so a
+        one-week window after a one-year (daily) fetch still needs hourly data.
+
+        Args:
+            asset: Asset identifier
+            days: Window length in days (None for all-time)
+            max_age: Seconds after which the newest point is considered stale
+            now: Current unix time (defaults to time.time())
+            min_points: Points a query needs before it reads a coarser tier
+
+        Returns:
+            0 if the store already covers the window, the number of days to
+            fetch otherwise, or None when the full all-time history is needed
+        """
+        now = time.time() if now is None else now
+        tier = self.tier_for_window(None if days is None else days * 86_400, min_points)
+        span = self.tier_coverage(asset, tier)
+        if span is None:
+            return days
+        first, last = span
+        if days is None and asset not in self._complete:
+            return None
+        if days is not None and first > now - days * 86_400 + 86_400:
+            return days
+        if now - last <= max_age:
+            return 0
+        return max(1, math.ceil((now - last) / 86_400))
+
+    def query(self, asset: str, start: Optional[float] = None, end: Optional[float] = None,
+              min_points: int = DEFAULT_MIN_POINTS, tier: Optional[str] = None) -> Dict[str, list]:
+        """
+        Read aggregates for a time window from the best-fitting tier
+
+        The coarsest tier holding at least min_points buckets in the window is
+        used. If no tier has that many, the tier with the most points wins.
+
+        Args:
+            asset: Asset identifier
+            start: Window start in unix seconds (None for all-time)
+            end: Window end in unix seconds (None for latest)
+            min_points: Points required before a coarser tier is preferred
+            tier: Read from this tier instead of choosing one
+
+        Returns:
+            Column dictionary with 'tier', 'timestamp', 'open', 'high', 'low',
+            'close' and 'volume' keys
+        """
+        result = {'tier': None, 'timestamp': [], 'open': [], 'high': [],
+                  'low': [], 'close': [], 'volume': []}
+        with self._lock:
+            series = self._series.get(asset)
+            if not series:
+                return result
+
+            candidates = [tier] if tier is not None else [name for name, _ in reversed(self.tiers)]
+            best_name, best_span, best_count = None, (0, 0), -1
+            for name in candidates:
+                lo, hi = series[name].window(start, end)
+                if hi - lo >= min_points:
+                    best_name, best_span = name, (lo, hi)
+                    break
+                if hi - lo > best_count:
+                    best_name, best_span, best_count = name, (lo, hi), hi - lo
+
+            chosen = series[best_name]
+            lo, hi = best_span
+            result['tier'] = best_name
+            for bucket_start in chosen.starts[lo:hi]:
+                bucket = chosen.buckets[bucket_start]
+                result['timestamp'].append(bucket_start)
+                result['open'].append(bucket[_OPEN])
+                result['high'].append(bucket[_HIGH])
+                result['low'].append(bucket[_LOW])
+                result['close'].append(bucket[_CLOSE])
+                result['volume'].append(bucket[_VOLUME])
+        return result
+
+    def assets(self) -> List[str]:
+        """List assets with stored aggregates"""
+        with self._lock:
+            return sorted(self._series)
+
+
+_store: Optional[RollupStore] = None
+_store_lock = threading.Lock()
+
+
+def get_rollup_store() -> RollupStore:
+    """
+    Get the process-wide rollup store shared by every session
+
+    Returns:
+        RollupStore singleton
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = RollupStore()
+    return _store
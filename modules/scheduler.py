@@ -0,0 +1,118 @@
+"""
+Background scheduler for PSI Sovereign System
+Runs periodic server-side jobs on one daemon thread per process
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class BackgroundScheduler:
+    """
+    Minimal interval scheduler
+
+    Jobs are registered by name, so pages can call add_job() on every rerun
+    without creating duplicates. A failing job is logged and rescheduled;
+    it never stops the loop.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_job(self, name: str, func: Callable[[], None], interval: float, run_immediately: bool = True):
+        """
+        Register a periodic job (no-op if a job with this name exists)
+
+        Args:
+            name: Unique job name
+            func: Callable taking no arguments
+            interval: Seconds between runs
+            run_immediately: Run on the next loop iteration instead of after one interval
+        """
+        with self._lock:
+            if name in self._jobs:
+                return
+            self._jobs[name] = {
+                'func': func,
+                'interval': interval,
+                'next_run': time.time() if run_immediately else time.time() + interval,
+                'runs': 0,
+                'errors': 0,
+                'last_duration': 0.0,
+            }
+        self.start()
+        self._wake.set()
+
+    def remove_job(self, name: str):
+        """Unregister a job"""
+        with self._lock:
+            self._jobs.pop(name, None)
+
+    def jobs(self) -> Dict[str, Dict]:
+        """Snapshot of job statistics"""
+        with self._lock:
+            return {
+                name: {k: v for k, v in job.items() if k != 'func'}
+                for name, job in self._jobs.items()
+            }
+
+    def start(self):
+        """Start the scheduler thread if it is not running"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="psi-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler thread"""
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.time()
+            with self._lock:
+                due = [(name, job) for name, job in self._jobs.items() if job['next_run'] <= now]
+                for _, job in due:
+                    job['next_run'] = now + job['interval']
+
+            for name, job in due:
+                started = time.perf_counter()
+                try:
+                    job['func']()
+                except Exception as e:
+                    job['errors'] += 1
+                    print(f"Scheduled job '{name}' failed: {e}")
+                job['runs'] += 1
+                job['last_duration'] = time.perf_counter() - started
+
+            with self._lock:
+                next_run = min((job['next_run'] for job in self._jobs.values()), default=now + 60)
+            self._wake.wait(max(0.0, next_run - time.time()))
+            self._wake.clear()
+
+
+_scheduler: Optional[BackgroundScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> BackgroundScheduler:
+    """
+    Get the process-wide background scheduler
+
+    Returns:
+        BackgroundScheduler singleton
+    """
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = BackgroundScheduler()
+    return _scheduler
@@ -0,0 +1,322 @@
+"""
+Session memory for PSI Sovereign System
+Per-session store of heavy derived objects with accounting, caps and idle shedding
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, MutableMapping, Optional, Tuple
+
+from modules.cache import estimate_size
+from modules.config import (
+    SESSION_IDLE_SHED_MINUTES,
+    SESSION_MAX_BYTES,
+    SESSION_MAX_OBJECTS,
+    SESSION_TIMEOUT_MINUTES,
+)
+from modules.metrics import count
+from modules.scheduler import get_scheduler
+
+# session_state key holding the id the manager knows a session by
+SESSION_ID_KEY = '_psi_session_id'
+
+# How often the scheduler looks for idle sessions
+SHED_INTERVAL = 60
+
+
+def session_id_of(state: MutableMapping) -> str:
+    """The id of the session owning state, assigned on first use"""
+    session_id = state.get(SESSION_ID_KEY)
+    if session_id is None:
+        session_id = uuid.uuid4().hex
+        state[SESSION_ID_KEY] = session_id
+    return session_id
+
+
+def data_owner(state: MutableMapping) -> str:
+    """
+    Key for a session's saved data (portfolio, alerts)
+
+    Signed-in users share their data across sessions; anonymous and
+    emergency-bypass ('guest') sessions each get their own, keyed by the
+    session id, so visitors never see each other's data.
+    """
+    user = state.get('current_user')
+    if user and user != 'guest':
+        return user
+    return f"session:{session_id_of(state)}"
+
+
+def frame_fingerprint(df, *columns: str) -> Tuple:
+    """Cheap memo key for a DataFrame: its length, last index value and the last value of each column"""
+    if len(df) == 0:
+        return (0,)
+    return (len(df), df.index[-1], *(df[column].iloc[-1] for column in columns))
+
+
+class _Object:
+    __slots__ = ('key', 'value', 'size', 'created_at')
+
+    def __init__(self, key: Hashable, value, size: int):
+        self.key = key
+        self.value = value
+        self.size = size
+        self.created_at = time.time()
+
+
+class _Session:
+    __slots__ = ('id', 'user', 'page', 'objects', 'bytes', 'state_bytes', 'started_at', 'last_seen',
+                 'hits', 'computes', 'recomputes', 'evictions', 'sheds', 'shed_names')
+
+    def __init__(self, session_id: str):
+        self.id = session_id
+        self.user: Optional[str] = None
+        self.page: Optional[str] = None
+        self.objects: 'OrderedDict[str, _Object]' = OrderedDict()
+        self.bytes = 0
+        self.state_bytes = 0
+        self.started_at = self.last_seen = time.time()
+        self.hits = self.computes = self.recomputes = self.evictions = self.sheds = 0
+        # Objects dropped while idle; computing one of these again counts as a recompute
+        self.shed_names: set = set()
+
+
+class SessionHandle:
+    """A page's view of its own session in the SessionMemoryManager"""
+
+    def __init__(self, manager: 'SessionMemoryManager', session_id: str):
+        self._manager = manager
+        self.id = session_id
+
+    def memo(self, name: str, key: Hashable, compute: Callable[[], object]):
+        """
+        Reuse a derived object across reruns of this session
+
+        Args:
+            name: Object name, unique within the session
+            key: Inputs the object was built from; a different key rebuilds it
+            compute: Builds the object when it is missing, stale, or was shed
+
+        Returns:
+            The stored or freshly computed object (treat as read-only)
+        """
+        return self._manager.memo(self.id, name, key, compute)
+
+    def drop(self, name: Optional[str] = None):
+        """Forget one derived object (or all of them) for this session"""
+        self._manager.drop(self.id, name)
+
+
+class SessionMemoryManager:
+    """
+    Tracks what every browser session keeps resident on this replica
+
+    Pages hand heavy derived objects (figures, display tables) to memo() so
+    reruns that do not change their inputs reuse them. Each object is sized
+    once when stored; a session over its byte or object cap loses its least
+    recently used objects. Sessions idle longer than idle_seconds have all
+    their derived objects dropped (they are rebuilt lazily by memo() when
+    the session returns), and sessions idle past the login timeout are
+    forgotten entirely.
+
+    session_state itself is sized on every attach() so the admin view shows
+    the full per-session footprint, not just what went through memo().
+    """
+
+    def __init__(self, max_bytes: int = SESSION_MAX_BYTES, max_objects: int = SESSION_MAX_OBJECTS,
+                 idle_seconds: float = SESSION_IDLE_SHED_MINUTES * 60,
+                 expire_seconds: float = SESSION_TIMEOUT_MINUTES * 60):
+        self.max_bytes = max_bytes
+        self.max_objects = max_objects
+        self.idle_seconds = idle_seconds
+        self.expire_seconds = expire_seconds
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, _Session] = {}
+
+    # ---------- sessions ----------
+
+    def attach(self, state: MutableMapping, user: Optional[str] = None, page: Optional[str] = None) -> SessionHandle:
+        """
+        Register a rerun of the session owning state and mark it active
+
+        Args:
+            state: The session's st.session_state
+            user: Signed-in user, for the admin view
+            page: Page being rendered, for the admin view
+
+        Returns:
+            SessionHandle for memo() calls
+        """
+        session_id = session_id_of(state)
+        state_bytes = estimate_size({key: state[key] for key in list(state.keys())})
+
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = _Session(session_id)
+            session.last_seen = time.time()
+            session.state_bytes = state_bytes
+            session.user = user or session.user
+            session.page = page or session.page
+        return SessionHandle(self, session_id)
+
+    def memo(self, session_id: str, name: str, key: Hashable, compute: Callable[[], object]):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            stored = session.objects.get(name) if session is not None else None
+            if stored is not None and stored.key == key:
+                session.objects.move_to_end(name)
+                session.hits += 1
+                return stored.value
+
+        value = compute()
+        size = estimate_size(value)
+
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                # Forgotten while computing; hand the value back without keeping it
+                return value
+            if name in session.objects:
+                self._drop_object(session, name)
+            session.computes += 1
+            if name in session.shed_names:
+                session.shed_names.discard(name)
+                session.recomputes += 1
+                count('psi_session_recompute')
+            session.objects[name] = _Object(key, value, size)
+            session.bytes += size
+            self._enforce(session)
+        return value
+
+    def drop(self, session_id: str, name: Optional[str] = None):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return
+            for object_name in ([name] if name is not None else list(session.objects)):
+                if object_name in session.objects:
+                    self._drop_object(session, object_name)
+
+    def _drop_object(self, session: _Session, name: str):
+        session.bytes -= session.objects.pop(name).size
+
+    def _enforce(self, session: _Session):
+        """Evict least recently used objects until the session is within its caps (lock held)"""
+        # The newest object is kept even if it alone exceeds the budget
+        while len(session.objects) > 1 and (session.bytes > self.max_bytes or len(session.objects) > self.max_objects):
+            self._drop_object(session, next(iter(session.objects)))
+            session.evictions += 1
+            count('psi_session_eviction')
+
+    # ---------- idle policy ----------
+
+    def shed_idle(self, now: Optional[float] = None) -> int:
+        """
+        Drop derived objects of idle sessions and forget expired ones
+
+        Returns:
+            Bytes released
+        """
+        now = time.time() if now is None else now
+        released = 0
+        with self._lock:
+            for session_id, session in list(self._sessions.items()):
+                idle = now - session.last_seen
+                if idle > self.expire_seconds:
+                    released += session.bytes
+                    del self._sessions[session_id]
+                elif idle > self.idle_seconds and session.objects:
+                    released += self._shed(session)
+        return released
+
+    def shed(self, session_id: Optional[str] = None) -> int:
+        """Drop derived objects of one session (or every session) now, regardless of idle time"""
+        with self._lock:
+            sessions = [self._sessions[session_id]] if session_id in self._sessions else \
+                list(self._sessions.values()) if session_id is None else []
+            return sum(self._shed(session) for session in sessions)
+
+    def _shed(self, session: _Session) -> int:
+        released = session.bytes
+        session.shed_names.update(session.objects)
+        session.objects.clear()
+        session.bytes = 0
+        session.sheds += 1
+        count('psi_session_shed')
+        return released
+
+    # ---------- reporting ----------
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(session.bytes + session.state_bytes for session in self._sessions.values())
+
+    def sessions(self) -> List[Dict]:
+        """
+        Per-session memory accounting, most recently active first
+
+        Returns:
+            Dicts with 'session', 'user', 'page', 'idle', 'age', 'objects',
+            'derived_bytes', 'state_bytes', 'hits', 'computes', 'recomputes',
+            'evictions', 'sheds' and 'largest' (name of the biggest object)
+        """
+        now = time.time()
+        with self._lock:
+            rows = [
+                {
+                    'session': session.id,
+                    'user': session.user,
+                    'page': session.page,
+                    'idle': now - session.last_seen,
+                    'age': now - session.started_at,
+                    'objects': len(session.objects),
+                    'derived_bytes': session.bytes,
+                    'state_bytes': session.state_bytes,
+                    'hits': session.hits,
+                    'computes': session.computes,
+                    'recomputes': session.recomputes,
+                    'evictions': session.evictions,
+                    'sheds': session.sheds,
+                    'largest': max(session.objects, key=lambda name: session.objects[name].size, default=None)
+                }
+                for session in self._sessions.values()
+            ]
+        return sorted(rows, key=lambda row: row['idle'])
+
+    def objects(self, session_id: str) -> List[Dict]:
+        """Derived objects held by one session, largest first"""
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return []
+            return sorted(
+                ({'name': name, 'bytes': stored.size, 'age': now - stored.created_at}
+                 for name, stored in session.objects.items()),
+                key=lambda row: row['bytes'],
+                reverse=True
+            )
+
+
+_manager: Optional[SessionMemoryManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_session_memory() -> SessionMemoryManager:
+    """
+    Get the process-wide session memory manager and schedule idle shedding
+
+    Returns:
+        SessionMemoryManager singleton
+    """
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = SessionMemoryManager()
+                get_scheduler().add_job('session_shed', _manager.shed_idle, SHED_INTERVAL, run_immediately=False)
+    return _manager
@@ -0,0 +1,233 @@
+"""
+Solana JSON-RPC client for PSI Sovereign System
+Batched requests over a pooled session with commitment-level caching
+"""
+
+import itertools
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from modules.config import PSI_TOKEN_ADDRESS, SOLANA_RPC_URL, WALLET_ADDRESS
+
+# How long a result stays valid per commitment level (seconds); finalized
+# state cannot change, but balances keep moving so it is still refreshed
+COMMITMENT_TTL = {
+    'processed': 1.0,
+    'confirmed': 5.0,
+    'finalized': 30.0,
+}
+
+DEFAULT_COMMITMENT = 'confirmed'
+
+# getMultipleAccounts accepts at most this many keys per call
+MAX_ACCOUNTS_PER_CALL = 100
+
+LAMPORTS_PER_SOL = 1_000_000_000
+
+RPCCall = Tuple[str, list]
+
+
+class SolanaRPCError(Exception):
+    """Error object returned by the RPC node for one call"""
+
+    def __init__(self, method: str, error: Dict):
+        self.method = method
+        self.code = error.get('code')
+        super().__init__(f"{method} failed ({self.code}): {error.get('message')}")
+
+
+class SolanaRPCClient:
+    """
+    JSON-RPC client that sends many calls in one HTTP round trip
+
+    Calls are cached per (method, params, commitment) for the commitment's
+    TTL; batch() only sends the misses, in one POST. The requests session
+    keeps connections to the node alive between refreshes.
+    """
+
+    def __init__(self, url: str = SOLANA_RPC_URL, pool_size: int = 8, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.round_trips = 0
+        self._ids = itertools.count(1)
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cache_key(method: str, params: list) -> str:
+        return json.dumps([method, params], sort_keys=True, separators=(',', ':'))
+
+    @staticmethod
+    def _commitment(params: list) -> str:
+        for param in params:
+            if isinstance(param, dict) and 'commitment' in param:
+                return param['commitment']
+        return DEFAULT_COMMITMENT
+
+    def batch(self, calls: Sequence[RPCCall], use_cache: bool = True) -> List[Any]:
+        """
+        Run several RPC calls in one request
+
+        Args:
+            calls: (method, params) pairs
+            use_cache: Serve unexpired results from the commitment cache
+
+        Returns:
+            Results in call order
+
+        Raises:
+            requests.RequestException: If the HTTP request fails
+            SolanaRPCError: If the node returns an error for any call
+        """
+        results: List[Any] = [None] * len(calls)
+        pending: Dict[str, List[int]] = {}
+        now = time.monotonic()
+        with self._lock:
+            for i, (method, params) in enumerate(calls):
+                key = self._cache_key(method, params)
+                cached = self._cache.get(key) if use_cache else None
+                if cached is not None and cached[0] > now:
+                    results[i] = cached[1]
+                else:
+                    pending.setdefault(key, []).append(i)
+
+        if not pending:
+            return results
+
+        payload, by_id = [], {}
+        for key, positions in pending.items():
+            method, params = calls[positions[0]]
+            request_id = next(self._ids)
+            by_id[request_id] = (key, positions)
+            payload.append({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params})
+
+        response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        self.round_trips += 1
+        replies = response.json()
+        if isinstance(replies, dict):
+            replies = [replies]
+
+        now = time.monotonic()
+        with self._lock:
+            for reply in replies:
+                key, positions = by_id[reply['id']]
+                method, params = calls[positions[0]]
+                if 'error' in reply:
+                    raise SolanaRPCError(method, reply['error'])
+                result = reply.get('result')
+                self._cache[key] = (now + COMMITMENT_TTL.get(self._commitment(params), 0.0), result)
+                for i in positions:
+                    results[i] = result
+        return results
+
+    def call(self, method: str, params: Optional[list] = None) -> Any:
+        """Run a single RPC call (cached like batch())"""
+        return self.batch([(method, params or [])])[0]
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    # ---------- call builders ----------
+
+    @staticmethod
+    def balance_call(pubkey: str, commitment: str = DEFAULT_COMMITMENT) -> RPCCall:
+        return ('getBalance', [pubkey, {'commitment': commitment}])
+
+    @staticmethod
+    def token_accounts_call(owner: str, mint: str, commitment: str = DEFAULT_COMMITMENT) -> RPCCall:
+        return ('getTokenAccountsByOwner',
+                [owner, {'mint': mint}, {'encoding': 'jsonParsed', 'commitment': commitment}])
+
+    @staticmethod
+    def multiple_accounts_calls(pubkeys: Sequence[str], commitment: str = DEFAULT_COMMITMENT) -> List[RPCCall]:
+        return [
+            ('getMultipleAccounts',
+             [list(pubkeys[i:i + MAX_ACCOUNTS_PER_CALL]), {'encoding': 'jsonParsed', 'commitment': commitment}])
+            for i in range(0, len(pubkeys), MAX_ACCOUNTS_PER_CALL)
+        ]
+
+    # ---------- high-level reads ----------
+
+    def get_multiple_accounts(self, pubkeys: Sequence[str], commitment: str = DEFAULT_COMMITMENT) -> List[Optional[Dict]]:
+        """
+        Fetch account infos for any number of keys in one round trip
+
+        Returns:
+            Account info dicts (None for missing accounts) in key order
+        """
+        results = self.batch(self.multiple_accounts_calls(pubkeys, commitment))
+        return [account for result in results for account in result['value']]
+
+    def wallet_snapshot(self, wallet: str = WALLET_ADDRESS, mint: str = PSI_TOKEN_ADDRESS,
+                        extra_accounts: Sequence[str] = (), commitment: str = DEFAULT_COMMITMENT) -> Dict:
+        """
+        SOL balance, token holdings and mint state in a single batch
+
+        Args:
+            wallet: Owner address
+            mint: Token mint address
+            extra_accounts: Other accounts to fetch in the same round trip
+            commitment: Commitment level for every call
+
+        Returns:
+            Dict with 'sol_balance', 'token_balance', 'token_accounts',
+            'supply', 'decimals', 'accounts' (extra account infos) and 'slot'
+        """
+        calls = [
+            self.balance_call(wallet, commitment),
+            self.token_accounts_call(wallet, mint, commitment),
+        ] + self.multiple_accounts_calls([mint, *extra_accounts], commitment)
+        balance, token_accounts, *account_pages = self.batch(calls)
+        accounts = [account for page in account_pages for account in page['value']]
+        mint_account = accounts[0]
+
+        token_balance = 0.0
+        for entry in token_accounts['value']:
+            amount = entry['account']['data']['parsed']['info']['tokenAmount']
+            token_balance += float(amount.get('uiAmountString') or amount.get('uiAmount') or 0)
+
+        supply = decimals = None
+        if mint_account and isinstance(mint_account.get('data'), dict):
+            info = mint_account['data']['parsed']['info']
+            decimals = info.get('decimals')
+            supply = int(info['supply']) / 10 ** decimals if decimals is not None else None
+
+        return {
+            'sol_balance': balance['value'] / LAMPORTS_PER_SOL,
+            'token_balance': token_balance,
+            'token_accounts': [entry['pubkey'] for entry in token_accounts['value']],
+            'supply': supply,
+            'decimals': decimals,
+            'accounts': accounts[1:],
+            'slot': balance['context']['slot'],
+        }
+
+
+_client: Optional[SolanaRPCClient] = None
+_client_lock = threading.Lock()
+
+
+def get_solana_client() -> SolanaRPCClient:
+    """
+    Get the process-wide Solana RPC client
+
+    Returns:
+        SolanaRPCClient singleton
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = SolanaRPCClient()
+    return _client
@@ -0,0 +1,363 @@
+"""
+Local Solana RPC stub for PSI Sovereign System
+In-process JSON-RPC and websocket server answering the calls the clients use, for offline tests
+"""
+
+import base64
+import hashlib
+import itertools
+import json
+import socket
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+# RFC 6455 opcodes the stub handles
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+_WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+# Base58 account id of the SPL token program
+TOKEN_PROGRAM_ID = 'TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA'
+
+
+class WebSocketClosed(ConnectionError):
+    """Client closed the websocket or the socket dropped"""
+
+
+# ---------- server side of RFC 6455 (clients use the websockets library) ----------
+
+def accept_key(key: str) -> str:
+    """Sec-WebSocket-Accept value for a client key"""
+    return base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    data = b''
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise WebSocketClosed("Connection closed")
+        data += chunk
+    return data
+
+
+def _unmask(payload: bytes, key: bytes) -> bytes:
+    mask = (key * (len(payload) // 4 + 1))[:len(payload)]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(mask, 'big')).to_bytes(len(payload), 'big')
+
+
+def send_frame(sock: socket.socket, opcode: int, payload: bytes = b''):
+    """Send one unmasked, unfragmented server frame"""
+    header = bytes([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        header += bytes([length])
+    elif length < 1 << 16:
+        header += bytes([126]) + struct.pack('!H', length)
+    else:
+        header += bytes([127]) + struct.pack('!Q', length)
+    sock.sendall(header + payload)
+
+
+def recv_message(sock: socket.socket) -> Tuple[int, bytes]:
+    """
+    Receive one client message, joining continuation frames
+
+    Returns:
+        (opcode, payload); control frames are returned as they arrive
+    """
+    opcode, chunks = None, []
+    while True:
+        first, second = _recv_exact(sock, 2)
+        fin, frame_op = first & 0x80, first & 0x0F
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack('!H', _recv_exact(sock, 2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', _recv_exact(sock, 8))[0]
+        key = _recv_exact(sock, 4) if second & 0x80 else None
+        payload = _recv_exact(sock, length)
+        if key:
+            payload = _unmask(payload, key)
+
+        if frame_op >= OP_CLOSE:
+            return frame_op, payload
+        if frame_op != OP_CONTINUATION:
+            opcode = frame_op
+        chunks.append(payload)
+        if fin:
+            return opcode, b''.join(chunks)
+
+
+class StubSolanaRPC:
+    """
+    Minimal Solana node stand-in
+
+    State is plain dicts that tests can edit between calls: 'balances'
+    (address to lamports), 'mints' (address to supply/decimals),
+    'token_accounts' (pubkey to owner/mint/raw amount) and 'accounts'
+    (address to an arbitrary account info dict). Every HTTP request and
+    RPC call is counted so tests can assert on round trips.
+
+    The same port accepts websocket upgrades for accountSubscribe and
+    logsSubscribe; set_account()/emit_logs() push notifications and
+    drop_connections() simulates a node restart.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.balances: Dict[str, int] = {}
+        self.mints: Dict[str, Dict] = {}
+        self.token_accounts: Dict[str, Dict] = {}
+        self.accounts: Dict[str, Dict] = {}
+        self.slot = 1
+        self.http_requests = 0
+        self.calls: List[str] = []
+        self.ws_connections = 0
+        self._lock = threading.Lock()
+        self._sub_ids = itertools.count(1)
+        # socket -> {subscription id: (kind, key)}
+        self._ws_clients: Dict[socket.socket, Dict[int, tuple]] = {}
+        self._ws_send_lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Websocket clients reject an HTTP/1.0 upgrade response
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                reply = stub.handle(json.loads(body))
+                data = json.dumps(reply).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.headers.get('Upgrade', '').lower() != 'websocket':
+                    self.send_error(400)
+                    return
+                self.send_response(101)
+                self.send_header('Upgrade', 'websocket')
+                self.send_header('Connection', 'Upgrade')
+                self.send_header('Sec-WebSocket-Accept', accept_key(self.headers['Sec-WebSocket-Key']))
+                self.end_headers()
+                self.wfile.flush()
+                stub._serve_websocket(self.connection)
+                self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'StubSolanaRPC':
+        self._thread = threading.Thread(target=self._server.serve_forever, name="solana-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.drop_connections()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'StubSolanaRPC':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---------- websocket subscriptions ----------
+
+    def _serve_websocket(self, conn: socket.socket):
+        with self._lock:
+            self._ws_clients[conn] = {}
+            self.ws_connections += 1
+        try:
+            while True:
+                opcode, payload = recv_message(conn)
+                if opcode == OP_CLOSE:
+                    self._ws_send(conn, payload[:2], OP_CLOSE)
+                    break
+                if opcode == OP_PING:
+                    self._ws_send(conn, payload, OP_PONG)
+                elif opcode == OP_TEXT:
+                    self._ws_send(conn, json.dumps(self._ws_dispatch(conn, json.loads(payload))).encode())
+        except (OSError, WebSocketClosed, ValueError):
+            pass
+        finally:
+            with self._lock:
+                self._ws_clients.pop(conn, None)
+
+    def _ws_send(self, conn: socket.socket, payload: bytes, opcode: int = OP_TEXT):
+        with self._ws_send_lock:
+            send_frame(conn, opcode, payload)
+
+    def _ws_dispatch(self, conn: socket.socket, request: Dict) -> Dict:
+        method, params = request.get('method'), request.get('params', [])
+        with self._lock:
+            self.calls.append(method)
+            if method == 'accountSubscribe':
+                target = ('account', params[0])
+            elif method == 'logsSubscribe':
+                target = ('logs', params[0]['mentions'][0])
+            else:
+                return {'jsonrpc': '2.0', 'id': request.get('id'),
+                        'error': {'code': -32601, 'message': 'Method not found'}}
+            sub_id = next(self._sub_ids)
+            self._ws_clients[conn][sub_id] = target
+        return {'jsonrpc': '2.0', 'id': request.get('id'), 'result': sub_id}
+
+    def _notify(self, target: tuple, method: str, value):
+        with self._lock:
+            self.slot += 1
+            deliveries = [
+                (conn, sub_id)
+                for conn, subs in self._ws_clients.items()
+                for sub_id, sub_target in subs.items()
+                if sub_target == target
+            ]
+            result = {'context': {'slot': self.slot}, 'value': value}
+        for conn, sub_id in deliveries:
+            message = {'jsonrpc': '2.0', 'method': method, 'params': {'result': result, 'subscription': sub_id}}
+            try:
+                self._ws_send(conn, json.dumps(message).encode())
+            except OSError:
+                pass
+
+    def subscriber_count(self, kind: str, key: str) -> int:
+        with self._lock:
+            return sum(target == (kind, key) for subs in self._ws_clients.values() for target in subs.values())
+
+    def set_account(self, pubkey: str, info: Dict):
+        """Replace an account's info and notify its subscribers"""
+        info = dict({'rentEpoch': 0, 'space': 0}, **info)
+        with self._lock:
+            self.accounts[pubkey] = info
+        self._notify(('account', pubkey), 'accountNotification', info)
+
+    def set_balance(self, pubkey: str, lamports: int):
+        """Change a system account's balance and notify its subscribers"""
+        with self._lock:
+            self.balances[pubkey] = lamports
+            info = self._account_info(pubkey)
+        self._notify(('account', pubkey), 'accountNotification', info)
+
+    def emit_logs(self, mention: str, signature: str, logs: List[str]):
+        """Push a logsNotification to subscribers of an address"""
+        self._notify(('logs', mention), 'logsNotification', {'signature': signature, 'err': None, 'logs': logs})
+
+    def drop_connections(self):
+        """Close every websocket without a close frame"""
+        with self._lock:
+            conns = list(self._ws_clients)
+        for conn in conns:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    # ---------- JSON-RPC ----------
+
+    def handle(self, payload):
+        with self._lock:
+            self.http_requests += 1
+            if isinstance(payload, list):
+                return [self._dispatch(request) for request in payload]
+            return self._dispatch(payload)
+
+    def _dispatch(self, request: Dict) -> Dict:
+        method = request.get('method')
+        self.calls.append(method)
+        handler = getattr(self, f"_rpc_{method}", None)
+        if handler is None:
+            return {'jsonrpc': '2.0', 'id': request.get('id'),
+                    'error': {'code': -32601, 'message': 'Method not found'}}
+        return {'jsonrpc': '2.0', 'id': request.get('id'), 'result': handler(*request.get('params', []))}
+
+    def _context(self, value) -> Dict:
+        return {'context': {'slot': self.slot}, 'value': value}
+
+    def _rpc_getBalance(self, pubkey: str, config: Optional[Dict] = None) -> Dict:
+        return self._context(self.balances.get(pubkey, 0))
+
+    def _token_account_info(self, pubkey: str) -> Dict:
+        account = self.token_accounts[pubkey]
+        decimals = self.mints.get(account['mint'], {}).get('decimals', 0)
+        amount = int(account['amount'])
+        return {
+            'lamports': 2_039_280,
+            'owner': TOKEN_PROGRAM_ID,
+            'executable': False,
+            'rentEpoch': 0,
+            'space': 165,
+            'data': {
+                'program': 'spl-token',
+                'space': 165,
+                'parsed': {'type': 'account', 'info': {
+                    'mint': account['mint'],
+                    'owner': account['owner'],
+                    'tokenAmount': {
+                        'amount': str(amount),
+                        'decimals': decimals,
+                        'uiAmount': amount / 10 ** decimals,
+                        'uiAmountString': str(amount / 10 ** decimals),
+                    },
+                }},
+            },
+        }
+
+    def _rpc_getTokenAccountsByOwner(self, owner: str, filter: Dict, config: Optional[Dict] = None) -> Dict:
+        matches = [
+            {'pubkey': pubkey, 'account': self._token_account_info(pubkey)}
+            for pubkey, account in self.token_accounts.items()
+            if account['owner'] == owner and account['mint'] == filter.get('mint', account['mint'])
+        ]
+        return self._context(matches)
+
+    def _account_info(self, pubkey: str) -> Optional[Dict]:
+        if pubkey in self.accounts:
+            return self.accounts[pubkey]
+        if pubkey in self.mints:
+            mint = self.mints[pubkey]
+            return {
+                'lamports': 1_461_600,
+                'owner': TOKEN_PROGRAM_ID,
+                'executable': False,
+                'rentEpoch': 0,
+                'space': 82,
+                'data': {'program': 'spl-token', 'space': 82, 'parsed': {'type': 'mint', 'info': {
+                    'supply': str(mint['supply']),
+                    'decimals': mint['decimals'],
+                    'isInitialized': True,
+                }}},
+            }
+        if pubkey in self.token_accounts:
+            return self._token_account_info(pubkey)
+        if pubkey in self.balances:
+            return {'lamports': self.balances[pubkey], 'owner': '11111111111111111111111111111111',
+                    'executable': False, 'rentEpoch': 0, 'space': 0, 'data': ['', 'base64']}
+        return None
+
+    def _rpc_getMultipleAccounts(self, pubkeys: List[str], config: Optional[Dict] = None) -> Dict:
+        return self._context([self._account_info(pubkey) for pubkey in pubkeys])
+
+    def _rpc_getAccountInfo(self, pubkey: str, config: Optional[Dict] = None) -> Dict:
+        return self._context(self._account_info(pubkey))
+
+    def _rpc_getSlot(self, config: Optional[Dict] = None) -> int:
+        return self.slot
@@ -0,0 +1,291 @@
+"""
+Solana websocket subscriptions for PSI Sovereign System
+One shared, self-reconnecting connection per process that fans out account and log updates
+"""
+
+import asyncio
+import json
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from solana.rpc.jsonrpc import SolanaJsonRpcError
+from solana.rpc.websocket_api import OverflowPolicy, SolanaWsClient
+from solders.errors import SerdeJSONError
+from solders.pubkey import Pubkey
+from solders.rpc.config import RpcTransactionLogsFilterMentions
+from websockets.exceptions import WebSocketException
+
+from modules.config import PSI_TOKEN_ADDRESS, SOLANA_WS_URL, WALLET_ADDRESS
+
+# Seconds between keepalive pings, and to wait for the pong before dropping the connection
+IDLE_TIMEOUT = 30.0
+
+RECONNECT_MIN_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+
+# Notifications buffered while listeners run; only the latest value per key matters
+NOTIFICATION_QUEUE_SIZE = 10_000
+
+SubscriptionKey = Tuple[str, str]
+Listener = Callable[[SubscriptionKey, Dict, Optional[int]], None]
+
+
+class SolanaSubscriptionManager:
+    """
+    Process-wide accountSubscribe/logsSubscribe multiplexer
+
+    Sessions register interest with subscribe_account()/subscribe_logs();
+    repeated calls for the same key share one upstream subscription. A
+    daemon thread runs solana-py's SolanaWsClient (websockets handles
+    framing and keepalive pings) on its own event loop, reconnects with
+    exponential backoff and re-subscribes everything after a drop. Each
+    notification is stored as the latest value for its key (read by every
+    session through latest()) and passed to registered listeners.
+
+    New registrations and the replay after a reconnect both go through
+    _sync_subscriptions(), which holds one lock and subscribes only keys
+    not yet active on the current connection, so a key registered while
+    the replay runs is never subscribed twice.
+    """
+
+    def __init__(self, url: str = SOLANA_WS_URL):
+        self.url = url
+        self._lock = threading.Lock()
+        self._subs: Dict[SubscriptionKey, Dict] = {}
+        # Subscription id <-> key on the current connection
+        self._by_sub_id: Dict[int, SubscriptionKey] = {}
+        self._active: Dict[SubscriptionKey, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[SolanaWsClient] = None
+        self._subscribe_lock: Optional[asyncio.Lock] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.connected = False
+        self.reconnects = 0
+        self.notifications = 0
+        self.last_error: Optional[str] = None
+
+    # ---------- registration ----------
+
+    def _subscribe(self, key: SubscriptionKey, params: Dict, listener: Optional[Listener]) -> SubscriptionKey:
+        with self._lock:
+            sub = self._subs.get(key)
+            if sub is None:
+                sub = {'params': params, 'listeners': [], 'value': None,
+                       'slot': None, 'updated_at': None, 'updates': 0}
+                self._subs[key] = sub
+                is_new = True
+            else:
+                is_new = False
+            if listener is not None and listener not in sub['listeners']:
+                sub['listeners'].append(listener)
+            loop = self._loop if self.connected else None
+        if is_new and loop is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._sync_subscriptions(), loop)
+            except RuntimeError:
+                pass  # loop shut down; the next connection replays every key
+        self.start()
+        return key
+
+    def subscribe_account(self, pubkey: str, commitment: str = 'confirmed', encoding: str = 'jsonParsed',
+                          listener: Optional[Listener] = None) -> SubscriptionKey:
+        """
+        Follow an account's data and lamports
+
+        Args:
+            pubkey: Account address
+            commitment: Commitment level
+            encoding: 'jsonParsed' or 'base64'
+            listener: Optional callback(key, notification value, slot)
+
+        Returns:
+            Key for latest()
+        """
+        return self._subscribe(('account', pubkey), {'commitment': commitment, 'encoding': encoding}, listener)
+
+    def subscribe_logs(self, mention: str, commitment: str = 'confirmed',
+                       listener: Optional[Listener] = None) -> SubscriptionKey:
+        """Follow transaction logs that mention an address"""
+        return self._subscribe(('logs', mention), {'commitment': commitment}, listener)
+
+    def add_listener(self, key: SubscriptionKey, listener: Listener):
+        with self._lock:
+            listeners = self._subs[key]['listeners']
+            if listener not in listeners:
+                listeners.append(listener)
+
+    def latest(self, key: SubscriptionKey) -> Optional[Dict]:
+        """
+        Most recent notification for a subscription
+
+        Returns:
+            Dict with 'value', 'slot', 'updated_at' and 'updates', or None if unknown
+        """
+        with self._lock:
+            sub = self._subs.get(key)
+            if sub is None:
+                return None
+            return {k: sub[k] for k in ('value', 'slot', 'updated_at', 'updates')}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'connected': self.connected,
+                'subscriptions': len(self._subs),
+                'active': len(self._active),
+                'reconnects': self.reconnects,
+                'notifications': self.notifications,
+                'last_error': self.last_error,
+            }
+
+    # ---------- connection ----------
+
+    def start(self):
+        """Start the connection thread if it is not running"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="solana-ws", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Close the connection and stop reconnecting"""
+        self._stop.set()
+        with self._lock:
+            loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                pass
+
+    def _run(self):
+        asyncio.run(self._main())
+
+    async def _main(self):
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+        self._subscribe_lock = asyncio.Lock()
+        delay = RECONNECT_MIN_DELAY
+        try:
+            while not self._stop.is_set():
+                try:
+                    async with SolanaWsClient(
+                        self.url, ping_interval=IDLE_TIMEOUT, ping_timeout=IDLE_TIMEOUT, open_timeout=10.0,
+                        notification_queue_size=NOTIFICATION_QUEUE_SIZE, overflow=OverflowPolicy.DROP_OLDEST
+                    ) as client:
+                        self._client = client
+                        self.connected = True
+                        delay = RECONNECT_MIN_DELAY
+                        await self._sync_subscriptions()
+                        await self._until_stopped(self._read_loop(client))
+                except (OSError, asyncio.TimeoutError, WebSocketException, SolanaJsonRpcError, SerdeJSONError,
+                        ValueError) as e:
+                    self.last_error = str(e)
+                finally:
+                    self.connected = False
+                    self._client = None
+                    with self._lock:
+                        self._by_sub_id.clear()
+                        self._active.clear()
+
+                if self._stop.is_set() or await self._until_stopped(asyncio.sleep(delay)):
+                    break
+                self.reconnects += 1
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+        finally:
+            with self._lock:
+                self._loop = self._wake = None
+
+    async def _until_stopped(self, coro) -> bool:
+        """Run coro until it finishes or stop() is called; returns True if stopped"""
+        task = asyncio.ensure_future(coro)
+        waiter = asyncio.ensure_future(self._wake.wait())
+        done, _ = await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        for pending in (task, waiter):
+            if pending not in done:
+                pending.cancel()
+        if task in done:
+            task.result()
+            return False
+        return True
+
+    async def _sync_subscriptions(self):
+        """Subscribe every registered key not yet active on the current connection"""
+        async with self._subscribe_lock:
+            client = self._client
+            if client is None:
+                return
+            with self._lock:
+                missing = [(key, sub['params']) for key, sub in self._subs.items() if key not in self._active]
+            for key, params in missing:
+                kind, address = key
+                try:
+                    if kind == 'account':
+                        subscription = await client.account_subscribe(
+                            pubkey=Pubkey.from_string(address), commitment=params['commitment'],
+                            encoding=params['encoding']
+                        )
+                    else:
+                        subscription = await client.logs_subscribe(
+                            filter_=RpcTransactionLogsFilterMentions(Pubkey.from_string(address)),
+                            commitment=params['commitment']
+                        )
+                except (SolanaJsonRpcError, ValueError) as e:
+                    self.last_error = f"{key}: {e}"
+                    continue
+                if client is not self._client:
+                    return
+                with self._lock:
+                    self._active[key] = subscription.subscription_id
+                    self._by_sub_id[subscription.subscription_id] = key
+
+    async def _read_loop(self, client: SolanaWsClient):
+        async for notification in client:
+            self._handle(notification.subscription, json.loads(notification.to_json())['result'])
+
+    def _handle(self, subscription_id: int, result: Dict):
+        with self._lock:
+            key = self._by_sub_id.get(subscription_id)
+            if key is None:
+                return
+            sub = self._subs[key]
+            sub['value'] = result.get('value')
+            sub['slot'] = (result.get('context') or {}).get('slot')
+            sub['updated_at'] = time.time()
+            sub['updates'] += 1
+            self.notifications += 1
+            listeners = list(sub['listeners'])
+            value, slot = sub['value'], sub['slot']
+
+        for listener in listeners:
+            try:
+                listener(key, value, slot)
+            except Exception as e:
+                print(f"Subscription listener for {key} failed: {e}")
+
+
+_manager: Optional[SolanaSubscriptionManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_subscription_manager() -> SolanaSubscriptionManager:
+    """
+    Get the process-wide subscription manager, following the wallet and PSI mint
+
+    Returns:
+        SolanaSubscriptionManager singleton
+    """
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = SolanaSubscriptionManager()
+                _manager.subscribe_account(WALLET_ADDRESS)
+                _manager.subscribe_account(PSI_TOKEN_ADDRESS)
+    return _manager
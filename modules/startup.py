@@ -0,0 +1,306 @@
+"""
+Startup subsystem for PSI Sovereign System
+Shared bootstrap, lazy imports of heavy libraries, import profiling and a cold-start benchmark
+"""
+
+import argparse
+import ast
+import glob
+import importlib
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import types
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from modules.config import COLD_START_BUDGET_SECONDS
+from modules.metrics import start_metrics_server
+
+# Imported in the background after the first render so later use is instant
+WARM_MODULES = ('numpy', 'pandas', 'plotly.graph_objects', 'plotly.subplots', 'plotly.express')
+
+# Getters of singletons that register the process's background jobs; run off the render path
+BACKGROUND_SERVICES = (
+    ('modules.ledger', 'get_ledger_loader'),
+    ('modules.bonding_curve', 'get_bonding_curve_engine'),
+)
+
+# What a container restart has to import before the first page can render
+STARTUP_IMPORTS = ('streamlit', 'modules.config', 'modules.utils', 'modules.startup')
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_import_lock = threading.RLock()
+_import_costs: Dict[str, float] = {}
+
+
+class LazyModule(types.ModuleType):
+    """
+    Module proxy that imports the real module on first attribute access
+
+    `go = lazy_import('plotly.graph_objects')` costs nothing until a page
+    actually builds a figure. Modules use it too (`np = lazy_import('numpy')`
+    with quoted annotations), so importing them does not import numpy or
+    pandas until a function needs them.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with _import_lock:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    _import_costs.setdefault(self.__name__, time.perf_counter() - started)
+                    # Copy the real namespace in so later lookups skip __getattr__ (hot paths use np.* per call)
+                    self.__dict__.update(module.__dict__)
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Get a module, deferring the import until first use
+
+    Returns:
+        The module itself if it is already imported, otherwise a LazyModule proxy
+        (also while another thread is still importing it, so callers never get
+        the partially initialized module)
+    """
+    module = sys.modules.get(name)
+    if module is not None and not getattr(getattr(module, '__spec__', None), '_initializing', False):
+        return module
+    return LazyModule(name)
+
+
+def lazy_attribute(module_name: str, attr: str) -> Callable:
+    """
+    Callable that imports module_name on first call and forwards to its attribute
+
+    For `from x import f` style names, e.g. plotly.subplots.make_subplots.
+    """
+    module = lazy_import(module_name)
+
+    def call(*args, **kwargs):
+        return getattr(module, attr)(*args, **kwargs)
+
+    call.__name__ = attr
+    call.__qualname__ = attr
+    return call
+
+
+def import_costs() -> Dict[str, float]:
+    """Seconds spent on each lazy import resolved in this process"""
+    with _import_lock:
+        return dict(_import_costs)
+
+
+# ---------- bootstrap ----------
+
+_startup_info: Dict = {}
+_bootstrap_lock = threading.Lock()
+_process_started = time.time()
+
+
+def _warm_up(modules: Sequence[str]):
+    for name in modules:
+        if name in sys.modules:
+            continue
+        try:
+            lazy_import(name)._load()
+        except ImportError as e:
+            print(f"Warm-up import of {name} failed: {e}")
+
+
+def _background_start(modules: Sequence[str], services: Sequence[Tuple[str, str]]):
+    _warm_up(modules)
+    _start_services(services)
+
+
+def _start_services(services: Sequence[Tuple[str, str]]):
+    for module_name, getter in services:
+        try:
+            getattr(importlib.import_module(module_name), getter)()
+        except Exception as e:
+            print(f"Starting {module_name}.{getter} failed: {e}")
+
+
+def bootstrap(warm: bool = True, services: bool = True) -> Dict:
+    """
+    Process-wide startup shared by the entry script and every page
+
+    Runs once per process; later calls only return the startup info. The
+    heavy libraries are imported on a background thread so the first
+    render is not blocked on them, and the BACKGROUND_SERVICES are started
+    on that thread so their scheduled jobs run whichever page is opened.
+
+    Args:
+        warm: Start the background warm-up of WARM_MODULES
+        services: Start the BACKGROUND_SERVICES
+
+    Returns:
+        Dict with 'process_started', 'bootstrapped_at' and 'metrics_url'
+    """
+    if not _startup_info:
+        with _bootstrap_lock:
+            if not _startup_info:
+                if warm or services:
+                    threading.Thread(target=_background_start, name="psi-warmup", daemon=True,
+                                     args=(WARM_MODULES if warm else (), BACKGROUND_SERVICES if services else ())).start()
+                _startup_info.update(process_started=_process_started, bootstrapped_at=time.time(),
+                                     metrics_url=start_metrics_server())
+    return dict(_startup_info)
+
+
+# ---------- profiling and benchmark ----------
+
+def profile_imports(modules: Sequence[str], top: int = 20, python: str = sys.executable,
+                    cwd: str = APP_ROOT) -> List[Dict]:
+    """
+    Per-module import cost in a fresh interpreter (python -X importtime)
+
+    Args:
+        modules: Modules to import
+        top: Number of most expensive entries to return
+        python: Interpreter to run
+
+    Returns:
+        Dicts with 'module', 'self_ms' and 'cumulative_ms', most expensive first
+
+    Raises:
+        subprocess.CalledProcessError: If the imports fail
+    """
+    code = '; '.join(f"import {name}" for name in modules)
+    completed = subprocess.run([python, '-X', 'importtime', '-c', code],
+                               capture_output=True, text=True, check=True, cwd=cwd)
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        rows.append({'module': name, 'self_ms': int(self_us) / 1000, 'cumulative_ms': int(cumulative_us) / 1000})
+    rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+    return rows[:top]
+
+
+def script_imports(path: str) -> List[str]:
+    """Modules a script imports at top level, i.e. before any of it renders"""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    names: List[str] = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.append(node.module)
+    return list(dict.fromkeys(names))
+
+
+def page_import_sets(root: str = APP_ROOT) -> Dict[str, List[str]]:
+    """
+    Import set of the entry script and of every page
+
+    Returns:
+        Script file name to the modules it imports at top level, entry script first
+    """
+    scripts = [os.path.join(root, 'streamlit_app.py')] + sorted(glob.glob(os.path.join(root, 'pages', '*.py')))
+    return {os.path.basename(path): script_imports(path) for path in scripts if os.path.exists(path)}
+
+
+def measure_cold_start(modules: Sequence[str] = STARTUP_IMPORTS, runs: int = 5,
+                       python: str = sys.executable, cwd: str = APP_ROOT) -> Dict:
+    """
+    Time the startup imports in fresh interpreters
+
+    Returns:
+        Dict with 'median', 'min', 'max' (seconds), 'runs' and 'eager'
+        (the WARM_MODULES the imports pulled in instead of leaving to the warm-up)
+    """
+    code = (
+        "import sys, time; started = time.perf_counter(); "
+        + '; '.join(f"import {name}" for name in modules)
+        + "; elapsed = time.perf_counter() - started"
+        + f"; print(','.join(name for name in {tuple(WARM_MODULES)!r} if name in sys.modules))"
+        + "; print(elapsed)"
+    )
+    timings, eager = [], []
+    for _ in range(runs):
+        completed = subprocess.run([python, '-c', code], capture_output=True, text=True, check=True, cwd=cwd)
+        *_, loaded, elapsed = completed.stdout.strip('\n').split('\n')
+        timings.append(float(elapsed))
+        eager = [name for name in loaded.split(',') if name]
+    return {'median': statistics.median(timings), 'min': min(timings), 'max': max(timings), 'runs': runs,
+            'eager': eager}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m modules.startup', description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    profile = commands.add_parser('profile', help="per-module import cost")
+    profile.add_argument('modules', nargs='*', default=list(STARTUP_IMPORTS) + list(WARM_MODULES))
+    profile.add_argument('--top', type=int, default=20)
+
+    bench = commands.add_parser('bench', help="enforce the cold-start budget")
+    bench.add_argument('modules', nargs='*',
+                       help="modules to time (default: the entry script and every page's import set)")
+    bench.add_argument('--runs', type=int, default=5)
+    bench.add_argument('--budget', type=float, default=COLD_START_BUDGET_SECONDS)
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'profile':
+            rows = profile_imports(args.modules, args.top)
+        else:
+            targets = {'modules': args.modules} if args.modules else page_import_sets()
+            results = {name: measure_cold_start(modules, args.runs) for name, modules in targets.items()}
+    except subprocess.CalledProcessError as e:
+        lines = (e.stderr or '').strip().splitlines()
+        print(f"Startup imports failed: {lines[-1] if lines else e}")
+        return 2
+
+    if args.command == 'profile':
+        print(f"{'cumulative ms':>14} {'self ms':>10}  module")
+        for row in rows:
+            print(f"{row['cumulative_ms']:>14.1f} {row['self_ms']:>10.1f}  {row['module']}")
+        return 0
+
+    # Streamlit itself pulls in some of WARM_MODULES; only flag what the app adds
+    preloaded = set(measure_cold_start(('streamlit',), runs=1)['eager'])
+    print(f"Cold start, median of {args.runs} - budget {args.budget:.3f}s")
+    exceeded = []
+    for name, result in results.items():
+        within = result['median'] <= args.budget
+        if not within:
+            exceeded.append(name)
+        eager = [module for module in result['eager'] if module not in preloaded]
+        eager = f" - imports {', '.join(eager)} eagerly" if eager else ''
+        print(f"  {result['median']:>7.3f}s [min {result['min']:.3f}s, max {result['max']:.3f}s] "
+              f"{'OK' if within else 'EXCEEDED'}  {name}{eager}")
+    for name in exceeded:
+        print(f"Most expensive imports of {name}:")
+        for row in profile_imports(targets[name], top=10):
+            print(f"  {row['cumulative_ms']:>10.1f} ms  {row['module']}")
+    return 1 if exceeded else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
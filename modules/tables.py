@@ -0,0 +1,86 @@
+"""
+Typed table helpers for PSI Sovereign System
+Keeps DataFrame columns numeric and describes their display format for st.column_config
+"""
+
+from typing import Dict, Tuple
+
+from modules.currency import currency_decimals, currency_symbol
+from modules.startup import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Column kinds understood by typed_table()
+COLUMN_KINDS = ('currency', 'price', 'large_currency', 'large', 'percent', 'number', 'integer')
+
+# Same thresholds as utils.format_large_number
+LARGE_SUFFIXES = ((1_000_000_000, 'B'), (1_000_000, 'M'), (1_000, 'K'))
+
+
+def _large_scale(values: 'np.ndarray') -> Tuple[float, str]:
+    """One K/M/B unit per column, picked from its largest magnitude, so the column still sorts"""
+    finite = np.abs(values[np.isfinite(values)])
+    peak = finite.max() if finite.size else 0.0
+    for threshold, suffix in LARGE_SUFFIXES:
+        if peak >= threshold:
+            return float(threshold), suffix
+    return 1.0, ''
+
+
+def _price_decimals(values: 'np.ndarray', currency: str) -> int:
+    """Enough decimals for the smallest non-zero price (sub-cent tokens need more than 2)"""
+    finite = np.abs(values[np.isfinite(values) & (values != 0)])
+    if not finite.size or finite.min() >= 1:
+        return currency_decimals(currency)
+    return min(int(np.ceil(-np.log10(finite.min()))) + 3, 10)
+
+
+def typed_table(df: 'pd.DataFrame', kinds: Dict[str, str], currency: str = 'USD',
+                decimals: int = 4) -> Tuple['pd.DataFrame', Dict[str, str]]:
+    """
+    Prepare a numeric DataFrame for st.dataframe without stringifying cells
+
+    Values stay float64, so sorting is numeric and the Arrow payload holds
+    8-byte numbers instead of strings. Formatting is returned as printf
+    patterns for st.column_config.NumberColumn; K/M/B columns are divided
+    once (vectorized) by a unit chosen per column.
+
+    Args:
+        df: Table with numeric columns to format
+        kinds: Column name to one of COLUMN_KINDS; other columns pass through
+        currency: Quote currency for the currency kinds
+        decimals: Decimal places for 'number' columns
+
+    Returns:
+        (table, {column: printf format})
+
+    Raises:
+        ValueError: If a kind is not in COLUMN_KINDS
+    """
+    table = df.copy()
+    formats = {}
+    symbol = currency_symbol(currency)
+    for column, kind in kinds.items():
+        if column not in table.columns:
+            continue
+        if kind not in COLUMN_KINDS:
+            raise ValueError(f"Unknown column kind '{kind}' for {column}")
+        values = pd.to_numeric(table[column], errors='coerce').astype('float64')
+
+        if kind in ('large_currency', 'large'):
+            scale, suffix = _large_scale(values.to_numpy())
+            values = values / scale
+            formats[column] = f"{symbol if kind == 'large_currency' else ''}%.2f{suffix}"
+        elif kind == 'currency':
+            formats[column] = f"{symbol}%.{currency_decimals(currency)}f"
+        elif kind == 'price':
+            formats[column] = f"{symbol}%.{_price_decimals(values.to_numpy(), currency)}f"
+        elif kind == 'percent':
+            formats[column] = "%.2f%%"
+        elif kind == 'integer':
+            formats[column] = "%d"
+        else:
+            formats[column] = f"%.{decimals}f"
+        table[column] = values
+    return table, formats
@@ -0,0 +1,269 @@
+"""
+Tax-lot matching engine for PSI Sovereign System
+Matches sells against open buy lots FIFO, LIFO or HIFO
+"""
+
+import heapq
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from modules.portfolio_store import PortfolioStore
+
+MATCHING_METHODS = {
+    'FIFO': 'First in, first out',
+    'LIFO': 'Last in, first out',
+    'HIFO': 'Highest cost first',
+}
+
+# Open lot fields: [lot id, remaining amount, unit cost, acquired at]
+_ID, _REMAINING, _COST, _ACQUIRED = range(4)
+
+# Amounts below this are treated as fully consumed (float dust)
+_EPSILON = 1e-12
+
+# Sales may exceed the open amount by this much before they are rejected
+_SELL_TOLERANCE = 1e-9
+
+
+class _OpenLots:
+    """Open lots of one coin ordered for the chosen matching method"""
+
+    def __init__(self, method: str):
+        self.method = method
+        self._queue: deque = deque()
+        self._heap: List[Tuple[float, int, list]] = []
+        self._seq = 0
+        self.amount = 0.0
+        self.cost_basis = 0.0
+        self.realized = 0.0
+
+    def push(self, lot: list):
+        if self.method == 'HIFO':
+            heapq.heappush(self._heap, (-lot[_COST], self._seq, lot))
+            self._seq += 1
+        else:
+            self._queue.append(lot)
+        self.amount += lot[_REMAINING]
+        self.cost_basis += lot[_REMAINING] * lot[_COST]
+
+    def _peek(self) -> Optional[list]:
+        if self.method == 'HIFO':
+            return self._heap[0][2] if self._heap else None
+        if not self._queue:
+            return None
+        return self._queue[0] if self.method == 'FIFO' else self._queue[-1]
+
+    def _pop(self):
+        if self.method == 'HIFO':
+            heapq.heappop(self._heap)
+        elif self.method == 'FIFO':
+            self._queue.popleft()
+        else:
+            self._queue.pop()
+
+    def consume(self, amount: float, price: float) -> List[Dict]:
+        """Match a sale against open lots; each lot is popped at most once"""
+        if amount > self.amount + _SELL_TOLERANCE:
+            raise ValueError(f"Sale of {amount:g} exceeds the {self.amount:g} held")
+        matches = []
+        while amount > _EPSILON:
+            lot = self._peek()
+            if lot is None:
+                # Float dust left over from the tolerance above
+                break
+            take = min(amount, lot[_REMAINING])
+            cost = take * lot[_COST]
+            proceeds = take * price
+            matches.append({'lot_id': lot[_ID], 'amount': take, 'cost': cost,
+                            'proceeds': proceeds, 'gain': proceeds - cost})
+            lot[_REMAINING] -= take
+            amount -= take
+            self.amount -= take
+            self.cost_basis -= cost
+            self.realized += proceeds - cost
+            if lot[_REMAINING] <= _EPSILON:
+                self._pop()
+        return matches
+
+    def __len__(self) -> int:
+        return len(self._heap) if self.method == 'HIFO' else len(self._queue)
+
+    def lots(self) -> List[list]:
+        if self.method == 'HIFO':
+            return [entry[2] for entry in sorted(self._heap)]
+        return list(self._queue)
+
+
+class LotMatcher:
+    """
+    Running FIFO/LIFO/HIFO match of buys and sells
+
+    FIFO and LIFO keep open lots in a deque, HIFO in a max-heap on unit cost.
+    Buys are O(1) / O(log n); a sell costs O(log n) per lot it touches, and
+    every lot is consumed at most once. Per-coin cost basis and realized P/L
+    are kept as running totals, so unrealized P/L is O(1) per coin.
+    """
+
+    def __init__(self, method: str = 'FIFO'):
+        if method not in MATCHING_METHODS:
+            raise ValueError(f"Unknown matching method: {method}")
+        self.method = method
+        self._coins: Dict[str, _OpenLots] = {}
+        self.realizations: List[Dict] = []
+        # Stored sales that could not be matched (only possible with data written before sales were checked)
+        self.rejected: List[Dict] = []
+        self.last_time = float('-inf')
+
+    def _book(self, coin: str) -> _OpenLots:
+        book = self._coins.get(coin)
+        if book is None:
+            book = _OpenLots(self.method)
+            self._coins[coin] = book
+        return book
+
+    def buy(self, coin: str, amount: float, price: float, timestamp: float, lot_id: Optional[int] = None):
+        """Open a lot"""
+        self._book(coin).push([lot_id, float(amount), float(price), float(timestamp)])
+        self.last_time = max(self.last_time, timestamp)
+
+    def sell(self, coin: str, amount: float, price: float, timestamp: float,
+             sell_id: Optional[int] = None) -> List[Dict]:
+        """
+        Close lots for a sale
+
+        Returns:
+            List of matches with 'lot_id', 'amount', 'cost', 'proceeds' and 'gain'
+
+        Raises:
+            ValueError: If more is sold than is held; nothing is matched then
+        """
+        matches = self._book(coin).consume(float(amount), float(price))
+        for match in matches:
+            match.update({'coin': coin, 'sell_id': sell_id, 'sold_at': timestamp})
+        self.realizations.extend(matches)
+        self.last_time = max(self.last_time, timestamp)
+        return matches
+
+    def summary(self, prices: Dict[str, float]) -> List[Dict]:
+        """
+        Per-coin cost basis and P/L
+
+        Args:
+            prices: Current price per coin
+
+        Returns:
+            List of dicts with 'coin', 'open_amount', 'cost_basis', 'realized',
+            'unrealized' and 'open_lots'
+        """
+        rows = []
+        for coin, book in self._coins.items():
+            price = prices.get(coin)
+            unrealized = book.amount * price - book.cost_basis if price is not None else float('nan')
+            rows.append({
+                'coin': coin,
+                'open_amount': book.amount,
+                'cost_basis': book.cost_basis,
+                'realized': book.realized,
+                'unrealized': unrealized,
+                'open_lots': len(book)
+            })
+        return rows
+
+    def open_lots(self, coin: str) -> List[Dict]:
+        """List open lots of a coin in matching order"""
+        book = self._coins.get(coin)
+        if book is None:
+            return []
+        return [
+            {'lot_id': lot[_ID], 'remaining': lot[_REMAINING], 'cost': lot[_COST], 'acquired_at': lot[_ACQUIRED]}
+            for lot in book.lots()
+        ]
+
+
+class LedgerMatcher:
+    """
+    LotMatcher kept in step with a user's lots and sales in the store
+
+    Only rows added since the previous sync are applied. A full replay
+    happens when rows were removed or a new row is older than what has
+    already been matched.
+    """
+
+    def __init__(self, store: PortfolioStore, user: str, method: str = 'FIFO'):
+        self.store = store
+        self.user = user
+        self.method = method
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.matcher = LotMatcher(self.method)
+        self._last_lot_id = 0
+        self._last_sell_id = 0
+        self._revision = self.store.revision(self.user)
+
+    def sync(self) -> LotMatcher:
+        """
+        Apply new lots and sales
+
+        Returns:
+            The up-to-date LotMatcher
+        """
+        with self._lock:
+            if self.store.revision(self.user) != self._revision:
+                self._reset()
+
+            lots = self.store.lots(self.user, after_id=self._last_lot_id)
+            sells = self.store.sells(self.user, after_id=self._last_sell_id)
+            events = [(lot['acquired_at'], 0, lot) for lot in lots] + \
+                     [(sale['sold_at'], 1, sale) for sale in sells]
+            if not events:
+                return self.matcher
+
+            if min(e[0] for e in events) < self.matcher.last_time:
+                # Back-dated entry: replay everything in time order
+                self._reset()
+                lots = self.store.lots(self.user)
+                sells = self.store.sells(self.user)
+                events = [(lot['acquired_at'], 0, lot) for lot in lots] + \
+                         [(sale['sold_at'], 1, sale) for sale in sells]
+
+            # Buys sort before sells at the same timestamp
+            events.sort(key=lambda e: (e[0], e[1], e[2]['id']))
+            for timestamp, kind, row in events:
+                if kind == 0:
+                    self.matcher.buy(row['coin'], row['amount'], row['purchase_price'], timestamp, row['id'])
+                    self._last_lot_id = max(self._last_lot_id, row['id'])
+                else:
+                    try:
+                        self.matcher.sell(row['coin'], row['amount'], row['price'], timestamp, row['id'])
+                    except ValueError:
+                        self.matcher.rejected.append(row)
+                    self._last_sell_id = max(self._last_sell_id, row['id'])
+            return self.matcher
+
+
+_matchers: Dict[Tuple[str, str], LedgerMatcher] = {}
+_matchers_lock = threading.Lock()
+
+
+def get_ledger_matcher(store: PortfolioStore, user: str, method: str = 'FIFO') -> LedgerMatcher:
+    """
+    Get the process-wide matcher of a user for a matching method
+
+    Args:
+        store: PortfolioStore holding the user's lots and sales
+        user: Portfolio owner
+        method: 'FIFO', 'LIFO' or 'HIFO'
+
+    Returns:
+        LedgerMatcher kept across reruns and sessions
+    """
+    key = (user, method)
+    with _matchers_lock:
+        matcher = _matchers.get(key)
+        if matcher is None:
+            matcher = LedgerMatcher(store, user, method)
+            _matchers[key] = matcher
+    return matcher
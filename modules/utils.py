@@ -3,36 +3,44 @@ Utility functions for PSI Sovereign System
 Helper functions used across the application
 """
 
-import hashlib
-import pandas as pd
-import os
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from modules import credentials
+from modules.config import CURRENCY_SYMBOLS, ZERO_DECIMAL_CURRENCIES
+from modules.log_writer import get_log_writer
+from modules.metrics import timed
+from modules.startup import lazy_import
+
+pd = lazy_import('pandas')
+
 def hash_password(password: str) -> str:
     """
-    Hash password using SHA-256
+    Hash password using salted scrypt
     
     Args:
         password: Plain text password
         
     Returns:
-        Hashed password string
+        Encoded hash string for credentials.verify_password
     """
-    return hashlib.sha256(password.encode()).hexdigest()
+    return credentials.hash_password(password)
 
-def format_currency(value: float, decimals: int = 2) -> str:
+def format_currency(value: float, decimals: Optional[int] = None, currency: str = 'USD') -> str:
     """
     Format number as currency
     
     Args:
         value: Number to format
-        decimals: Number of decimal places
+        decimals: Number of decimal places (2, or 0 for currencies like JPY)
+        currency: ISO code; the symbol comes from CURRENCY_SYMBOLS
         
     Returns:
         Formatted currency string
     """
-    return f"${value:,.{decimals}f}"
+    if decimals is None:
+        decimals = 0 if currency in ZERO_DECIMAL_CURRENCIES else 2
+    return f"{CURRENCY_SYMBOLS.get(currency, currency + ' ')}{value:,.{decimals}f}"
 
 def format_percentage(value: float, decimals: int = 1) -> str:
     """
@@ -92,20 +100,17 @@ def create_log_entry(action: str, details: str, status: str, user: str = 'System
         'user': user
     }
 
+@timed('psi_log_write')
 def save_log_to_csv(log_entry: Dict, filename: str = 'activity_log.csv'):
     """
-    Save log entry to CSV file
+    Queue log entry for the CSV file (written in batches by a background thread)
     
     Args:
         log_entry: Log entry dictionary
         filename: CSV filename to save to
     """
-    try:
-        df = pd.DataFrame([log_entry])
-        file_exists = os.path.exists(filename)
-        df.to_csv(filename, mode='a', header=not file_exists, index=False)
-    except Exception as e:
-        print(f"Error saving log: {e}")
+    if not get_log_writer(filename).write(log_entry):
+        print(f"Error saving log: queue full for {filename}")
 
 def calculate_overall_progress(progress_data: Dict[str, float]) -> float:
     """
@@ -135,7 +140,7 @@ def format_timestamp(timestamp: datetime = None) -> str:
         timestamp = datetime.now()
     return timestamp.strftime("%Y-%m-%d %H:%M:%S")
 
-def validate_csv_structure(df: pd.DataFrame, required_columns: List[str]) -> bool:
+def validate_csv_structure(df: 'pd.DataFrame', required_columns: List[str]) -> bool:
     """
     Validate CSV has required columns
     
@@ -207,6 +212,22 @@ def format_large_number(number: float) -> str:
     else:
         return f"{number:.2f}"
 
+def format_bytes(size: float) -> str:
+    """
+    Format a byte count with KB, MB, GB suffixes
+    
+    Args:
+        size: Number of bytes
+        
+    Returns:
+        Formatted size string
+    """
+    for unit in ('B', 'KB', 'MB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.2f} GB"
+
 def get_time_ago(timestamp: datetime) -> str:
     """
     Get human-readable time difference
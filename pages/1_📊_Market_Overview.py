@@ -1,7 +1,25 @@
 import streamlit as st
 import requests
 import time
-import pandas as pd
+
+from modules.alerts import INDICATOR_METRICS, RULE_KINDS, get_alert_engine
+from modules.bonding_curve import get_bonding_curve_engine
+from modules.config import (
+    ALERT_TYPES,
+    COINGECKO_BASE_URL,
+    CURRENCY_SYMBOLS,
+    DEFAULT_CURRENCY,
+    PSI_REFRESH_INTERVAL,
+    PSI_TOKEN_ADDRESS,
+    WALLET_ADDRESS,
+)
+from modules.currency import convert, currency_symbol, localize_quotes
+from modules.cache import cached
+from modules.metrics import timed
+from modules.session_memory import data_owner, get_session_memory
+from modules.solana_rpc import SolanaRPCError, get_solana_client
+from modules.startup import bootstrap
+from modules.tables import typed_table
 
 # Page configuration
 st.set_page_config(
@@ -10,6 +28,8 @@ st.set_page_config(
     layout="wide"
 )
 
+bootstrap()
+
 # Custom CSS
 st.markdown("""
     <style>
@@ -44,13 +64,26 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Display currency (kept across pages in session state; prices are converted locally)
+currency_options = list(CURRENCY_SYMBOLS)
+currency = st.sidebar.selectbox(
+    "💱 Currency",
+    options=currency_options,
+    index=currency_options.index(st.session_state.get('currency', DEFAULT_CURRENCY))
+)
+st.session_state.currency = currency
+
+# Counted in the per-session memory view (this page keeps no derived objects of its own)
+get_session_memory().attach(st.session_state, st.session_state.get('current_user'), 'Market Overview')
+
 # Data fetching functions
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+@cached(ttl=PSI_REFRESH_INTERVAL)  # One upstream call per interval across all viewers
+@timed('psi_fetch', function='fetch_crypto_data')
 def fetch_crypto_data():
     """Fetch cryptocurrency data from CoinGecko API"""
     try:
         response = requests.get(
-            "https://api.coingecko.com/api/v3/simple/price",
+            f"{COINGECKO_BASE_URL}/simple/price",
             params={
                 "ids": "bitcoin,ethereum,solana",
                 "vs_currencies": "usd",
@@ -63,9 +96,17 @@ def fetch_crypto_data():
         response.raise_for_status()
         return response.json(), None
     except requests.RequestException as e:
-        st.warning("⚠️ Live data temporarily unavailable. Using cached data.")
         return get_cached_data(), str(e)
 
+@cached(ttl=PSI_REFRESH_INTERVAL)
+@timed('psi_fetch', function='fetch_wallet_snapshot')
+def fetch_wallet_snapshot():
+    """Wallet balances and PSI mint state in one RPC round trip"""
+    try:
+        return get_solana_client().wallet_snapshot(WALLET_ADDRESS, PSI_TOKEN_ADDRESS), None
+    except (requests.RequestException, SolanaRPCError) as e:
+        return None, str(e)
+
 def get_cached_data():
     """Return fallback data when API is unavailable"""
     return {
@@ -89,23 +130,24 @@ def get_cached_data():
         }
     }
 
-def format_large_number(num):
-    """Format large numbers with K, M, B suffixes"""
+def format_large_number(num, currency):
+    """Format large amounts with the currency symbol and K, M, B suffixes"""
+    sign = currency_symbol(currency)
     if num >= 1_000_000_000:
-        return f"${num / 1_000_000_000:.2f}B"
+        return f"{sign}{num / 1_000_000_000:.2f}B"
     elif num >= 1_000_000:
-        return f"${num / 1_000_000:.2f}M"
+        return f"{sign}{num / 1_000_000:.2f}M"
     elif num >= 1_000:
-        return f"${num / 1_000:.2f}K"
+        return f"{sign}{num / 1_000:.2f}K"
     else:
-        return f"${num:.2f}"
-
-def display_crypto_card(name, symbol, data):
-    """Display a cryptocurrency card with price and stats"""
-    price = data.get('usd', 0)
-    change_24h = data.get('usd_24h_change', 0)
-    market_cap = data.get('usd_market_cap', 0)
-    volume_24h = data.get('usd_24h_vol', 0)
+        return f"{sign}{num:.2f}"
+
+def display_crypto_card(name, symbol, quote, currency):
+    """Display a cryptocurrency card with price and stats (quote from localize_quotes)"""
+    price = quote['price']
+    change_24h = quote['change_24h']
+    market_cap = quote['market_cap']
+    volume_24h = quote['volume_24h']
     
     # Determine color and arrow
     if change_24h >= 0:
@@ -125,7 +167,7 @@ def display_crypto_card(name, symbol, data):
     with col1:
         st.metric(
             label="Price",
-            value=f"${price:,.2f}",
+            value=f"{currency_symbol(currency)}{price:,.2f}",
             delta=f"{change_24h:.2f}% {arrow}",
             delta_color=delta_color
         )
@@ -133,67 +175,88 @@ def display_crypto_card(name, symbol, data):
     with col2:
         st.metric(
             label="24h Volume",
-            value=format_large_number(volume_24h)
+            value=format_large_number(volume_24h, currency)
         )
     
     st.metric(
         label="Market Cap",
-        value=format_large_number(market_cap)
+        value=format_large_number(market_cap, currency)
     )
 
 # Header
 st.title("📊 Real-Time Market Overview")
-st.markdown("Live cryptocurrency prices updating every 30 seconds")
+st.markdown(f"Live cryptocurrency prices updating every {PSI_REFRESH_INTERVAL} seconds")
 
 # Auto-refresh tracking
 if 'market_last_update' not in st.session_state:
     st.session_state.market_last_update = time.time()
+if 'market_live_updates' not in st.session_state:
+    st.session_state.market_live_updates = True
 
-# Fetch data
-data, error = fetch_crypto_data()
 
-# Display last update time
-current_time = time.strftime('%H:%M:%S', time.localtime())
-st.info(f"📡 Last updated: {current_time} | Auto-refreshing every 30 seconds")
+# Live panel: only this fragment reruns on the timer, reading the shared cache
+@st.fragment(run_every=PSI_REFRESH_INTERVAL if st.session_state.market_live_updates else None)
+def live_market_panel():
+    data, error = fetch_crypto_data()
+    currency = st.session_state.currency
+    quotes = localize_quotes(data, currency)
 
-if error:
-    st.warning(f"⚠️ Using cached data due to: {error}")
+    # Display last update time
+    current_time = time.strftime('%H:%M:%S', time.localtime())
+    if st.session_state.market_live_updates:
+        st.info(f"📡 Last updated: {current_time} | Live-updating every {PSI_REFRESH_INTERVAL} seconds")
+    else:
+        st.info(f"📡 Last updated: {current_time} | Live updates paused")
 
-st.markdown("---")
+    if error:
+        st.warning(f"⚠️ Using cached data due to: {error}")
 
-# Display cryptocurrency cards
-col1, col2, col3 = st.columns(3)
+    st.markdown("---")
 
-with col1:
-    with st.container():
-        display_crypto_card("Bitcoin", "BTC", data.get('bitcoin', {}))
+    # Display cryptocurrency cards
+    col1, col2, col3 = st.columns(3)
 
-with col2:
-    with st.container():
-        display_crypto_card("Ethereum", "ETH", data.get('ethereum', {}))
+    with col1:
+        with st.container():
+            display_crypto_card("Bitcoin", "BTC", quotes.loc['bitcoin'], currency)
 
-with col3:
-    with st.container():
-        display_crypto_card("Solana", "SOL", data.get('solana', {}))
+    with col2:
+        with st.container():
+            display_crypto_card("Ethereum", "ETH", quotes.loc['ethereum'], currency)
 
-st.markdown("---")
+    with col3:
+        with st.container():
+            display_crypto_card("Solana", "SOL", quotes.loc['solana'], currency)
+
+    st.markdown("---")
+
+    # Market summary table
+    st.markdown("## 📋 Market Summary")
 
-# Market summary table
-st.markdown("## 📋 Market Summary")
-
-summary_data = []
-for coin_id, coin_data in data.items():
-    coin_name = coin_id.capitalize()
-    summary_data.append({
-        "Asset": coin_name,
-        "Price": f"${coin_data.get('usd', 0):,.2f}",
-        "24h Change": f"{coin_data.get('usd_24h_change', 0):.2f}%",
-        "Market Cap": format_large_number(coin_data.get('usd_market_cap', 0)),
-        "24h Volume": format_large_number(coin_data.get('usd_24h_vol', 0))
+    summary_df = quotes.rename(columns={
+        'price': "Price",
+        'change_24h': "24h Change",
+        'market_cap': "Market Cap",
+        'volume_24h': "24h Volume"
     })
+    summary_df.insert(0, "Asset", summary_df.index.str.capitalize())
+    summary_df, formats = typed_table(
+        summary_df,
+        {"Price": 'price', "24h Change": 'percent', "Market Cap": 'large_currency', "24h Volume": 'large_currency'},
+        currency
+    )
+    st.dataframe(
+        summary_df,
+        use_container_width=True,
+        hide_index=True,
+        column_config={column: st.column_config.NumberColumn(format=fmt) for column, fmt in formats.items()}
+    )
 
-df = pd.DataFrame(summary_data)
-st.dataframe(df, use_container_width=True, hide_index=True)
+
+live_market_panel()
+
+# The sections below render on full reruns only; they share the same cached data
+data, error = fetch_crypto_data()
 
 st.markdown("---")
 
@@ -215,34 +278,164 @@ with col2:
     # Find highest market cap
     highest_mc = max(data.items(), key=lambda x: x[1].get('usd_market_cap', 0))
     mc_name = highest_mc[0].capitalize()
-    mc_value = highest_mc[1].get('usd_market_cap', 0)
-    st.info(f"**{mc_name}** at {format_large_number(mc_value)}")
+    mc_value = convert(highest_mc[1].get('usd_market_cap', 0), currency)
+    st.info(f"**{mc_name}** at {format_large_number(mc_value, currency)}")
+
+# PSI bonding curve (updated from on-chain account notifications, shared by all sessions)
+st.markdown("---")
+st.markdown("## 💎 PSI Bonding Curve")
+
+# Only the seed job and the account subscription feed the engine; the page just reads it
+curve_engine = get_bonding_curve_engine()
+wallet, wallet_error = fetch_wallet_snapshot()
+curve = curve_engine.snapshot(sol_usd=data.get('solana', {}).get('usd'))
+
+if curve is None:
+    st.info("⏳ Waiting for on-chain bonding curve data")
+else:
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Curve Progress", f"{curve['progress']:.2f}%")
+    with col2:
+        price_usd = curve.get('price_usd')
+        st.metric(
+            "Implied Price",
+            f"{currency_symbol(currency)}{convert(price_usd, currency):.8f}" if price_usd is not None
+            else f"{curve['price_sol']:.10f} SOL"
+        )
+    with col3:
+        market_cap = curve.get('market_cap_usd')
+        st.metric("Market Cap", format_large_number(convert(market_cap, currency), currency) if market_cap is not None else "N/A")
+    with col4:
+        st.metric("SOL Raised", f"{curve['real_sol']:,.2f}")
+
+    st.progress(min(curve['progress'] / 100, 1.0))
+    if curve['complete']:
+        st.success("🎓 Bonding curve complete - liquidity has migrated")
+
+# Wallet (one batched RPC call per refresh interval, shared by all sessions)
+st.markdown("### 👛 PSI Wallet")
+if wallet is None:
+    st.warning(f"⚠️ Wallet data unavailable: {wallet_error}")
+else:
+    price_usd = curve.get('price_usd') if curve is not None else None
+    sol_usd = data.get('solana', {}).get('usd')
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(
+            "SOL Balance", f"{wallet['sol_balance']:,.4f}",
+            help=f"{currency_symbol(currency)}{convert(wallet['sol_balance'] * sol_usd, currency):,.2f}" if sol_usd else None
+        )
+    with col2:
+        st.metric("PSI Balance", f"{wallet['token_balance']:,.2f}")
+    with col3:
+        st.metric(
+            "PSI Holdings Value",
+            f"{currency_symbol(currency)}{convert(wallet['token_balance'] * price_usd, currency):,.2f}"
+            if price_usd is not None else "N/A"
+        )
+    with col4:
+        st.metric("PSI Supply", f"{wallet['supply']:,.0f}" if wallet['supply'] is not None else "N/A")
+    st.caption(f"Wallet {WALLET_ADDRESS} | slot {wallet['slot']:,}")
+
+# Price alerts (evaluated server-side by the background scheduler)
+st.markdown("---")
+st.markdown("## 🔔 Price Alerts")
+
+alert_engine = get_alert_engine()
+# Signed-in users share their alerts across sessions; anonymous visitors each get their own
+alert_user = data_owner(st.session_state)
+
+# Feed the live prices this page already fetched so alerts see them immediately
+if not error:
+    for coin_id, coin_data in data.items():
+        if 'usd' in coin_data:
+            alert_engine.on_tick(coin_id, float(coin_data['usd']))
+
+for notification in alert_engine.notifications(alert_user):
+    icon = ALERT_TYPES[notification['alert_type']]
+    text = (
+        f"{notification['asset'].capitalize()} {notification['metric']} reached "
+        f"{notification['triggered_value']:,.2f} ({notification['direction']} {notification['threshold']:,.2f})"
+    )
+    if notification['message']:
+        text += f" – {notification['message']}"
+    st.toast(text, icon=icon)
+    st.warning(f"{icon} {text}")
+
+with st.expander("➕ Create Alert"):
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        alert_asset = st.selectbox("Asset", options=list(data.keys()), format_func=str.capitalize)
+        alert_kind = st.selectbox("Condition", options=list(RULE_KINDS.keys()), format_func=lambda x: RULE_KINDS[x])
+    
+    with col2:
+        alert_metric = 'price'
+        if alert_kind == 'indicator':
+            alert_metric = st.selectbox(
+                "Indicator", options=list(INDICATOR_METRICS.keys()), format_func=lambda x: INDICATOR_METRICS[x]
+            )
+        if alert_kind == 'percent_change':
+            alert_value = st.number_input("Change (%)", value=5.0, step=0.5, help="Negative for drops")
+            alert_direction = 'above'
+        else:
+            default_value = 70.0 if alert_kind == 'indicator' else float(data[alert_asset].get('usd', 0))
+            # Alerts are evaluated server-side against the USD feed
+            alert_value = st.number_input("Threshold (USD)", value=default_value, step=1.0)
+            alert_direction = st.radio("Direction", options=['above', 'below'], horizontal=True)
+    
+    with col3:
+        alert_type = st.selectbox(
+            "Severity", options=list(ALERT_TYPES.keys()), index=2, format_func=lambda x: f"{ALERT_TYPES[x]} {x}"
+        )
+        alert_message = st.text_input("Note (optional)")
+    
+    if st.button("🔔 Create Alert"):
+        try:
+            alert_engine.add_rule(
+                alert_user, alert_asset, alert_kind, alert_value, alert_direction,
+                metric=alert_metric, alert_type=alert_type, message=alert_message
+            )
+            st.rerun()
+        except ValueError as e:
+            st.error(f"Could not create alert: {e}")
+
+pending_alerts = alert_engine.rules(alert_user)
+if pending_alerts:
+    for rule in pending_alerts:
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            st.markdown(
+                f"{ALERT_TYPES[rule['alert_type']]} **{rule['asset'].capitalize()}** {rule['metric']} "
+                f"{rule['direction']} {rule['threshold']:,.2f}"
+                + (f" – {rule['message']}" if rule['message'] else "")
+            )
+        with col2:
+            if st.button("🗑️", key=f"remove_{rule['id']}"):
+                alert_engine.remove_rule(rule['id'])
+                st.rerun()
+else:
+    st.caption("No active alerts. Alerts are checked server-side even when this page is closed.")
 
 # Auto-refresh mechanism
 st.markdown("---")
 with st.expander("⚙️ Auto-Refresh Settings"):
-    st.markdown("""
-    This page automatically refreshes every 30 seconds to display the latest market data.
+    st.markdown(f"""
+    The price cards and market summary update in place every {PSI_REFRESH_INTERVAL} seconds;
+    the rest of the page is not re-rendered.
     
-    - ✅ Automatic updates enabled
-    - 🔄 Refresh interval: 30 seconds
-    - 💾 Data cached for 5 minutes
+    - 🔄 Refresh interval: {PSI_REFRESH_INTERVAL} seconds
+    - 💾 Prices shared by all viewers through one cache
     - 🌐 Data source: CoinGecko API
     """)
     
+    st.toggle("Live updates", key='market_live_updates')
+    
     if st.button("🔄 Refresh Now"):
-        st.cache_data.clear()
+        fetch_crypto_data.invalidate()
         st.rerun()
 
-# JavaScript auto-refresh (client-side)
-st.markdown("""
-    <script>
-        setTimeout(function(){
-            window.location.reload();
-        }, 30000);
-    </script>
-""", unsafe_allow_html=True)
-
 # Footer
 st.markdown("---")
-st.caption("💡 Data provided by CoinGecko API | Updates every 30 seconds | Not financial advice")
+st.caption(f"💡 Data provided by CoinGecko API | Updates every {PSI_REFRESH_INTERVAL} seconds | Not financial advice")
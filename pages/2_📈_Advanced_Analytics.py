@@ -1,11 +1,20 @@
 import streamlit as st
-import requests
-import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import time
 from datetime import datetime, timedelta
 
+from modules.config import CURRENCY_SYMBOLS, DEFAULT_CURRENCY
+from modules.currency import convert_columns, currency_symbol
+from modules.market_data import price_history_frame, sync_price_history
+from modules.metrics import timed
+from modules.session_memory import frame_fingerprint, get_session_memory
+from modules.startup import bootstrap, lazy_attribute, lazy_import
+from modules.tables import typed_table
+
+# Heavy libraries load on first use (see modules/startup.py)
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+go = lazy_import('plotly.graph_objects')
+make_subplots = lazy_attribute('plotly.subplots', 'make_subplots')
+
 # Page configuration
 st.set_page_config(
     page_title="Advanced Analytics - Psi Crypto",
@@ -13,6 +22,8 @@ st.set_page_config(
     layout="wide"
 )
 
+bootstrap()
+
 # Custom CSS
 st.markdown("""
     <style>
@@ -31,35 +42,30 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Display currency (kept across pages in session state; prices are converted locally)
+currency_options = list(CURRENCY_SYMBOLS)
+currency = st.sidebar.selectbox(
+    "💱 Currency",
+    options=currency_options,
+    index=currency_options.index(st.session_state.get('currency', DEFAULT_CURRENCY))
+)
+st.session_state.currency = currency
+sign = currency_symbol(currency)
+
+# Figures of this session are kept across reruns and dropped while the tab sits idle
+session_objects = get_session_memory().attach(st.session_state, st.session_state.get('current_user'), 'Advanced Analytics')
+
 # Data fetching functions
-@st.cache_data(ttl=600)  # Cache for 10 minutes
-def fetch_historical_data(coin_id, days=30):
-    """Fetch historical price data from CoinGecko"""
-    try:
-        response = requests.get(
-            f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart",
-            params={
-                "vs_currency": "usd",
-                "days": days,
-                "interval": "daily" if days > 1 else "hourly"
-            },
-            timeout=15
-        )
-        response.raise_for_status()
-        data = response.json()
-        
-        # Convert to DataFrame
-        prices = data.get('prices', [])
-        volumes = data.get('total_volumes', [])
-        
-        df = pd.DataFrame(prices, columns=['timestamp', 'price'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df['volume'] = [v[1] for v in volumes]
-        
-        return df
-    except requests.RequestException as e:
-        st.error(f"Error fetching data: {str(e)}")
-        return get_mock_historical_data(days)
+def load_price_history(coin_id, days=30):
+    """Load a price window from the shared rollup store, fetching only missing history (in the display currency)"""
+    error = sync_price_history(coin_id, days)
+    if error:
+        st.error(f"Error fetching data: {error}")
+    
+    df = price_history_frame(coin_id, days)
+    if df.empty:
+        df = get_mock_historical_data(days or 365)
+    return convert_columns(df, ['price', 'volume'], currency)
 
 def get_mock_historical_data(days=30):
     """Generate mock historical data for fallback"""
@@ -84,7 +90,8 @@ def calculate_moving_averages(df, short_window=7, long_window=30):
     df['MA_long'] = df['price'].rolling(window=min(long_window, len(df))).mean()
     return df
 
-def create_price_chart(df, coin_name):
+@timed('psi_figure', chart='price')
+def create_price_chart(df, coin_name, currency):
     """Create interactive price chart with moving averages"""
     fig = make_subplots(
         rows=2, cols=1,
@@ -152,8 +159,8 @@ def create_price_chart(df, coin_name):
         paper_bgcolor='rgba(0,0,0,0)',
         font=dict(color='white'),
         xaxis2_title='Date',
-        yaxis_title='Price (USD)',
-        yaxis2_title='Volume (USD)',
+        yaxis_title=f'Price ({currency})',
+        yaxis2_title=f'Volume ({currency})',
         showlegend=True,
         legend=dict(
             orientation="h",
@@ -166,7 +173,8 @@ def create_price_chart(df, coin_name):
     
     return fig
 
-def create_candlestick_chart(df, coin_name):
+@timed('psi_figure', chart='candlestick')
+def create_candlestick_chart(df, coin_name, currency):
     """Create candlestick chart"""
     # Calculate OHLC from price data
     df['open'] = df['price'].shift(1).fillna(df['price'])
@@ -192,7 +200,7 @@ def create_candlestick_chart(df, coin_name):
         paper_bgcolor='rgba(0,0,0,0)',
         font=dict(color='white'),
         xaxis_title='Date',
-        yaxis_title='Price (USD)',
+        yaxis_title=f'Price ({currency})',
         xaxis_rangeslider_visible=False
     )
     
@@ -215,7 +223,7 @@ with col1:
 with col2:
     time_period = st.selectbox(
         "Time Period",
-        options=["7 Days", "30 Days", "90 Days"],
+        options=["7 Days", "30 Days", "90 Days", "1 Year", "All Time"],
         index=1
     )
 
@@ -229,7 +237,9 @@ coin_map = {
 days_map = {
     "7 Days": 7,
     "30 Days": 30,
-    "90 Days": 90
+    "90 Days": 90,
+    "1 Year": 365,
+    "All Time": None
 }
 
 coin_id = coin_map[selected_coin]
@@ -237,7 +247,7 @@ days = days_map[time_period]
 
 # Fetch data
 with st.spinner(f"Loading {selected_coin} data..."):
-    df = fetch_historical_data(coin_id, days)
+    df = load_price_history(coin_id, days)
     df = calculate_moving_averages(df)
 
 # Display current stats
@@ -252,31 +262,34 @@ low_price = df['price'].min()
 avg_volume = df['volume'].mean()
 
 with col1:
-    st.metric("Current Price", f"${current_price:,.2f}")
+    st.metric("Current Price", f"{sign}{current_price:,.2f}")
 
 with col2:
     st.metric(
         f"{time_period} Change",
-        f"${price_change:,.2f}",
+        f"{sign}{price_change:,.2f}",
         f"{price_change_pct:.2f}%"
     )
 
 with col3:
-    st.metric("Period High", f"${high_price:,.2f}")
+    st.metric("Period High", f"{sign}{high_price:,.2f}")
 
 with col4:
-    st.metric("Period Low", f"${low_price:,.2f}")
+    st.metric("Period Low", f"{sign}{low_price:,.2f}")
 
 # Price chart with moving averages
 st.markdown("---")
 st.markdown("## 📊 Price Chart with Moving Averages")
-price_chart = create_price_chart(df, selected_coin)
+chart_key = (coin_id, days, currency, frame_fingerprint(df, 'timestamp', 'price'))
+price_chart = session_objects.memo('price_chart', chart_key, lambda: create_price_chart(df, selected_coin, currency))
 st.plotly_chart(price_chart, use_container_width=True)
 
 # Candlestick chart
 st.markdown("---")
 st.markdown("## 🕯️ Candlestick Chart")
-candlestick_chart = create_candlestick_chart(df, selected_coin)
+candlestick_chart = session_objects.memo(
+    'candlestick_chart', chart_key, lambda: create_candlestick_chart(df, selected_coin, currency)
+)
 st.plotly_chart(candlestick_chart, use_container_width=True)
 
 # Statistical summary
@@ -287,29 +300,33 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.markdown("### Price Statistics")
-    stats_df = pd.DataFrame({
-        "Metric": ["Mean", "Median", "Std Dev", "Min", "Max"],
-        "Value": [
-            f"${df['price'].mean():,.2f}",
-            f"${df['price'].median():,.2f}",
-            f"${df['price'].std():,.2f}",
-            f"${df['price'].min():,.2f}",
-            f"${df['price'].max():,.2f}"
-        ]
-    })
-    st.dataframe(stats_df, use_container_width=True, hide_index=True)
+    price_stats = df['price'].agg(['mean', 'median', 'std', 'min', 'max'])
+    stats_df, formats = typed_table(
+        pd.DataFrame({"Metric": ["Mean", "Median", "Std Dev", "Min", "Max"], "Value": price_stats.to_numpy()}),
+        {"Value": 'price'},
+        currency
+    )
+    st.dataframe(
+        stats_df,
+        use_container_width=True,
+        hide_index=True,
+        column_config={"Value": st.column_config.NumberColumn(format=formats["Value"])}
+    )
 
 with col2:
     st.markdown("### Volume Statistics")
-    vol_stats_df = pd.DataFrame({
-        "Metric": ["Avg Volume", "Max Volume", "Min Volume"],
-        "Value": [
-            f"${df['volume'].mean():,.0f}",
-            f"${df['volume'].max():,.0f}",
-            f"${df['volume'].min():,.0f}"
-        ]
-    })
-    st.dataframe(vol_stats_df, use_container_width=True, hide_index=True)
+    volume_stats = df['volume'].agg(['mean', 'max', 'min'])
+    vol_stats_df, formats = typed_table(
+        pd.DataFrame({"Metric": ["Avg Volume", "Max Volume", "Min Volume"], "Value": volume_stats.to_numpy()}),
+        {"Value": 'large_currency'},
+        currency
+    )
+    st.dataframe(
+        vol_stats_df,
+        use_container_width=True,
+        hide_index=True,
+        column_config={"Value": st.column_config.NumberColumn(format=formats["Value"])}
+    )
 
 # Correlation heatmap for multiple coins
 st.markdown("---")
@@ -317,9 +334,9 @@ st.markdown("## 🔥 Price Correlation Heatmap")
 
 with st.spinner("Calculating correlations..."):
     # Fetch data for all coins
-    btc_df = fetch_historical_data('bitcoin', days)
-    eth_df = fetch_historical_data('ethereum', days)
-    sol_df = fetch_historical_data('solana', days)
+    btc_df = load_price_history('bitcoin', days)
+    eth_df = load_price_history('ethereum', days)
+    sol_df = load_price_history('solana', days)
     
     # Create correlation matrix
     correlation_data = pd.DataFrame({
@@ -1,9 +1,17 @@
 import streamlit as st
 import requests
-import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
 from datetime import datetime
+from modules.cache import cached
+from modules.config import COINGECKO_BASE_URL, CURRENCY_SYMBOLS, DEFAULT_CURRENCY
+from modules.currency import convert, currency_symbol
+from modules.metrics import timed
+from modules.session_memory import frame_fingerprint, get_session_memory
+from modules.startup import bootstrap, lazy_import
+
+# Heavy libraries load on first use (see modules/startup.py)
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+go = lazy_import('plotly.graph_objects')
 
 # Page configuration
 st.set_page_config(
@@ -12,6 +20,8 @@ st.set_page_config(
     layout="wide"
 )
 
+bootstrap()
+
 # Custom CSS
 st.markdown("""
     <style>
@@ -58,7 +68,20 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Display currency (kept across pages in session state; prices are converted locally)
+currency_options = list(CURRENCY_SYMBOLS)
+currency = st.sidebar.selectbox(
+    "💱 Currency",
+    options=currency_options,
+    index=currency_options.index(st.session_state.get('currency', DEFAULT_CURRENCY))
+)
+st.session_state.currency = currency
+
+# Indicator series of this session are kept across reruns and dropped while the tab sits idle
+session_objects = get_session_memory().attach(st.session_state, st.session_state.get('current_user'), 'AI Insights')
+
 # Technical indicator calculations
+@timed('psi_indicator', indicator='rsi')
 def calculate_rsi(prices, period=14):
     """Calculate Relative Strength Index"""
     if len(prices) < period:
@@ -72,6 +95,7 @@ def calculate_rsi(prices, period=14):
     rsi = 100 - (100 / (1 + rs))
     return rsi.fillna(50)
 
+@timed('psi_indicator', indicator='macd')
 def calculate_macd(prices, fast=12, slow=26, signal=9):
     """Calculate MACD (Moving Average Convergence Divergence)"""
     if len(prices) < slow:
@@ -85,6 +109,7 @@ def calculate_macd(prices, fast=12, slow=26, signal=9):
     
     return macd, signal_line, histogram
 
+@timed('psi_indicator', indicator='bollinger')
 def calculate_bollinger_bands(prices, window=20, num_std=2):
     """Calculate Bollinger Bands"""
     if len(prices) < window:
@@ -98,18 +123,20 @@ def calculate_bollinger_bands(prices, window=20, num_std=2):
     
     return upper_band, rolling_mean, lower_band
 
+@timed('psi_indicator', indicator='momentum')
 def calculate_momentum(prices, period=14):
     """Calculate price momentum"""
     if len(prices) < period:
         return pd.Series([0] * len(prices), index=prices.index)
     return prices.diff(period)
 
-@st.cache_data(ttl=600)
+@cached(ttl=600, max_entries=32)
+@timed('psi_fetch', function='fetch_historical_data')
 def fetch_historical_data(coin_id, days=30):
     """Fetch historical data from CoinGecko"""
     try:
         response = requests.get(
-            f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart",
+            f"{COINGECKO_BASE_URL}/coins/{coin_id}/market_chart",
             params={"vs_currency": "usd", "days": days, "interval": "daily"},
             timeout=15
         )
@@ -128,6 +155,7 @@ def fetch_historical_data(coin_id, days=30):
         prices = 50000 + np.cumsum(np.random.randn(days) * 1000)
         return pd.DataFrame({'price': prices}, index=dates)
 
+@timed('psi_insights')
 def generate_insights(df, coin_name):
     """Generate AI-powered insights based on technical indicators"""
     insights = []
@@ -250,10 +278,17 @@ coin_map = {
 
 coin_id = coin_map[selected_coin]
 
+if st.button(f"🔄 Refresh {selected_coin} Data"):
+    # Only this coin's history is refetched; other coins stay cached for every viewer
+    fetch_historical_data.invalidate(coin_id=coin_id)
+
 # Fetch data
 with st.spinner(f"Analyzing {selected_coin}..."):
-    df = fetch_historical_data(coin_id, days=90)
-    insights, rsi, macd, signal, upper_bb, middle_bb, lower_bb = generate_insights(df, selected_coin)
+    # Indicators run on display-currency prices (one vectorized multiply of the USD history)
+    df = convert(fetch_historical_data(coin_id, days=90), currency)
+    insights, rsi, macd, signal, upper_bb, middle_bb, lower_bb = session_objects.memo(
+        'analysis', (coin_id, currency, frame_fingerprint(df, 'price')), lambda: generate_insights(df, selected_coin)
+    )
 
 # Display insights
 st.markdown("---")
@@ -274,31 +309,32 @@ st.markdown("## 📊 Technical Indicators")
 
 # RSI Chart
 st.markdown("### Relative Strength Index (RSI)")
-fig_rsi = go.Figure()
-
-fig_rsi.add_trace(go.Scatter(
-    x=df.index,
-    y=rsi,
-    name='RSI',
-    line=dict(color='#00f5ff', width=2)
-))
-
-# Add overbought/oversold lines
-fig_rsi.add_hline(y=70, line_dash="dash", line_color="#ff4444", annotation_text="Overbought (70)")
-fig_rsi.add_hline(y=30, line_dash="dash", line_color="#00ff88", annotation_text="Oversold (30)")
-fig_rsi.add_hline(y=50, line_dash="dot", line_color="#888888", annotation_text="Neutral (50)")
-
-fig_rsi.update_layout(
-    template='plotly_dark',
-    height=300,
-    plot_bgcolor='rgba(0,0,0,0)',
-    paper_bgcolor='rgba(0,0,0,0)',
-    font=dict(color='white'),
-    xaxis_title='Date',
-    yaxis_title='RSI',
-    yaxis_range=[0, 100],
-    showlegend=True
-)
+with timed('psi_figure', chart='rsi'):
+    fig_rsi = go.Figure()
+
+    fig_rsi.add_trace(go.Scatter(
+        x=df.index,
+        y=rsi,
+        name='RSI',
+        line=dict(color='#00f5ff', width=2)
+    ))
+
+    # Add overbought/oversold lines
+    fig_rsi.add_hline(y=70, line_dash="dash", line_color="#ff4444", annotation_text="Overbought (70)")
+    fig_rsi.add_hline(y=30, line_dash="dash", line_color="#00ff88", annotation_text="Oversold (30)")
+    fig_rsi.add_hline(y=50, line_dash="dot", line_color="#888888", annotation_text="Neutral (50)")
+
+    fig_rsi.update_layout(
+        template='plotly_dark',
+        height=300,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        xaxis_title='Date',
+        yaxis_title='RSI',
+        yaxis_range=[0, 100],
+        showlegend=True
+    )
 
 st.plotly_chart(fig_rsi, use_container_width=True)
 
@@ -320,44 +356,45 @@ with col3:
 st.markdown("---")
 st.markdown("### MACD (Moving Average Convergence Divergence)")
 
-fig_macd = go.Figure()
-
-fig_macd.add_trace(go.Scatter(
-    x=df.index,
-    y=macd,
-    name='MACD',
-    line=dict(color='#00f5ff', width=2)
-))
-
-fig_macd.add_trace(go.Scatter(
-    x=df.index,
-    y=signal,
-    name='Signal',
-    line=dict(color='#ff4444', width=2)
-))
-
-# Histogram
-histogram = macd - signal
-colors = ['#00ff88' if val >= 0 else '#ff4444' for val in histogram]
-
-fig_macd.add_trace(go.Bar(
-    x=df.index,
-    y=histogram,
-    name='Histogram',
-    marker_color=colors,
-    opacity=0.5
-))
-
-fig_macd.update_layout(
-    template='plotly_dark',
-    height=300,
-    plot_bgcolor='rgba(0,0,0,0)',
-    paper_bgcolor='rgba(0,0,0,0)',
-    font=dict(color='white'),
-    xaxis_title='Date',
-    yaxis_title='MACD',
-    showlegend=True
-)
+with timed('psi_figure', chart='macd'):
+    fig_macd = go.Figure()
+
+    fig_macd.add_trace(go.Scatter(
+        x=df.index,
+        y=macd,
+        name='MACD',
+        line=dict(color='#00f5ff', width=2)
+    ))
+
+    fig_macd.add_trace(go.Scatter(
+        x=df.index,
+        y=signal,
+        name='Signal',
+        line=dict(color='#ff4444', width=2)
+    ))
+
+    # Histogram
+    histogram = macd - signal
+    colors = ['#00ff88' if val >= 0 else '#ff4444' for val in histogram]
+
+    fig_macd.add_trace(go.Bar(
+        x=df.index,
+        y=histogram,
+        name='Histogram',
+        marker_color=colors,
+        opacity=0.5
+    ))
+
+    fig_macd.update_layout(
+        template='plotly_dark',
+        height=300,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        xaxis_title='Date',
+        yaxis_title='MACD',
+        showlegend=True
+    )
 
 st.plotly_chart(fig_macd, use_container_width=True)
 
@@ -365,47 +402,48 @@ st.plotly_chart(fig_macd, use_container_width=True)
 st.markdown("---")
 st.markdown("### Bollinger Bands")
 
-fig_bb = go.Figure()
-
-fig_bb.add_trace(go.Scatter(
-    x=df.index,
-    y=df['price'],
-    name='Price',
-    line=dict(color='#00f5ff', width=2)
-))
-
-fig_bb.add_trace(go.Scatter(
-    x=df.index,
-    y=upper_bb,
-    name='Upper Band',
-    line=dict(color='#ff4444', width=1, dash='dash')
-))
-
-fig_bb.add_trace(go.Scatter(
-    x=df.index,
-    y=middle_bb,
-    name='Middle Band (SMA)',
-    line=dict(color='#ffffff', width=1, dash='dot')
-))
-
-fig_bb.add_trace(go.Scatter(
-    x=df.index,
-    y=lower_bb,
-    name='Lower Band',
-    line=dict(color='#00ff88', width=1, dash='dash'),
-    fill='tonexty'
-))
-
-fig_bb.update_layout(
-    template='plotly_dark',
-    height=400,
-    plot_bgcolor='rgba(0,0,0,0)',
-    paper_bgcolor='rgba(0,0,0,0)',
-    font=dict(color='white'),
-    xaxis_title='Date',
-    yaxis_title='Price (USD)',
-    showlegend=True
-)
+with timed('psi_figure', chart='bollinger'):
+    fig_bb = go.Figure()
+
+    fig_bb.add_trace(go.Scatter(
+        x=df.index,
+        y=df['price'],
+        name='Price',
+        line=dict(color='#00f5ff', width=2)
+    ))
+
+    fig_bb.add_trace(go.Scatter(
+        x=df.index,
+        y=upper_bb,
+        name='Upper Band',
+        line=dict(color='#ff4444', width=1, dash='dash')
+    ))
+
+    fig_bb.add_trace(go.Scatter(
+        x=df.index,
+        y=middle_bb,
+        name='Middle Band (SMA)',
+        line=dict(color='#ffffff', width=1, dash='dot')
+    ))
+
+    fig_bb.add_trace(go.Scatter(
+        x=df.index,
+        y=lower_bb,
+        name='Lower Band',
+        line=dict(color='#00ff88', width=1, dash='dash'),
+        fill='tonexty'
+    ))
+
+    fig_bb.update_layout(
+        template='plotly_dark',
+        height=400,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        xaxis_title='Date',
+        yaxis_title=f'Price ({currency})',
+        showlegend=True
+    )
 
 st.plotly_chart(fig_bb, use_container_width=True)
 
@@ -414,11 +452,9 @@ st.markdown("---")
 st.markdown("## 🔮 Statistical Predictions")
 
 # Simple linear regression for trend
-from numpy.polynomial import Polynomial
-
 recent_prices = df['price'].tail(30).values
 x = np.arange(len(recent_prices))
-p = Polynomial.fit(x, recent_prices, 1)
+p = np.polynomial.Polynomial.fit(x, recent_prices, 1)
 trend_direction = p.convert().coef[1]
 
 col1, col2 = st.columns(2)
@@ -426,10 +462,10 @@ col1, col2 = st.columns(2)
 with col1:
     st.markdown("### Short-term Trend (30 Days)")
     if trend_direction > 0:
-        st.success(f"📈 **Upward Trend**: ${abs(trend_direction):.2f}/day")
+        st.success(f"📈 **Upward Trend**: {currency_symbol(currency)}{abs(trend_direction):.2f}/day")
         st.markdown(f"Statistical model suggests continued upward momentum for {selected_coin}.")
     else:
-        st.warning(f"📉 **Downward Trend**: ${abs(trend_direction):.2f}/day")
+        st.warning(f"📉 **Downward Trend**: {currency_symbol(currency)}{abs(trend_direction):.2f}/day")
         st.markdown(f"Statistical model indicates downward pressure for {selected_coin}.")
 
 with col2:
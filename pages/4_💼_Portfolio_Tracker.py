@@ -1,8 +1,30 @@
 import streamlit as st
 import requests
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
+import math
+import time
+from datetime import date, datetime
+
+from modules.equity_curve import get_equity_curve
+from modules.market_data import price_history_arrays, price_history_frame, sync_price_history
+from modules.cache import cached
+from modules.config import COINGECKO_BASE_URL, CURRENCY_SYMBOLS, DEFAULT_CURRENCY
+from modules.currency import convert, convert_columns, currency_symbol, money_format, to_base
+from modules.metrics import timed
+from modules.portfolio_import import import_transactions_csv
+from modules.portfolio_store import get_portfolio_store, holdings_frame
+from modules.rebalance import REBALANCE_METHODS, propose_rebalance
+from modules.risk import estimate_return_model, get_risk_engine
+from modules.session_memory import data_owner, frame_fingerprint, get_session_memory
+from modules.tax_lots import MATCHING_METHODS, get_ledger_matcher
+from modules.startup import bootstrap, lazy_attribute, lazy_import
+from modules.tables import typed_table
+
+# Heavy libraries load on first use (see modules/startup.py)
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+go = lazy_import('plotly.graph_objects')
+px = lazy_import('plotly.express')
+make_subplots = lazy_attribute('plotly.subplots', 'make_subplots')
 
 # Page configuration
 st.set_page_config(
@@ -11,6 +33,8 @@ st.set_page_config(
     layout="wide"
 )
 
+bootstrap()
+
 # Custom CSS
 st.markdown("""
     <style>
@@ -45,13 +69,30 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Display currency (kept across pages in session state; prices are converted locally)
+currency_options = list(CURRENCY_SYMBOLS)
+currency = st.sidebar.selectbox(
+    "💱 Currency",
+    options=currency_options,
+    index=currency_options.index(st.session_state.get('currency', DEFAULT_CURRENCY))
+)
+st.session_state.currency = currency
+sign = currency_symbol(currency)
+
+# Figures of this session are kept across reruns and dropped while the tab sits idle
+session_objects = get_session_memory().attach(st.session_state, st.session_state.get('current_user'), 'Portfolio Tracker')
+
+# Holdings are stored and valued in USD; amounts are converted only for display and input
+MONEY_COLUMNS = ['Purchase Price', 'Current Price', 'Investment', 'Current Value', 'Profit/Loss']
+
 # Data fetching
-@st.cache_data(ttl=300)
+@cached(ttl=300)
+@timed('psi_fetch', function='fetch_current_prices')
 def fetch_current_prices():
     """Fetch current prices for cryptocurrencies"""
     try:
         response = requests.get(
-            "https://api.coingecko.com/api/v3/simple/price",
+            f"{COINGECKO_BASE_URL}/simple/price",
             params={
                 "ids": "bitcoin,ethereum,solana",
                 "vs_currencies": "usd"
@@ -73,9 +114,65 @@ def fetch_current_prices():
             'solana': 145
         }
 
-# Initialize session state for portfolio
-if 'portfolio' not in st.session_state:
-    st.session_state.portfolio = []
+@timed('psi_figure', chart='equity')
+def create_equity_chart(equity_df, currency):
+    """Portfolio value against invested capital, with drawdown below"""
+    fig_equity = make_subplots(
+        rows=2, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.1,
+        subplot_titles=('Portfolio Value', 'Drawdown'),
+        row_heights=[0.7, 0.3]
+    )
+    
+    fig_equity.add_trace(
+        go.Scatter(x=equity_df['timestamp'], y=equity_df['value'], name='Value', line=dict(color='#00f5ff', width=2)),
+        row=1, col=1
+    )
+    fig_equity.add_trace(
+        go.Scatter(x=equity_df['timestamp'], y=equity_df['invested'], name='Invested',
+                   line=dict(color='#ffffff', width=1, dash='dot')),
+        row=1, col=1
+    )
+    fig_equity.add_trace(
+        go.Scatter(x=equity_df['timestamp'], y=equity_df['drawdown'] * 100, name='Drawdown',
+                   fill='tozeroy', line=dict(color='#ff4444', width=1)),
+        row=2, col=1
+    )
+    
+    fig_equity.update_layout(
+        template='plotly_dark',
+        height=500,
+        hovermode='x unified',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        yaxis_title=f'Value ({currency})',
+        yaxis2_title='Drawdown (%)'
+    )
+    
+    return fig_equity
+
+@timed('psi_figure', chart='risk')
+def create_risk_chart(samples_by_horizon, currency):
+    """Overlaid histograms of simulated profit/loss, one per horizon"""
+    fig_risk = go.Figure()
+    for horizon, samples in samples_by_horizon.items():
+        fig_risk.add_trace(go.Histogram(x=convert(samples, currency), name=f"{horizon}d", opacity=0.6, nbinsx=100))
+    
+    fig_risk.update_layout(
+        title='Simulated Profit/Loss Distribution',
+        template='plotly_dark',
+        barmode='overlay',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        xaxis_title=f'Profit/Loss ({currency})',
+        yaxis_title='Paths',
+        height=400
+    )
+    
+    return fig_risk
 
 # Header
 st.title("💼 Portfolio Tracker")
@@ -90,11 +187,16 @@ coin_display_map = {
     'solana': 'Solana (SOL)'
 }
 
+# Portfolios persist in the shared store, keyed by the signed-in user (or this session when anonymous)
+portfolio_user = data_owner(st.session_state)
+portfolio_store = get_portfolio_store()
+portfolio = portfolio_store.engine(portfolio_user, tuple(coin_display_map))
+
 # Add holding section
 st.markdown("---")
 st.markdown("## ➕ Add Holding")
 
-col1, col2, col3, col4 = st.columns(4)
+col1, col2, col3, col4, col5 = st.columns(5)
 
 with col1:
     selected_coin = st.selectbox(
@@ -108,67 +210,80 @@ with col2:
 
 with col3:
     purchase_price = st.number_input(
-        "Purchase Price ($)",
+        f"Purchase Price ({currency})",
         min_value=0.0,
-        value=float(current_prices[selected_coin]),
+        value=float(convert(current_prices[selected_coin], currency)),
         step=0.01,
         format="%.2f"
     )
 
 with col4:
+    purchase_date = st.date_input("Purchase Date", value=date.today(), max_value=date.today())
+
+with col5:
     st.markdown("&nbsp;")
     if st.button("➕ Add to Portfolio", use_container_width=True):
         if amount > 0:
-            st.session_state.portfolio.append({
-                'coin': selected_coin,
-                'amount': amount,
-                'purchase_price': purchase_price,
-                'purchase_value': amount * purchase_price
-            })
+            acquired_at = time.time() if purchase_date == date.today() else \
+                datetime.combine(purchase_date, datetime.min.time()).timestamp()
+            portfolio_store.add_lot(portfolio_user, selected_coin, amount, to_base(purchase_price, currency), acquired_at)
             st.success(f"Added {amount} {coin_display_map[selected_coin]} to portfolio!")
             st.rerun()
         else:
             st.error("Please enter a valid amount")
 
+with st.expander("📥 Bulk Import from CSV"):
+    st.markdown(
+        "Upload an exchange or wallet export with columns for **coin/symbol**, **amount/quantity** "
+        "and **price**. Optional **date** and **side** columns are used when present; buys become lots and sells "
+        "are recorded as sales."
+    )
+    uploaded_file = st.file_uploader("Transactions CSV", type=["csv"])
+    
+    if uploaded_file is not None and st.button("📥 Import Transactions", use_container_width=True):
+        try:
+            with st.spinner("Importing transactions..."):
+                import_stats = import_transactions_csv(uploaded_file, portfolio_user, portfolio_store)
+            st.session_state.import_message = (
+                f"Imported {import_stats['imported']:,} buys and {import_stats['sells']:,} sells "
+                f"from {import_stats['rows']:,} rows ({import_stats['skipped']:,} skipped)"
+            )
+            import_warnings = []
+            if import_stats['oversold']:
+                import_warnings.append(
+                    f"{import_stats['oversold']:,} sells were not recorded because they exceed the amount held at the time."
+                )
+            if import_stats['bad_dates']:
+                import_warnings.append(
+                    f"{import_stats['bad_dates']:,} rows were skipped because their date could not be read "
+                    f"(lines {', '.join(map(str, import_stats['bad_date_rows']))}"
+                    f"{', ...' if import_stats['bad_dates'] > len(import_stats['bad_date_rows']) else ''})."
+                )
+            if import_warnings:
+                st.session_state.import_warning = " ".join(import_warnings)
+            st.rerun()
+        except ValueError as e:
+            st.error(f"Import failed: {e}")
+    
+    if 'import_message' in st.session_state:
+        st.success(st.session_state.pop('import_message'))
+    if 'import_warning' in st.session_state:
+        st.warning(st.session_state.pop('import_warning'))
+
 # Display portfolio
 st.markdown("---")
 st.markdown("## 📊 Your Portfolio")
 
-if len(st.session_state.portfolio) == 0:
+if len(portfolio) == 0:
     st.info("👋 Your portfolio is empty. Add your first holding above to get started!")
 else:
-    # Calculate portfolio metrics
-    portfolio_data = []
-    total_value = 0
-    total_investment = 0
-    
-    for idx, holding in enumerate(st.session_state.portfolio):
-        coin = holding['coin']
-        amount = holding['amount']
-        purchase_price = holding['purchase_price']
-        purchase_value = holding['purchase_value']
-        
-        current_price = current_prices[coin]
-        current_value = amount * current_price
-        profit_loss = current_value - purchase_value
-        profit_loss_pct = (profit_loss / purchase_value) * 100 if purchase_value > 0 else 0
-        
-        portfolio_data.append({
-            'index': idx,
-            'Coin': coin_display_map[coin],
-            'Amount': amount,
-            'Purchase Price': purchase_price,
-            'Current Price': current_price,
-            'Investment': purchase_value,
-            'Current Value': current_value,
-            'Profit/Loss': profit_loss,
-            'P/L %': profit_loss_pct
-        })
-        
-        total_value += current_value
-        total_investment += purchase_value
+    # Calculate portfolio metrics (per-lot values vectorized, per-coin totals cached)
+    df = convert_columns(portfolio.valuate(current_prices, coin_display_map), MONEY_COLUMNS, currency)
+    asset_df = holdings_frame(portfolio_store.valuation(portfolio_user, current_prices), coin_display_map)
+    asset_display_df = convert_columns(asset_df, MONEY_COLUMNS, currency)
     
-    df = pd.DataFrame(portfolio_data)
+    total_value = asset_display_df['Current Value'].sum()
+    total_investment = asset_display_df['Investment'].sum()
     
     # Portfolio summary metrics
     total_profit_loss = total_value - total_investment
@@ -177,15 +292,15 @@ else:
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Investment", f"${total_investment:,.2f}")
+        st.metric("Total Investment", f"{sign}{total_investment:,.2f}")
     
     with col2:
-        st.metric("Current Value", f"${total_value:,.2f}")
+        st.metric("Current Value", f"{sign}{total_value:,.2f}")
     
     with col3:
         st.metric(
             "Total Profit/Loss",
-            f"${total_profit_loss:,.2f}",
+            f"{sign}{total_profit_loss:,.2f}",
             f"{total_profit_loss_pct:.2f}%",
             delta_color="normal" if total_profit_loss >= 0 else "inverse"
         )
@@ -198,19 +313,29 @@ else:
     
     # Portfolio table
     st.markdown("---")
-    st.markdown("### 📋 Holdings Details")
-    
-    # Format display dataframe
-    display_df = df[['Coin', 'Amount', 'Purchase Price', 'Current Price', 'Investment', 'Current Value', 'Profit/Loss', 'P/L %']].copy()
-    
-    # Format columns
-    for col in ['Purchase Price', 'Current Price', 'Investment', 'Current Value', 'Profit/Loss']:
-        display_df[col] = display_df[col].apply(lambda x: f"${x:,.2f}")
-    
-    display_df['P/L %'] = display_df['P/L %'].apply(lambda x: f"{x:.2f}%")
-    display_df['Amount'] = display_df['Amount'].apply(lambda x: f"{x:.4f}")
-    
-    st.dataframe(display_df, use_container_width=True, hide_index=True)
+    st.markdown("### 📋 Purchase Lots")
+    st.caption("Each purchase as recorded. Totals, allocation, risk and rebalancing use holdings net of your sales.")
+    
+    # Numbers stay numeric; formatting happens client-side via column config
+    display_df, formats = typed_table(
+        df[['Coin', 'Amount', 'Purchase Price', 'Current Price', 'Investment', 'Current Value', 'Profit/Loss', 'P/L %']],
+        {
+            'Amount': 'number',
+            'Purchase Price': 'price',
+            'Current Price': 'price',
+            'Investment': 'currency',
+            'Current Value': 'currency',
+            'Profit/Loss': 'currency',
+            'P/L %': 'percent'
+        },
+        currency
+    )
+    st.dataframe(
+        display_df,
+        use_container_width=True,
+        hide_index=True,
+        column_config={column: st.column_config.NumberColumn(format=fmt) for column, fmt in formats.items()}
+    )
     
     # Portfolio allocation pie chart
     st.markdown("---")
@@ -220,10 +345,8 @@ else:
     
     with col1:
         # By current value
-        allocation_df = df.groupby('Coin')['Current Value'].sum().reset_index()
-        
         fig_allocation = px.pie(
-            allocation_df,
+            asset_display_df,
             values='Current Value',
             names='Coin',
             title='Allocation by Current Value',
@@ -242,10 +365,7 @@ else:
     
     with col2:
         # Performance by coin
-        performance_df = df.groupby('Coin').agg({
-            'Profit/Loss': 'sum',
-            'P/L %': 'mean'
-        }).reset_index()
+        performance_df = asset_display_df
         
         fig_performance = go.Figure()
         
@@ -255,7 +375,7 @@ else:
             x=performance_df['Coin'],
             y=performance_df['Profit/Loss'],
             marker_color=colors,
-            text=[f"${x:,.2f}" for x in performance_df['Profit/Loss']],
+            text=[f"{sign}{x:,.2f}" for x in performance_df['Profit/Loss']],
             textposition='outside'
         ))
         
@@ -266,7 +386,7 @@ else:
             paper_bgcolor='rgba(0,0,0,0)',
             font=dict(color='white'),
             xaxis_title='Asset',
-            yaxis_title='Profit/Loss (USD)',
+            yaxis_title=f'Profit/Loss ({currency})',
             height=400,
             showlegend=False
         )
@@ -286,7 +406,7 @@ else:
             <h4>🏆 Best Performer</h4>
             <p><strong>{best_performer['Coin']}</strong></p>
             <p class="profit">+{best_performer['P/L %']:.2f}%</p>
-            <p>${best_performer['Profit/Loss']:.2f}</p>
+            <p>{sign}{best_performer['Profit/Loss']:.2f}</p>
         </div>
         """, unsafe_allow_html=True)
     
@@ -297,20 +417,254 @@ else:
             <h4>📉 Worst Performer</h4>
             <p><strong>{worst_performer['Coin']}</strong></p>
             <p class="loss">{worst_performer['P/L %']:.2f}%</p>
-            <p>${worst_performer['Profit/Loss']:.2f}</p>
+            <p>{sign}{worst_performer['Profit/Loss']:.2f}</p>
         </div>
         """, unsafe_allow_html=True)
     
     with col3:
-        largest_holding = df.loc[df['Current Value'].idxmax()]
-        st.markdown(f"""
-        <div class="portfolio-card">
-            <h4>💎 Largest Holding</h4>
-            <p><strong>{largest_holding['Coin']}</strong></p>
-            <p>${largest_holding['Current Value']:.2f}</p>
-            <p>{(largest_holding['Current Value'] / total_value * 100):.1f}% of portfolio</p>
-        </div>
-        """, unsafe_allow_html=True)
+        if len(asset_display_df) and total_value > 0:
+            largest_holding = asset_display_df.loc[asset_display_df['Current Value'].idxmax()]
+            st.markdown(f"""
+            <div class="portfolio-card">
+                <h4>💎 Largest Holding</h4>
+                <p><strong>{largest_holding['Coin']}</strong></p>
+                <p>{sign}{largest_holding['Current Value']:.2f}</p>
+                <p>{(largest_holding['Current Value'] / total_value * 100):.1f}% of portfolio</p>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    # Portfolio value history
+    st.markdown("---")
+    st.markdown("### 📈 Portfolio Value History")
+    
+    frequency = st.radio("Resolution", options=["daily", "hourly"], horizontal=True, format_func=str.capitalize)
+    
+    history_days = max(1, math.ceil((time.time() - float(portfolio.acquired_at.min())) / 86400) + 1)
+    
+    histories = {}
+    for coin in {portfolio.coins[code] for code in np.unique(portfolio.coin_codes)}:
+        sync_price_history(coin, history_days)
+        timestamps, prices = price_history_arrays(coin, history_days, tier='day' if frequency == 'daily' else 'hour')
+        # Close the series with the live quote so the open bucket tracks current prices
+        histories[coin] = (
+            np.append(timestamps, int(time.time())),
+            np.append(prices, current_prices[coin])
+        )
+    
+    equity_df = convert_columns(
+        get_equity_curve(portfolio_user, frequency).update(portfolio, histories, portfolio_store.sell_arrays(portfolio_user)),
+        ['value', 'invested'], currency
+    )
+    
+    fig_equity = session_objects.memo(
+        'equity_chart',
+        (portfolio_user, frequency, currency, frame_fingerprint(equity_df, 'timestamp', 'value', 'invested')),
+        lambda: create_equity_chart(equity_df, currency)
+    )
+    
+    st.plotly_chart(fig_equity, use_container_width=True)
+    
+    if not equity_df.empty:
+        st.caption(f"Max drawdown: {equity_df['drawdown'].min() * 100:.2f}%")
+    
+    held_values = {
+        row['coin']: row['Current Value']
+        for _, row in asset_df.iterrows() if row['Current Value'] > 0
+    }
+    
+    if not held_values:
+        st.markdown("---")
+        st.info("Everything you bought has been sold, so there is nothing to analyze or rebalance.")
+    else:
+        # Monte Carlo risk analysis
+        st.markdown("---")
+        st.markdown("### 🎲 Risk Analysis (Monte Carlo)")
+        
+        col1, col2 = st.columns([1, 3])
+        
+        with col1:
+            n_paths = st.selectbox(
+                "Simulated paths",
+                options=[100_000, 1_000_000],
+                index=0,
+                format_func=lambda x: f"{x:,}"
+            )
+        
+        price_columns = {}
+        for coin in held_values:
+            sync_price_history(coin, 365)
+            coin_history = price_history_frame(coin, 365, tier='day')
+            price_columns[coin] = coin_history.set_index(coin_history['timestamp'].dt.floor('D'))['price']
+        price_frame = pd.DataFrame(price_columns).dropna()
+        
+        with st.spinner("Simulating portfolio outcomes..."):
+            risk_report = get_risk_engine().analyze(held_values, price_frame, n_paths=n_paths)
+        risk_summary = convert_columns(risk_report['summary'], ['VaR', 'CVaR'], currency)
+        risk_distribution = convert(risk_report['distribution'], currency)
+        
+        with col2:
+            st.caption(
+                f"Based on {len(price_frame)} days of daily returns across {len(held_values)} assets. "
+                "VaR is the loss not exceeded at the given confidence; CVaR is the average loss beyond it."
+            )
+        
+        money_column = st.column_config.NumberColumn(format=money_format(currency))
+        st.dataframe(
+            risk_summary,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'Confidence': st.column_config.NumberColumn(format="%.0f%%"),
+                'VaR': money_column,
+                'CVaR': money_column,
+                'VaR %': st.column_config.NumberColumn(format="%.2f%%"),
+                'CVaR %': st.column_config.NumberColumn(format="%.2f%%")
+            }
+        )
+        
+        fig_risk = session_objects.memo(
+            'risk_chart',
+            (tuple(held_values.items()), frame_fingerprint(price_frame), n_paths, currency),
+            lambda: create_risk_chart(risk_report['samples'], currency)
+        )
+        
+        st.plotly_chart(fig_risk, use_container_width=True)
+        
+        with st.expander("Outcome percentiles by horizon"):
+            st.dataframe(
+                risk_distribution,
+                use_container_width=True,
+                column_config={col: money_column for col in risk_distribution.columns}
+            )
+        
+        # Rebalancing optimizer
+        st.markdown("---")
+        st.markdown("### ⚖️ Rebalancing")
+        
+        rebalance_method = st.selectbox(
+            "Target allocation",
+            options=list(REBALANCE_METHODS.keys()),
+            format_func=lambda x: REBALANCE_METHODS[x]
+        )
+        
+        _, return_cov = estimate_return_model(price_frame[list(held_values)])
+        rebalance_df = propose_rebalance(rebalance_method, held_values, current_prices, return_cov)
+        rebalance_df.insert(0, 'Coin', rebalance_df.pop('asset').map(coin_display_map))
+        rebalance_df = convert_columns(rebalance_df, ['Current Value', 'Target Value', 'Trade Value'], currency)
+        
+        col1, col2 = st.columns([3, 2])
+        
+        with col1:
+            st.dataframe(
+                rebalance_df,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'Current Weight %': st.column_config.NumberColumn(format="%.1f%%"),
+                    'Target Weight %': st.column_config.NumberColumn(format="%.1f%%"),
+                    'Current Value': money_column,
+                    'Target Value': money_column,
+                    'Trade Value': money_column,
+                    'Trade Amount': st.column_config.NumberColumn(format="%.6f")
+                }
+            )
+        
+        with col2:
+            fig_rebalance = go.Figure()
+            fig_rebalance.add_trace(go.Bar(
+                x=rebalance_df['Coin'], y=rebalance_df['Current Weight %'], name='Current', marker_color='#00f5ff'
+            ))
+            fig_rebalance.add_trace(go.Bar(
+                x=rebalance_df['Coin'], y=rebalance_df['Target Weight %'], name='Target', marker_color='#00ff88'
+            ))
+            fig_rebalance.update_layout(
+                template='plotly_dark',
+                barmode='group',
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                font=dict(color='white'),
+                yaxis_title='Weight (%)',
+                height=300
+            )
+            st.plotly_chart(fig_rebalance, use_container_width=True)
+    
+    # Sales and tax-lot matching
+    st.markdown("---")
+    st.markdown("### 💸 Sales & Tax Lots")
+    st.caption("Sales are matched against your lots for cost basis and realized P/L, and cannot exceed what you held at the time.")
+    
+    col1, col2, col3, col4, col5 = st.columns(5)
+    
+    with col1:
+        sell_coin = st.selectbox(
+            "Coin sold",
+            options=list(coin_display_map.keys()),
+            format_func=lambda x: coin_display_map[x],
+            key="sell_coin"
+        )
+    
+    with col2:
+        sell_amount = st.number_input("Amount sold", min_value=0.0, value=0.0, step=0.01, format="%.4f")
+    
+    with col3:
+        sell_price = st.number_input(
+            f"Sale Price ({currency})",
+            min_value=0.0,
+            value=float(convert(current_prices[sell_coin], currency)),
+            step=0.01,
+            format="%.2f",
+            key="sell_price"
+        )
+    
+    with col4:
+        sell_date = st.date_input("Sale Date", value=date.today(), max_value=date.today(), key="sell_date")
+    
+    with col5:
+        st.markdown("&nbsp;")
+        if st.button("💸 Record Sale", use_container_width=True):
+            if sell_amount > 0:
+                sold_at = time.time() if sell_date == date.today() else \
+                    datetime.combine(sell_date, datetime.min.time()).timestamp()
+                try:
+                    portfolio_store.add_sell(portfolio_user, sell_coin, sell_amount, to_base(sell_price, currency), sold_at)
+                except ValueError as e:
+                    st.error(f"Sale not recorded: {e}")
+                else:
+                    st.success(f"Recorded sale of {sell_amount} {coin_display_map[sell_coin]}")
+                    st.rerun()
+            else:
+                st.error("Please enter a valid amount")
+    
+    matching_method = st.radio(
+        "Lot matching method",
+        options=list(MATCHING_METHODS.keys()),
+        format_func=lambda x: f"{x} – {MATCHING_METHODS[x]}",
+        horizontal=True
+    )
+    
+    lot_matcher = get_ledger_matcher(portfolio_store, portfolio_user, matching_method).sync()
+    if lot_matcher.rejected:
+        st.warning(f"{len(lot_matcher.rejected)} recorded sales exceed the lots they could be matched against and are left out.")
+    tax_df = pd.DataFrame(
+        lot_matcher.summary(current_prices),
+        columns=['coin', 'open_amount', 'cost_basis', 'realized', 'unrealized', 'open_lots']
+    )
+    tax_df['coin'] = tax_df['coin'].map(coin_display_map)
+    tax_df.columns = ['Coin', 'Open Amount', 'Cost Basis', 'Realized P/L', 'Unrealized P/L', 'Open Lots']
+    tax_df = convert_columns(tax_df, ['Cost Basis', 'Realized P/L', 'Unrealized P/L'], currency)
+    
+    money_column = st.column_config.NumberColumn(format=money_format(currency))
+    st.dataframe(
+        tax_df,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'Open Amount': st.column_config.NumberColumn(format="%.4f"),
+            'Cost Basis': money_column,
+            'Realized P/L': money_column,
+            'Unrealized P/L': money_column
+        }
+    )
     
     # Manage portfolio
     st.markdown("---")
@@ -319,31 +673,36 @@ else:
     col1, col2 = st.columns([3, 1])
     
     with col1:
-        if len(st.session_state.portfolio) > 0:
+        if len(portfolio) > 0:
             remove_index = st.selectbox(
                 "Select holding to remove",
-                options=range(len(st.session_state.portfolio)),
-                format_func=lambda x: f"{coin_display_map[st.session_state.portfolio[x]['coin']]} - {st.session_state.portfolio[x]['amount']:.4f} coins"
+                options=range(len(portfolio)),
+                format_func=lambda x: f"{df['Coin'].iat[x]} - {df['Amount'].iat[x]:.4f} coins"
             )
     
     with col2:
         st.markdown("&nbsp;")
         if st.button("🗑️ Remove Selected", use_container_width=True):
-            if len(st.session_state.portfolio) > 0:
-                removed = st.session_state.portfolio.pop(remove_index)
-                st.success(f"Removed {coin_display_map[removed['coin']]} from portfolio")
-                st.rerun()
+            if len(portfolio) > 0:
+                removed_coin = df['Coin'].iat[remove_index]
+                try:
+                    portfolio_store.remove_lot(portfolio_user, int(portfolio.lot_ids[remove_index]))
+                except ValueError as e:
+                    st.error(f"Cannot remove this lot: {e}")
+                else:
+                    st.success(f"Removed {removed_coin} from portfolio")
+                    st.rerun()
     
     col1, col2 = st.columns(2)
     
     with col1:
         if st.button("🔄 Refresh Prices", use_container_width=True):
-            st.cache_data.clear()
+            fetch_current_prices.invalidate()
             st.rerun()
     
     with col2:
         if st.button("🗑️ Clear All Holdings", use_container_width=True):
-            st.session_state.portfolio = []
+            portfolio_store.clear(portfolio_user)
             st.success("Portfolio cleared!")
             st.rerun()
 
@@ -357,22 +716,24 @@ with st.expander("💡 Portfolio Tips"):
     2. **Track Performance**: Monitor your profit/loss in real-time
     3. **View Allocation**: See how your portfolio is distributed across assets
     4. **Manage**: Remove individual holdings or clear entire portfolio
+    5. **Bulk Import**: Load exchange or wallet CSV exports in one step
     
     ### Important Notes
     
-    - 📊 Portfolio data is stored in your browser session
+    - 📊 Portfolio data is stored on the server per user
     - 🔄 Prices update automatically when you refresh
-    - 💾 Data is not persisted between sessions
+    - 💾 Holdings persist between sessions
     - 📱 Works across all devices
     
     ### Risk Management
     
     - Diversify across multiple assets
+    - Check the Monte Carlo VaR/CVaR above before adding to concentrated positions
     - Set stop-loss levels
     - Don't invest more than you can afford to lose
-    - Regular rebalancing recommended
+    - Regular rebalancing recommended (see the Rebalancing section for target weights and trades)
     """)
 
 # Footer
 st.markdown("---")
-st.caption("💡 Prices updated every 5 minutes | Portfolio stored locally | Not financial advice")
+st.caption("💡 Prices updated every 5 minutes | Portfolio saved per user | Not financial advice")
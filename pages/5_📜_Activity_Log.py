@@ -0,0 +1,95 @@
+import streamlit as st
+import os
+from datetime import datetime, timedelta
+
+from modules.config import ACTIVITY_LOG_FILE, EXAMPLE_ACTIVITY_LOG_FILE
+from modules.log_index import get_activity_log_reader, pyarrow_available
+from modules.startup import bootstrap
+
+# Page configuration
+st.set_page_config(
+    page_title="Activity Log - Psi Crypto",
+    page_icon="📜",
+    layout="wide"
+)
+
+bootstrap()
+
+# Custom CSS
+st.markdown("""
+    <style>
+        .main {
+            background: linear-gradient(135deg, #0a0e27 0%, #1a1f3a 100%);
+        }
+        .stApp {
+            background: linear-gradient(135deg, #0a0e27 0%, #1a1f3a 100%);
+        }
+        h1 {
+            color: #00f5ff;
+        }
+        h2, h3 {
+            color: #ffffff;
+        }
+    </style>
+""", unsafe_allow_html=True)
+
+st.title("📜 Activity Log")
+st.markdown("System and user activity, queried through the log's time index")
+
+# Log source
+log_file = ACTIVITY_LOG_FILE if os.path.exists(ACTIVITY_LOG_FILE) else EXAMPLE_ACTIVITY_LOG_FILE
+if log_file != ACTIVITY_LOG_FILE:
+    st.info(f"No activity recorded yet - showing the example log ({EXAMPLE_ACTIVITY_LOG_FILE})")
+
+reader = get_activity_log_reader(log_file)
+
+# Filters
+TIME_RANGES = {
+    "Last Hour": timedelta(hours=1),
+    "Last 24 Hours": timedelta(days=1),
+    "Last 7 Days": timedelta(days=7),
+    "Last 30 Days": timedelta(days=30),
+    "All Time": None
+}
+
+col1, col2, col3 = st.columns([1, 2, 1])
+with col1:
+    time_range = st.selectbox("Time Range", list(TIME_RANGES.keys()), index=4)
+with col2:
+    statuses = reader.statuses()
+    selected_statuses = st.multiselect("Status", statuses, default=statuses)
+with col3:
+    limit = st.number_input("Max Rows", min_value=10, max_value=100_000, value=500, step=100)
+
+window = TIME_RANGES[time_range]
+start = datetime.now() - window if window is not None else None
+
+if not selected_statuses:
+    st.warning("Select at least one status to show entries")
+    st.stop()
+
+log_df = reader.query(
+    start=start,
+    statuses=None if selected_statuses == statuses else selected_statuses,
+    limit=int(limit)
+)
+
+# Summary
+st.markdown("---")
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Indexed Rows", f"{reader.row_count():,}")
+with col2:
+    st.metric("Matching (shown)", f"{len(log_df):,}")
+with col3:
+    st.metric("Archive Format", "Parquet" if pyarrow_available() else "CSV only")
+
+# Newest entries first
+st.dataframe(log_df.iloc[::-1], use_container_width=True, hide_index=True)
+
+if st.button("🔄 Refresh", use_container_width=True):
+    st.rerun()
+
+# Footer
+st.markdown("---")
+st.caption("💡 New entries are indexed incrementally | Rotated segments are archived to Parquet when pyarrow is installed")
@@ -0,0 +1,265 @@
+import streamlit as st
+
+from biometric_lock import check_authentication, get_current_user, show_lock_screen
+from modules.cache import get_cache_manager, invalidate
+from modules.config import ADMIN_USERS
+from modules.metrics import get_metrics_registry
+from modules.session_memory import get_session_memory
+from modules.startup import bootstrap, import_costs, lazy_import
+from modules.utils import format_bytes
+
+# Heavy libraries load on first use (see modules/startup.py)
+pd = lazy_import('pandas')
+
+# Page configuration
+st.set_page_config(
+    page_title="Admin - Psi Crypto",
+    page_icon="🔧",
+    layout="wide"
+)
+
+startup = bootstrap()
+
+# Custom CSS
+st.markdown("""
+    <style>
+        .main {
+            background: linear-gradient(135deg, #0a0e27 0%, #1a1f3a 100%);
+        }
+        .stApp {
+            background: linear-gradient(135deg, #0a0e27 0%, #1a1f3a 100%);
+        }
+        h1 {
+            color: #00f5ff;
+        }
+        h2, h3 {
+            color: #ffffff;
+        }
+    </style>
+""", unsafe_allow_html=True)
+
+# Metrics, cache invalidation and session shedding are admin-only; the emergency bypass signs in as 'guest'
+if not check_authentication():
+    if show_lock_screen():
+        st.rerun()
+    st.stop()
+if (get_current_user() or '').lower() not in ADMIN_USERS:
+    st.error("🚫 Admin access required - sign in as an admin user")
+    st.stop()
+
+st.title("🔧 Admin")
+st.markdown("Process-wide timings and counters, shared by every session on this replica")
+
+registry = get_metrics_registry()
+histograms = registry.histograms()
+counters = registry.counters()
+
+if startup.get('metrics_url'):
+    st.info(f"Prometheus endpoint: {startup['metrics_url']}")
+else:
+    st.warning("Prometheus endpoint disabled (METRICS_PORT=0) or its port is taken")
+
+# Result cache
+cache = get_cache_manager()
+cache_stats = cache.stats()
+
+st.markdown("---")
+st.markdown("## 🗄️ Result Cache")
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Cached Bytes", format_bytes(cache.total_bytes))
+with col2:
+    st.metric("Budget", format_bytes(cache.max_bytes))
+with col3:
+    st.metric("Entries", sum(row['entries'] for row in cache_stats))
+
+if cache_stats:
+    st.dataframe(
+        pd.DataFrame([
+            {
+                'Function': row['function'],
+                'Entries': row['entries'],
+                'Size (KB)': row['bytes'] / 1024,
+                'Hit Ratio': row['hit_ratio'] * 100 if row['hit_ratio'] is not None else None,
+                'Hits': row['hits'],
+                'Misses': row['misses'],
+                'Oldest (s)': row['oldest_age'],
+                'TTL (s)': row['ttl'],
+                'Evictions': row['evictions'],
+                'Invalidations': row['invalidations']
+            }
+            for row in cache_stats
+        ]),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'Size (KB)': st.column_config.NumberColumn(format="%.1f"),
+            'Hit Ratio': st.column_config.NumberColumn(format="%.1f%%"),
+            'Oldest (s)': st.column_config.NumberColumn(format="%.0f")
+        }
+    )
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        function = st.selectbox("Function", [row['function'] for row in cache_stats])
+        entries = cache.entries(function)
+        if entries:
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        'Arguments': ', '.join(f"{key}={value!r}" for key, value in entry['args'].items()) or '-',
+                        'Size (KB)': entry['bytes'] / 1024,
+                        'Age (s)': entry['age'],
+                        'Idle (s)': entry['idle'],
+                        'Hits': entry['hits']
+                    }
+                    for entry in entries
+                ]),
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'Size (KB)': st.column_config.NumberColumn(format="%.1f"),
+                    'Age (s)': st.column_config.NumberColumn(format="%.0f"),
+                    'Idle (s)': st.column_config.NumberColumn(format="%.0f")
+                }
+            )
+    with col2:
+        st.markdown("&nbsp;")
+        if st.button(f"🗑️ Invalidate {function}", use_container_width=True):
+            dropped = invalidate(function)
+            st.success(f"Dropped {dropped} entries")
+            st.rerun()
+else:
+    st.info("No cached function has been called in this process yet")
+
+# Session memory
+session_memory = get_session_memory()
+session_rows = session_memory.sessions()
+
+st.markdown("---")
+st.markdown("## 🧠 Session Memory")
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Sessions", len(session_rows))
+with col2:
+    st.metric("Resident Bytes", format_bytes(session_memory.total_bytes))
+with col3:
+    st.metric("Cap per Session", format_bytes(session_memory.max_bytes))
+with col4:
+    st.metric("Idle Shed After", f"{session_memory.idle_seconds / 60:.0f} min")
+
+if session_rows:
+    st.dataframe(
+        pd.DataFrame([
+            {
+                'Session': row['session'][:8],
+                'User': row['user'] or 'guest',
+                'Page': row['page'],
+                'Idle (s)': row['idle'],
+                'Objects': row['objects'],
+                'Derived (KB)': row['derived_bytes'] / 1024,
+                'State (KB)': row['state_bytes'] / 1024,
+                'Largest': row['largest'],
+                'Hits': row['hits'],
+                'Computes': row['computes'],
+                'Recomputes': row['recomputes'],
+                'Evictions': row['evictions'],
+                'Sheds': row['sheds']
+            }
+            for row in session_rows
+        ]),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'Idle (s)': st.column_config.NumberColumn(format="%.0f"),
+            'Derived (KB)': st.column_config.NumberColumn(format="%.1f"),
+            'State (KB)': st.column_config.NumberColumn(format="%.1f")
+        }
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("💤 Shed Idle Sessions", use_container_width=True):
+            st.success(f"Released {format_bytes(session_memory.shed_idle())}")
+    with col2:
+        if st.button("🧹 Shed All Sessions", use_container_width=True):
+            st.success(f"Released {format_bytes(session_memory.shed())}")
+else:
+    st.info("No session has opened a data page in this process yet")
+
+# Latency histograms
+st.markdown("---")
+st.markdown("## ⏱️ Latency")
+if histograms:
+    latency_df = pd.DataFrame([
+        {
+            'Metric': row['name'].removesuffix('_seconds'),
+            'Labels': ', '.join(f"{key}={value}" for key, value in row['labels'].items()),
+            'Count': row['count'],
+            'Mean (ms)': row['mean'] * 1000 if row['mean'] is not None else None,
+            'p50 (ms)': row['p50'] * 1000 if row['p50'] is not None else None,
+            'p95 (ms)': row['p95'] * 1000 if row['p95'] is not None else None,
+            'p99 (ms)': row['p99'] * 1000 if row['p99'] is not None else None,
+            'Total (s)': row['sum']
+        }
+        for row in histograms
+    ])
+    ms_column = st.column_config.NumberColumn(format="%.2f")
+    st.dataframe(
+        latency_df,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'Mean (ms)': ms_column,
+            'p50 (ms)': ms_column,
+            'p95 (ms)': ms_column,
+            'p99 (ms)': ms_column,
+            'Total (s)': st.column_config.NumberColumn(format="%.3f")
+        }
+    )
+else:
+    st.info("Nothing has been timed yet - open the other pages first")
+
+# Counters
+st.markdown("---")
+st.markdown("## 🔢 Counters")
+if counters:
+    st.dataframe(
+        pd.DataFrame([
+            {
+                'Counter': row['name'],
+                'Labels': ', '.join(f"{key}={value}" for key, value in row['labels'].items()),
+                'Value': row['value']
+            }
+            for row in counters
+        ]),
+        use_container_width=True,
+        hide_index=True
+    )
+else:
+    st.info("No errors or counted events recorded")
+
+# Startup
+st.markdown("---")
+st.markdown("## 🚀 Startup")
+costs = import_costs()
+if costs:
+    st.dataframe(
+        pd.DataFrame({'Module': list(costs), 'Import (ms)': [cost * 1000 for cost in costs.values()]}),
+        use_container_width=True,
+        hide_index=True,
+        column_config={'Import (ms)': st.column_config.NumberColumn(format="%.1f")}
+    )
+
+col1, col2 = st.columns(2)
+with col1:
+    if st.button("🔄 Refresh", use_container_width=True):
+        st.rerun()
+with col2:
+    if st.button("🗑️ Reset Metrics", use_container_width=True):
+        registry.reset()
+        st.rerun()
+
+# Footer
+st.markdown("---")
+st.caption("💡 Percentiles are estimated from fixed histogram buckets | Metrics reset when the process restarts")
@@ -0,0 +1,111 @@
+import streamlit as st
+import os
+from datetime import datetime
+
+from modules.config import CEC_WAM_REFRESH_INTERVAL, STATUS_EMOJI
+from modules.ledger import get_ledger_loader, ledger_paths, load_cec_wam_ledger, refresh_cec_wam_ledger
+from modules.scheduler import get_scheduler
+from modules.startup import bootstrap
+
+# Page configuration
+st.set_page_config(
+    page_title="CEC WAM Ledger - Psi Crypto",
+    page_icon="📋",
+    layout="wide"
+)
+
+bootstrap()
+
+# Custom CSS
+st.markdown("""
+    <style>
+        .main {
+            background: linear-gradient(135deg, #0a0e27 0%, #1a1f3a 100%);
+        }
+        .stApp {
+            background: linear-gradient(135deg, #0a0e27 0%, #1a1f3a 100%);
+        }
+        h1 {
+            color: #00f5ff;
+        }
+        h2, h3 {
+            color: #ffffff;
+        }
+    </style>
+""", unsafe_allow_html=True)
+
+st.title("📋 CEC WAM Master Ledger")
+st.markdown("Component status from the master ledger, synced from Google Drive in the background")
+
+# The loader registers the background refresh (Drive sync + reload); reading here only re-parses changed files
+loader = get_ledger_loader()
+
+col1, col2 = st.columns([3, 1])
+with col2:
+    if st.button("🔄 Sync Now", use_container_width=True):
+        with st.spinner("Syncing ledger..."):
+            frames = refresh_cec_wam_ledger(loader)
+    else:
+        frames = load_cec_wam_ledger(loader)
+
+sheet = frames['sheet']
+log = frames['log']
+
+with col1:
+    job = get_scheduler().jobs().get('cec-wam-ledger')
+    if job is not None:
+        st.caption(f"Background refresh every {CEC_WAM_REFRESH_INTERVAL}s - {job['runs']} runs, {job['errors']} errors")
+    if sheet is not None and not os.path.exists(ledger_paths()['sheet']):
+        st.info("The ledger has not been synced yet - showing the example ledger")
+
+if sheet is None:
+    st.warning("No ledger available")
+    st.stop()
+
+# Summary
+st.markdown("---")
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Components", f"{sheet['Component'].nunique():,}")
+with col2:
+    st.metric("Entries", f"{len(sheet):,}")
+with col3:
+    st.metric("Average Value", f"{sheet['Value'].mean():.1f}" if len(sheet) else "-")
+with col4:
+    latest = sheet['Timestamp'].max()
+    st.metric("Last Update", latest.strftime('%Y-%m-%d %H:%M') if len(sheet) else "-")
+
+# Status breakdown
+status_counts = sheet['Status'].value_counts()
+status_counts = status_counts[status_counts > 0]
+st.markdown(" ".join(f"{STATUS_EMOJI.get(status, '⚪')} **{status}**: {count}" for status, count in status_counts.items()))
+
+# Ledger table
+st.markdown("---")
+st.markdown("### 📊 Ledger")
+st.dataframe(
+    sheet,
+    use_container_width=True,
+    hide_index=True,
+    column_config={
+        'Value': st.column_config.ProgressColumn(min_value=0, max_value=100, format="%.0f"),
+        'Timestamp': st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm")
+    }
+)
+
+# Ledger log (append-only; only new rows are parsed on refresh)
+st.markdown("---")
+st.markdown("### 📜 Ledger Log")
+if log is None:
+    st.info("No ledger log synced yet")
+else:
+    st.dataframe(log.iloc[::-1].head(500), use_container_width=True, hide_index=True)
+
+with st.expander("Loader statistics"):
+    st.json({path: {k: (datetime.fromtimestamp(v).isoformat() if k == 'last_change' and v else v)
+                     for k, v in stats.items()}
+             for path, stats in loader.stats().items()})
+
+# Footer
+st.markdown("---")
+st.caption("💡 Files are only re-read when they change | Ledger log rows are ingested incrementally")
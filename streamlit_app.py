@@ -1 +1,52 @@
+import streamlit as st
 
+from modules.config import APP_ICON, APP_NAME, APP_VERSION
+from modules.startup import bootstrap
+
+# Page configuration
+st.set_page_config(
+    page_title=APP_NAME,
+    page_icon=APP_ICON,
+    layout="wide"
+)
+
+# Shared process startup: heavy libraries warm up in the background while this renders
+bootstrap()
+
+# Custom CSS
+st.markdown("""
+    <style>
+        .main {
+            background: linear-gradient(135deg, #0a0e27 0%, #1a1f3a 100%);
+        }
+        .stApp {
+            background: linear-gradient(135deg, #0a0e27 0%, #1a1f3a 100%);
+        }
+        h1 {
+            color: #00f5ff;
+        }
+        h2, h3 {
+            color: #ffffff;
+        }
+    </style>
+""", unsafe_allow_html=True)
+
+st.title(f"{APP_ICON} {APP_NAME}")
+st.markdown("Real-time crypto market data, analytics and portfolio tracking")
+
+# Navigation
+st.markdown("---")
+col1, col2 = st.columns(2)
+with col1:
+    st.page_link("pages/1_📊_Market_Overview.py", label="Market Overview", icon="📊")
+    st.page_link("pages/2_📈_Advanced_Analytics.py", label="Advanced Analytics", icon="📈")
+    st.page_link("pages/3_🤖_AI_Insights.py", label="AI Insights", icon="🤖")
+with col2:
+    st.page_link("pages/4_💼_Portfolio_Tracker.py", label="Portfolio Tracker", icon="💼")
+    st.page_link("pages/5_📜_Activity_Log.py", label="Activity Log", icon="📜")
+    st.page_link("pages/7_📋_CEC_WAM_Ledger.py", label="CEC WAM Ledger", icon="📋")
+    st.page_link("pages/6_🔧_Admin.py", label="Admin", icon="🔧")
+
+# Footer
+st.markdown("---")
+st.caption(f"{APP_NAME} v{APP_VERSION} | Select a page from the sidebar to get started")
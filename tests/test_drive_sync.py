@@ -0,0 +1,84 @@
+"""Tests for modules.drive_sync resume and verification, against the local Drive stand-in"""
+
+import os
+
+import pytest
+
+from modules.drive_sync import PARTIAL_DIR, DriveSync, LocalDriveStandIn
+
+FOLDER = 'folder'
+NAME = 'ledger.csv'
+SIZE = 1_000_000
+
+
+@pytest.fixture
+def remote(tmp_path):
+    folder = tmp_path / 'drive' / FOLDER
+    folder.mkdir(parents=True)
+    (folder / NAME).write_bytes(os.urandom(SIZE))
+    return tmp_path / 'drive'
+
+
+def _sync(remote, tmp_path, fail_after=None, names=(NAME,)):
+    backend = LocalDriveStandIn(str(remote), fail_after=fail_after)
+    return DriveSync(backend, FOLDER, str(tmp_path / 'local'), names=names)
+
+
+def _partials(tmp_path):
+    return [name for name in os.listdir(tmp_path / 'local' / PARTIAL_DIR) if name.endswith('.part')]
+
+
+def test_interrupted_download_resumes_from_partial_file(remote, tmp_path):
+    sync = _sync(remote, tmp_path, fail_after=300_000)
+    result = sync.sync()
+    assert NAME in result['errors']
+    assert not (tmp_path / 'local' / NAME).exists()
+    assert len(_partials(tmp_path)) == 1
+
+    sync.backend.fail_after = None
+    result = sync.sync()
+    assert result['errors'] == {}
+    assert result['downloaded'] == 1 and result['resumed'] == 1
+    assert result['bytes'] == SIZE - 300_000
+    assert (tmp_path / 'local' / NAME).read_bytes() == (remote / FOLDER / NAME).read_bytes()
+    assert _partials(tmp_path) == []
+
+    assert sync.sync()['skipped'] == 1
+
+
+def test_corrupt_partial_file_fails_md5_and_is_refetched(remote, tmp_path):
+    sync = _sync(remote, tmp_path, fail_after=300_000)
+    sync.sync()
+    part = tmp_path / 'local' / PARTIAL_DIR / _partials(tmp_path)[0]
+    data = bytearray(part.read_bytes())
+    data[0] ^= 0xFF
+    part.write_bytes(bytes(data))
+
+    sync.backend.fail_after = None
+    result = sync.sync()
+    assert 'Checksum mismatch' in result['errors'][NAME]
+    assert not (tmp_path / 'local' / NAME).exists()
+
+    result = sync.sync()
+    assert result['errors'] == {} and result['resumed'] == 0 and result['bytes'] == SIZE
+    assert (tmp_path / 'local' / NAME).read_bytes() == (remote / FOLDER / NAME).read_bytes()
+
+
+def test_complete_partial_file_is_finalized_without_download(remote, tmp_path):
+    sync = _sync(remote, tmp_path, fail_after=300_000)
+    sync.sync()
+    # Every byte arrived but the process stopped before the rename
+    part = tmp_path / 'local' / PARTIAL_DIR / _partials(tmp_path)[0]
+    part.write_bytes((remote / FOLDER / NAME).read_bytes())
+
+    sync.backend.fail_after = None
+    result = sync.sync()
+    assert result['errors'] == {} and result['resumed'] == 1 and result['bytes'] == 0
+    assert (tmp_path / 'local' / NAME).read_bytes() == (remote / FOLDER / NAME).read_bytes()
+
+
+def test_only_configured_names_are_mirrored(remote, tmp_path):
+    (remote / FOLDER / 'streamlit_app.py').write_text("print('replaced')\n")
+    result = _sync(remote, tmp_path).sync()
+    assert result['downloaded'] == 1 and result['ignored'] == 1
+    assert sorted(os.listdir(tmp_path / 'local')) == ['.drive_partial', '.drive_sync.json', NAME]
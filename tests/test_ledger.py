@@ -0,0 +1,31 @@
+"""Tests for modules.ledger incremental loading"""
+
+from modules.ledger import LedgerLoader
+
+HEADER = b"Status,Component,Description,Value,Timestamp\n"
+ROW_1 = b"GREEN,Core,ok,90,2026-01-01 00:00:00"
+ROW_2 = b"RED,Edge,down,10,2026-01-02 00:00:00"
+
+
+def test_full_read_keeps_last_row_without_final_newline(tmp_path):
+    path = tmp_path / 'sheet.csv'
+    path.write_bytes(HEADER + ROW_1 + b"\n" + ROW_2)
+    frame = LedgerLoader().load(str(path))
+    assert list(frame['Component']) == ['Core', 'Edge']
+
+
+def test_append_holds_back_unterminated_row(tmp_path):
+    path = tmp_path / 'log.csv'
+    path.write_bytes(HEADER + ROW_1 + b"\n")
+    loader = LedgerLoader()
+    assert len(loader.load(str(path), append_only=True)) == 1
+
+    with open(path, 'ab') as f:
+        f.write(ROW_2[:10])
+    assert len(loader.load(str(path), append_only=True)) == 1
+
+    with open(path, 'ab') as f:
+        f.write(ROW_2[10:] + b"\n")
+    frame = loader.load(str(path), append_only=True)
+    assert list(frame['Component']) == ['Core', 'Edge']
+    assert loader.stats()[str(path)]['full_reads'] == 1
@@ -0,0 +1,24 @@
+"""Tests for modules.portfolio_import"""
+
+import io
+
+from modules.portfolio_import import import_transactions_csv
+from modules.portfolio_store import PortfolioStore
+
+
+def test_newest_first_sells_see_buys_from_later_chunks(tmp_path):
+    store = PortfolioStore(str(tmp_path / 'portfolio.db'))
+    # Newest first: the sale of each pair comes before its buy
+    rows = []
+    for day in range(30, 0, -1):
+        rows.append(f"2026-01-{day:02d} 12:00:00,sell,BTC,0.5,110")
+        rows.append(f"2026-01-{day:02d} 00:00:00,buy,BTC,1,100")
+    source = io.StringIO("date,side,asset,amount,price\n" + "\n".join(rows) + "\n")
+
+    stats = import_transactions_csv(source, 'alice', store, chunksize=7)
+
+    assert stats['chunks'] == 9
+    assert stats['imported'] == 30
+    assert stats['sells'] == 30
+    assert stats['oversold'] == 0
+    assert store.valuation('alice', {'bitcoin': 1.0})['bitcoin']['amount'] == 15.0
@@ -0,0 +1,46 @@
+"""Tests for modules.portfolio_store cache consistency"""
+
+from modules.portfolio_store import PortfolioStore
+
+
+def _store(tmp_path):
+    return PortfolioStore(str(tmp_path / 'portfolio.db'))
+
+
+def test_engine_rebuild_racing_add_lot_is_not_cached(tmp_path):
+    store = _store(tmp_path)
+    store.add_lot('alice', 'bitcoin', 1.0, 100.0, acquired_at=1_000)
+    read_lots = store.lots
+
+    def lots_then_write(user, *args, **kwargs):
+        # The rebuild has read the lots; another session adds one before it caches
+        records = read_lots(user, *args, **kwargs)
+        store.lots = read_lots
+        store.add_lot(user, 'bitcoin', 2.0, 200.0, acquired_at=2_000)
+        return records
+
+    store.lots = lots_then_write
+    assert len(store.engine('alice')) == 1
+    assert len(store.engine('alice')) == 2
+
+
+def test_aggregate_racing_add_sell_is_not_cached(tmp_path):
+    store = _store(tmp_path)
+    store.add_lot('alice', 'bitcoin', 2.0, 100.0, acquired_at=1_000)
+    connection = store._connection
+
+    class SellAfterRead:
+        """Connection whose sale-sum query records a sale right after it is read"""
+
+        def execute(self, sql, params=()):
+            cursor = connection().execute(sql, params)
+            if not sql.startswith("SELECT COALESCE(SUM(amount), 0) FROM sells"):
+                return cursor
+            row = cursor.fetchone()
+            store._connection = connection
+            store.add_sell('alice', 'bitcoin', 1.5, 150.0, sold_at=2_000)
+            return type('Cursor', (), {'fetchone': lambda self: row})()
+
+    store._connection = SellAfterRead
+    assert store.valuation('alice', {'bitcoin': 10.0})['bitcoin']['amount'] == 2.0
+    assert store.valuation('alice', {'bitcoin': 10.0})['bitcoin']['amount'] == 0.5
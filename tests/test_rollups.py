@@ -0,0 +1,42 @@
+"""Tests for modules.rollups tier coverage"""
+
+from modules.rollups import RollupStore
+
+NOW = 1_800_000_000.0
+DAY = 86_400
+HOUR = 3_600
+
+
+def _points(days, step):
+    start = NOW - days * DAY
+    return [(start + i * step, 100.0 + i, 1.0) for i in range(int(days * DAY // step) + 1)]
+
+
+def test_week_after_year_of_daily_points_fetches_hourly_data():
+    store = RollupStore()
+    store.ingest('btc', _points(365, DAY))
+
+    assert store.days_to_fetch('btc', 365, now=NOW) == 0
+    assert store.tier_coverage('btc', 'hour') is None
+    assert store.days_to_fetch('btc', 7, now=NOW) == 7
+
+    store.ingest('btc', _points(7, HOUR))
+    assert store.days_to_fetch('btc', 7, now=NOW) == 0
+    week = store.query('btc', start=NOW - 7 * DAY)
+    assert week['tier'] == 'hour'
+    assert len(week['timestamp']) >= 7 * 24
+
+
+def test_finer_points_cover_coarser_tiers():
+    store = RollupStore()
+    store.ingest('btc', _points(7, HOUR))
+
+    assert store.tier_coverage('btc', 'minute') is None
+    assert store.tier_coverage('btc', 'day') == store.tier_coverage('btc', 'hour')
+    assert store.days_to_fetch('btc', 1, now=NOW) == 1
+
+
+def test_stale_tier_fetches_only_the_gap():
+    store = RollupStore()
+    store.ingest('btc', _points(7, HOUR))
+    assert store.days_to_fetch('btc', 7, now=NOW + 2.5 * DAY) == 3
@@ -0,0 +1,93 @@
+"""Tests for modules.solana_rpc batching and commitment caching, against the local node stub"""
+
+import pytest
+
+from modules import solana_rpc
+from modules.solana_rpc import SolanaRPCClient, SolanaRPCError
+from modules.solana_stub import StubSolanaRPC
+
+ALICE = 'b59HHkFpg3g9yBwwLcuDH6z1d6d6z3vdGWX7mkX3txH'
+BOB = '7Avu2LscLpCNNDR8szDowyck3MCBecpCf1wHyjU3pump'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def stub():
+    with StubSolanaRPC() as node:
+        yield node
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(solana_rpc, 'time', fake)
+    return fake
+
+
+def test_batch_sends_only_misses_in_one_round_trip(stub, clock):
+    client = SolanaRPCClient(stub.url)
+    stub.balances[ALICE] = 5
+    stub.balances[BOB] = 7
+
+    first = client.batch([client.balance_call(ALICE), client.balance_call(ALICE), client.balance_call(BOB)])
+    assert [result['value'] for result in first] == [5, 5, 7]
+    assert stub.http_requests == 1
+    assert stub.calls == ['getBalance', 'getBalance']
+
+    stub.balances[ALICE] = 6
+    cached = client.batch([client.balance_call(ALICE), client.balance_call(BOB)])
+    assert [result['value'] for result in cached] == [5, 7]
+    assert stub.http_requests == 1
+
+    mixed = client.batch([client.balance_call(ALICE), client.balance_call(BOB, 'finalized')])
+    assert [result['value'] for result in mixed] == [5, 7]
+    assert stub.http_requests == 2
+    assert stub.calls[-1] == 'getBalance'
+    assert client.round_trips == 2
+
+
+def test_results_expire_after_their_commitment_ttl(stub, clock):
+    client = SolanaRPCClient(stub.url)
+    stub.balances[ALICE] = 1
+    calls = [client.balance_call(ALICE, 'confirmed'), client.balance_call(ALICE, 'finalized')]
+    client.batch(calls)
+
+    stub.balances[ALICE] = 2
+    clock.now += solana_rpc.COMMITMENT_TTL['confirmed'] + 0.1
+    assert [result['value'] for result in client.batch(calls)] == [2, 1]
+
+    clock.now += solana_rpc.COMMITMENT_TTL['finalized']
+    assert [result['value'] for result in client.batch(calls)] == [2, 2]
+    assert stub.http_requests == 3
+
+    assert client.batch(calls, use_cache=False)[0]['value'] == 2
+    assert stub.http_requests == 4
+
+
+def test_errors_raise_and_are_not_cached(stub, clock):
+    client = SolanaRPCClient(stub.url)
+    with pytest.raises(SolanaRPCError) as error:
+        client.batch([client.balance_call(ALICE), ('getNothing', [])])
+    assert error.value.code == -32601
+
+    with pytest.raises(SolanaRPCError):
+        client.call('getNothing')
+    assert stub.http_requests == 2
+
+
+def test_wallet_snapshot_is_one_round_trip(stub, clock):
+    client = SolanaRPCClient(stub.url)
+    stub.balances[ALICE] = 2_500_000_000
+    stub.mints[BOB] = {'supply': 10 ** 15, 'decimals': 6}
+
+    snapshot = client.wallet_snapshot(ALICE, BOB)
+    assert snapshot['sol_balance'] == 2.5
+    assert snapshot['token_balance'] == 0
+    assert stub.http_requests == 1
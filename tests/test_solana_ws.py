@@ -0,0 +1,82 @@
+"""Tests for modules.solana_ws reconnects and re-subscription, against the local node stub"""
+
+import asyncio
+import time
+
+import pytest
+
+from modules import solana_ws
+from modules.solana_stub import StubSolanaRPC
+from modules.solana_ws import SolanaSubscriptionManager
+
+WALLET = 'b59HHkFpg3g9yBwwLcuDH6z1d6d6z3vdGWX7mkX3txH'
+MINT = '7Avu2LscLpCNNDR8szDowyck3MCBecpCf1wHyjU3pump'
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+@pytest.fixture
+def stub():
+    with StubSolanaRPC() as node:
+        yield node
+
+
+@pytest.fixture
+def manager(stub, monkeypatch):
+    monkeypatch.setattr(solana_ws, 'RECONNECT_MIN_DELAY', 0.05)
+    subscriptions = SolanaSubscriptionManager(stub.url.replace('http://', 'ws://'))
+    yield subscriptions
+    subscriptions.stop()
+
+
+def test_sync_subscriptions_only_subscribes_missing_keys(stub, manager):
+    manager.subscribe_account(WALLET)
+    assert wait_for(lambda: manager.stats()['active'] == 1)
+
+    manager.subscribe_account(WALLET)
+    asyncio.run_coroutine_threadsafe(manager._sync_subscriptions(), manager._loop).result(5)
+    assert stub.calls.count('accountSubscribe') == 1
+
+    manager.subscribe_logs(MINT)
+    assert wait_for(lambda: manager.stats()['active'] == 2)
+    asyncio.run_coroutine_threadsafe(manager._sync_subscriptions(), manager._loop).result(5)
+    assert stub.calls.count('accountSubscribe') == 1
+    assert stub.calls.count('logsSubscribe') == 1
+
+
+def test_reconnect_resubscribes_every_key(stub, manager):
+    received = []
+    key = manager.subscribe_account(WALLET, listener=lambda key, value, slot: received.append((value, slot)))
+    manager.subscribe_logs(MINT)
+    assert wait_for(lambda: manager.stats()['active'] == 2)
+
+    stub.set_balance(WALLET, 1_000)
+    assert wait_for(lambda: len(received) == 1)
+    assert received[0][0]['lamports'] == 1_000
+
+    stub.drop_connections()
+    assert wait_for(lambda: manager.reconnects == 1 and manager.stats()['active'] == 2)
+    assert stub.ws_connections == 2
+    assert stub.subscriber_count('account', WALLET) == 1
+    assert stub.subscriber_count('logs', MINT) == 1
+
+    stub.set_balance(WALLET, 2_000)
+    assert wait_for(lambda: len(received) == 2)
+    assert received[1][0]['lamports'] == 2_000
+    assert received[1][1] > received[0][1]
+    assert manager.latest(key)['updates'] == 2
+
+
+def test_stop_ends_the_connection_thread(stub, manager):
+    manager.subscribe_account(WALLET)
+    assert wait_for(lambda: manager.connected)
+    manager.stop()
+    assert wait_for(lambda: not manager._thread.is_alive())
+    assert not manager.connected